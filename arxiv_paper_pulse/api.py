@@ -1,27 +1,84 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pathlib import Path
-import json
+from contextlib import asynccontextmanager
+from google import genai
+import orjson
+import numpy as np
 import asyncio
+import anyio
+import anyio.lowlevel
+import anyio.to_thread
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from hashlib import blake2b
+from collections import OrderedDict
+from functools import lru_cache, partial
+from itertools import islice
+from operator import itemgetter
 from concurrent.futures import ThreadPoolExecutor
 import threading
 import time
 from .core import ArxivSummarizer
 from . import config
-from .utils import get_total_available
+from .utils import get_total_available, get_http_client, close_http_client, AsyncBatcher, load_json_file, read_text_file
 from .chat import PaperChatSession
-from .batch_processor import BatchPaperProcessor
+from .batch_processor import BatchPaperProcessor, batch_state, is_terminal_state
 from .embeddings import PaperEmbeddings
 from .image_generator import ImageGenerator
 from .self_playing_game import SelfDesigningGame
 from .article_generator import generate_article
-from .beehiiv_reader import BeehiivReader, get_stored_articles
+from .beehiiv_reader import BeehiivReader, iter_stored_articles
+from .semantic_cache import SemanticCache
 from pydantic import BaseModel
 from typing import List, Optional
 
-app = FastAPI(title="ArXiv Paper Pulse API")
+try:
+    import msgpack  # Optional: compact binary responses for internal callers
+except ImportError:
+    msgpack = None
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (also handles numpy arrays and non-str keys)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that passes streaming (SSE) endpoints through uncompressed."""
+
+    def __init__(self, app, exclude_paths=(), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Endpoints (matched by path suffix) that stream events; buffering them for compression defeats streaming
+STREAMING_PATHS = ("/api/summarize-stream", "/events")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients and background tasks for the lifetime of the app."""
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
+
+app = FastAPI(title="ArXiv Paper Pulse API", default_response_class=ORJSONResponse, lifespan=lifespan)
+
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5, exclude_paths=STREAMING_PATHS)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,8 +93,19 @@ frontend_dir = Path(__file__).parent.parent / "frontend"
 if frontend_dir.exists():
     app.mount("/static", StaticFiles(directory=str(frontend_dir)), name="static")
 
-# Global summarizer instance (will be initialized per request with parameters)
-summarizer_cache = {}
+# Global summarizer instances (initialized per parameter set, least recently used evicted first)
+# Entries expire after SUMMARIZER_TTL seconds so long-lived workers pick up fresh Gemini clients
+SUMMARIZER_CACHE_SIZE = 32
+SUMMARIZER_TTL = 3600
+summarizer_cache = OrderedDict()
+_summarizer_lock = threading.Lock()
+
+# Batch jobs submitted through the API: batch_id -> {"model", "paper_ids", "submitted_at"}
+batch_registry = OrderedDict()
+
+# Worker pool for blocking summarizer/LLM calls made from async handlers
+API_WORKER_THREADS = 16
+_executor = None
 
 # Beehiiv polling state
 _beehiiv_polling_active = False
@@ -65,11 +133,31 @@ def _poll_beehiiv_feeds():
 
         time.sleep(config.BEEHIIV_POLL_INTERVAL)
 
-@app.on_event("startup")
 async def startup_event():
-    """Start background tasks on API startup."""
+    """Create shared clients and start background tasks on API startup."""
     global _beehiiv_polling_active, _beehiiv_polling_thread
 
+    # Shared keep-alive pool for outbound arXiv/Beehiiv requests
+    app.state.http = get_http_client()
+
+    # One Gemini client for every summarizer, batch processor, image generator and embedder
+    if config.GEMINI_API_KEY:
+        app.state.genai_client = genai.Client(api_key=config.GEMINI_API_KEY)
+        app.state.image_generator = ImageGenerator(client=app.state.genai_client)
+        app.state.embeddings = PaperEmbeddings(client=app.state.genai_client)
+
+    try:
+        await _run_blocking(semantic_cache.load, config.SEMANTIC_CACHE_FILE)
+    except Exception as e:
+        print(f"⚠️  Could not load semantic cache: {e}")
+
+    # Pre-create the default summarizer so the first request doesn't pay for it
+    if config.GEMINI_API_KEY:
+        try:
+            await _run_blocking(get_summarizer)
+        except Exception as e:
+            print(f"⚠️  Summarizer warm-up failed: {e}")
+
     if config.BEEHIIV_AUTO_POLL and config.BEEHIIV_FEEDS:
         _beehiiv_polling_active = True
         _beehiiv_polling_thread = threading.Thread(target=_poll_beehiiv_feeds, daemon=True)
@@ -78,22 +166,175 @@ async def startup_event():
         print(f"🔄 Started automatic Beehiiv polling (interval: {config.BEEHIIV_POLL_INTERVAL}s)")
         print(f"   Monitoring feeds: {feeds_list}")
 
-@app.on_event("shutdown")
 async def shutdown_event():
-    """Stop background tasks on API shutdown."""
-    global _beehiiv_polling_active
+    """Stop background tasks and release shared clients on API shutdown."""
+    global _beehiiv_polling_active, _executor
     _beehiiv_polling_active = False
+    close_http_client()
+
+    for watch in list(_batch_watches.values()):
+        watch.task.cancel()
+
+    if len(semantic_cache):
+        try:
+            semantic_cache.save(config.SEMANTIC_CACHE_FILE)
+        except Exception as e:
+            print(f"⚠️  Could not save semantic cache: {e}")
+
+    with _summarizer_lock:
+        for summarizer, _ in summarizer_cache.values():
+            summarizer.close()
+        summarizer_cache.clear()
+    genai_client = getattr(app.state, "genai_client", None)
+    for name in ("genai_client", "image_generator", "embeddings"):
+        if hasattr(app.state, name):
+            delattr(app.state, name)
+    if genai_client is not None:
+        genai_client.close()
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+def _genai_client():
+    """Shared Gemini client created at startup (None outside the app lifespan)."""
+    return getattr(app.state, "genai_client", None)
+
+def get_image_generator() -> ImageGenerator:
+    """Startup singleton, or a fresh generator when running without the lifespan."""
+    return getattr(app.state, "image_generator", None) or ImageGenerator()
+
+def get_embeddings() -> PaperEmbeddings:
+    """Startup singleton, or a fresh embedder when running without the lifespan."""
+    return getattr(app.state, "embeddings", None) or PaperEmbeddings()
+
+def get_batch_processor(model: Optional[str] = None) -> BatchPaperProcessor:
+    """Batch processor for a model, backed by the shared Gemini client when available."""
+    return BatchPaperProcessor(model=model, client=_genai_client())
+
+def _get_executor():
+    """Get or create the shared worker pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=API_WORKER_THREADS, thread_name_prefix="api-worker")
+    return _executor
+
+async def _run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the worker pool so the event loop stays responsive."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(func, *args, **kwargs))
+
+# Generated games run untrusted code in subprocesses; cap how many run at once
+GAME_EXECUTION_CONCURRENCY = 4
+_game_limiter = anyio.lowlevel.RunVar("_game_limiter")
+
+def _get_game_limiter() -> anyio.CapacityLimiter:
+    """Get the per-event-loop limiter for game executions."""
+    try:
+        return _game_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(GAME_EXECUTION_CONCURRENCY)
+        _game_limiter.set(limiter)
+        return limiter
+
+# Cap concurrent Gemini calls so bursts queue here instead of tripping provider 429s
+_gemini_limiter = anyio.lowlevel.RunVar("_gemini_limiter")
+
+def _get_gemini_limiter() -> anyio.CapacityLimiter:
+    """Get the per-event-loop limiter for Gemini-bound calls."""
+    try:
+        return _gemini_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(config.GEMINI_MAX_CONCURRENCY)
+        _gemini_limiter.set(limiter)
+        return limiter
+
+async def _run_gemini(func, *args, **kwargs):
+    """Run a blocking Gemini-bound call on the worker pool, holding a Gemini slot."""
+    async with _get_gemini_limiter():
+        return await _run_blocking(func, *args, **kwargs)
+
+# In-flight upstream fetches, keyed by request parameters (single-flight)
+_inflight = {}
+
+async def _single_flight(key, func, *args, **kwargs):
+    """Run a blocking call once for all concurrent callers that share the same key."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_blocking(func, *args, **kwargs))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller disconnecting doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
+
+def _latest_file(directory: Path, suffix: str) -> Optional[Path]:
+    """Return the lexicographically greatest (i.e. newest timestamped) file ending in suffix, or None."""
+    with os.scandir(directory) as it:
+        latest = max((entry.name for entry in it if entry.name.endswith(suffix)), default=None)
+    return directory / latest if latest is not None else None
+
+def _latest_file_stat(directory: Path, suffix: str):
+    """Blocking: (newest file ending in suffix, its stat result), or None if there is none."""
+    if not directory.exists():
+        return None
+    latest = _latest_file(directory, suffix)
+    if latest is None:
+        return None
+    return latest, latest.stat()
 
 def get_summarizer(max_results=10, query="cat:cs.AI", model=None):
-    """Get or create summarizer instance"""
+    """
+    Get or create summarizer instance.
+
+    Blocking: a miss builds an ArxivSummarizer, so async handlers call this
+    through _run_blocking. The build happens outside _summarizer_lock; if two
+    threads race on one key, the first one cached wins and the other is closed.
+    """
     cache_key = f"{max_results}_{query}_{model or config.DEFAULT_MODEL}"
-    if cache_key not in summarizer_cache:
-        summarizer_cache[cache_key] = ArxivSummarizer(
-            max_results=max_results,
-            query=query,
-            model=model or config.DEFAULT_MODEL
-        )
-    return summarizer_cache[cache_key]
+    now = time.monotonic()
+    expired = None
+    with _summarizer_lock:
+        entry = summarizer_cache.get(cache_key)
+        if entry is not None:
+            summarizer, created_at = entry
+            if now - created_at < SUMMARIZER_TTL:
+                summarizer_cache.move_to_end(cache_key)
+                return summarizer
+            del summarizer_cache[cache_key]
+            expired = summarizer
+    if expired is not None:
+        expired.close()
+
+    summarizer = ArxivSummarizer(
+        max_results=max_results,
+        query=query,
+        model=model or config.DEFAULT_MODEL,
+        client=_genai_client()
+    )
+
+    evicted = []
+    with _summarizer_lock:
+        entry = summarizer_cache.get(cache_key)
+        if entry is not None and now - entry[1] < SUMMARIZER_TTL:
+            evicted.append(summarizer)
+            summarizer = entry[0]
+            summarizer_cache.move_to_end(cache_key)
+        else:
+            summarizer_cache[cache_key] = (summarizer, now)
+            while len(summarizer_cache) > SUMMARIZER_CACHE_SIZE:
+                evicted.append(summarizer_cache.popitem(last=False)[1][0])
+    for unused in evicted:
+        unused.close()
+    return summarizer
+
+def _register_batch(batch_id, model, papers):
+    """Remember which model and papers a batch job was submitted with."""
+    batch_registry[batch_id] = {
+        "model": model,
+        "paper_ids": [paper.get("id") or paper.get("entry_id") for paper in papers],
+        "submitted_at": time.time()
+    }
+    while len(batch_registry) > config.BATCH_REGISTRY_SIZE:
+        batch_registry.popitem(last=False)
 
 @app.get("/")
 async def root():
@@ -113,48 +354,80 @@ async def health():
         "default_model": config.DEFAULT_MODEL
     }
 
+def _validators(stat_result):
+    """ETag and Last-Modified headers for a file's current version."""
+    return {
+        "ETag": f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+    }
+
+def _is_not_modified(request: Request, validators: dict) -> bool:
+    """Check conditional request headers against a file's validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        return "*" in tags or validators["ETag"] in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return parsedate_to_datetime(validators["Last-Modified"]) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
 @app.get("/api/papers")
-async def get_papers():
+async def get_papers(request: Request):
     """Get latest paper summaries"""
-    summary_dir = Path(config.SUMMARY_DIR)
-    if not summary_dir.exists():
+    latest = await run_in_threadpool(_latest_file_stat, Path(config.SUMMARY_DIR), "_summary.json")
+    if latest is None:
         return {"papers": []}
 
-    files = sorted(summary_dir.glob("*_summary.json"), reverse=True)
-    if not files:
-        return {"papers": []}
+    latest_file, stat = latest
+    validators = _validators(stat)
+    if _is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
 
-    latest_file = files[0]
-    with open(latest_file, "r") as f:
-        data = json.load(f)
-    return {"papers": data, "file": str(latest_file.name)}
+    data = await run_in_threadpool(load_json_file, latest_file)
+    return ORJSONResponse({"papers": data, "file": str(latest_file.name)}, headers=validators)
 
 @app.get("/api/briefing")
-async def get_briefing():
+async def get_briefing(request: Request):
     """Get latest briefing file content"""
-    briefing_dir = Path(config.BRIEFING_DIR)
-    if not briefing_dir.exists():
+    latest = await run_in_threadpool(_latest_file_stat, Path(config.BRIEFING_DIR), "_briefing.md")
+    if latest is None:
         raise HTTPException(status_code=404, detail="No briefing file found")
 
-    files = sorted(briefing_dir.glob("*_briefing.md"), reverse=True)
-    if not files:
-        raise HTTPException(status_code=404, detail="No briefing file found")
+    latest_file, stat = latest
+    validators = _validators(stat)
+    if _is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
 
-    latest_file = files[0]
-    with open(latest_file, "r") as f:
-        content = f.read()
-    return {"content": content, "file": str(latest_file.name)}
+    content = await run_in_threadpool(read_text_file, latest_file)
+    return ORJSONResponse({"content": content, "file": str(latest_file.name)}, headers=validators)
 
 @app.post("/api/summarize")
 async def summarize_papers(
     query: str = "cat:cs.AI",
     max_results: int = 10,
-    force_pull: bool = False
+    force_pull: bool = False,
+    use_batch: bool = False
 ):
-    """Summarize papers from arXiv"""
+    """Summarize papers from arXiv (use_batch submits one Batch API job and returns 202 with its id)"""
     try:
-        summarizer = get_summarizer(max_results=max_results, query=query)
-        summaries = summarizer.summarize_papers(force_pull=force_pull)
+        summarizer = await _run_blocking(get_summarizer, max_results=max_results, query=query)
+        if use_batch:
+            batch_id, papers = await _run_gemini(summarizer.submit_summary_batch, force_pull=force_pull)
+            if batch_id is not None:
+                _register_batch(batch_id, summarizer.model, papers)
+                return ORJSONResponse(
+                    {"status": "accepted", "batch_id": batch_id, "count": len(papers)},
+                    status_code=202
+                )
+            # Batch API unavailable in this SDK version: fall through to per-paper summaries
+        summaries = await _single_flight(
+            ("summarize", query, max_results, force_pull), summarizer.summarize_papers, force_pull=force_pull
+        )
         return {
             "status": "success",
             "count": len(summaries),
@@ -166,7 +439,7 @@ async def summarize_papers(
 @app.get("/api/available")
 async def get_available(query: str = "cat:cs.AI"):
     """Get total available papers for a query"""
-    total = get_total_available(query)
+    total = await _run_blocking(get_total_available, query)
     return {"query": query, "total_available": total}
 
 @app.post("/api/search")
@@ -176,9 +449,9 @@ async def search_papers(
 ):
     """Search arXiv papers without full summarization (faster)"""
     try:
-        summarizer = get_summarizer(max_results=max_results, query=query)
+        summarizer = await _run_blocking(get_summarizer, max_results=max_results, query=query)
         # Just fetch raw data without summarization
-        raw_data = summarizer.fetch_raw_data(force_pull=True)
+        raw_data = await _single_flight(("search", query, max_results), summarizer.fetch_raw_data, force_pull=True)
         return {
             "status": "success",
             "count": len(raw_data),
@@ -191,6 +464,25 @@ async def search_papers(
 
 # New endpoints for advanced features
 
+def _embed_for_cache(text: str):
+    """Embedding used by the semantic cache to match near-identical inputs (empty on failure)."""
+    try:
+        return get_embeddings().generate_embedding(text)
+    except Exception as e:
+        print(f"⚠️  Semantic cache embedding failed: {e}")
+        return []
+
+def _is_error_text(text) -> bool:
+    """Summarizer failures come back as text rather than exceptions; never cache them."""
+    return isinstance(text, str) and text.startswith("Error")
+
+# Reuses summaries for repeated or near-duplicate inputs; persisted across restarts
+semantic_cache = SemanticCache(
+    embed_fn=_embed_for_cache,
+    threshold=config.SEMANTIC_CACHE_THRESHOLD,
+    maxsize=config.SEMANTIC_CACHE_SIZE,
+)
+
 @app.post("/api/summarize-pdf")
 async def summarize_pdf(
     paper_id: str,
@@ -198,9 +490,16 @@ async def summarize_pdf(
 ):
     """Summarize paper from PDF"""
     try:
-        summarizer = get_summarizer()
+        summarizer = await _run_blocking(get_summarizer)
         paper = {"entry_id": paper_id, "url": f"https://arxiv.org/abs/{paper_id}"}
-        summary = summarizer.gemini_summarize_from_pdf(paper, use_streaming=use_streaming)
+        namespace = f"pdf:{summarizer.model}"
+        if not use_streaming:
+            cached, _ = semantic_cache.lookup(paper_id, namespace, semantic=False)
+            if cached is not None:
+                return {"status": "success", "summary": cached, "cached": True}
+        summary = await _run_gemini(summarizer.gemini_summarize_from_pdf, paper, use_streaming=use_streaming)
+        if isinstance(summary, str) and not _is_error_text(summary):
+            semantic_cache.store(paper_id, summary, namespace)
         return {"status": "success", "summary": summary}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -214,33 +513,86 @@ class SummaryRequest(BaseModel):
 async def summarize_structured(request: SummaryRequest):
     """Get structured JSON summary"""
     try:
-        summarizer = get_summarizer(model=request.model)
-        analysis = summarizer.gemini_summarize(request.abstract, use_structured_output=True)
-        return {"status": "success", "analysis": analysis.model_dump() if hasattr(analysis, 'model_dump') else str(analysis)}
+        summarizer = await _run_blocking(get_summarizer, model=request.model)
+        namespace = f"structured:{summarizer.model}"
+        # Exact hits are answered on the loop; only the near-match fallback embeds, under a Gemini slot
+        cached, embedding = semantic_cache.lookup(request.abstract, namespace, semantic=False)
+        if cached is None:
+            cached, embedding = await _run_gemini(semantic_cache.lookup, request.abstract, namespace)
+        if cached is not None:
+            return {"status": "success", "analysis": cached, "cached": True}
+        analysis = await _run_gemini(summarizer.gemini_summarize, request.abstract, use_structured_output=True)
+        if hasattr(analysis, 'model_dump'):
+            analysis = analysis.model_dump()
+            if not _is_error_text(analysis.get("problem_statement", "")):
+                semantic_cache.store(request.abstract, analysis, namespace, embedding=embedding)
+            return {"status": "success", "analysis": analysis}
+        return {"status": "success", "analysis": str(analysis)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Disable proxy buffering/caching so tokens reach the browser as they are produced
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Comment frame sent while idle so proxies (e.g. Nginx's 60s read timeout) keep the stream open
+SSE_PING_INTERVAL = 15
+SSE_PING = b": ping\n\n"
+_STREAM_END = object()
+
+def _sse_frame(payload: dict) -> bytes:
+    """Encode a payload as a server-sent event frame."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+# Frames whose payload never changes are encoded once at import time
+STATUS_STARTING_FRAME = _sse_frame({'type': 'status', 'text': 'Starting analysis...'})
+DONE_FRAME = _sse_frame({'type': 'done'})
+
+# Per-token chunk frames: only the text is JSON-encoded, around a fixed prefix/suffix
+CHUNK_FRAME_PREFIX = b'data: {"type":"chunk","text":'
+CHUNK_FRAME_SUFFIX = b'}\n\n'
+
+async def _iterate_with_keepalive(iterable):
+    """
+    Pull items from a blocking iterator on the worker pool, yielding SSE_PING
+    whenever the next item takes longer than SSE_PING_INTERVAL to arrive.
+    """
+    iterator = iter(iterable)
+    while True:
+        pending = asyncio.ensure_future(_run_blocking(next, iterator, _STREAM_END))
+        while True:
+            try:
+                item = await asyncio.wait_for(asyncio.shield(pending), SSE_PING_INTERVAL)
+                break
+            except asyncio.TimeoutError:
+                yield SSE_PING
+        if item is _STREAM_END:
+            return
+        yield item
+
 @app.post("/api/summarize-stream")
 async def summarize_stream(request: SummaryRequest):
     """Stream paper summary"""
-    def generate():
+    async def generate():
         try:
-            summarizer = get_summarizer(model=request.model)
+            summarizer = await _run_blocking(get_summarizer, model=request.model)
 
-            yield f"data: {json.dumps({'type': 'status', 'text': 'Starting analysis...'})}\n\n"
+            yield STATUS_STARTING_FRAME
 
-            stream = summarizer.gemini_summarize(request.abstract, use_streaming=True)
+            # The response streams in as the iterator is consumed, so hold the slot until it ends
+            async with _get_gemini_limiter():
+                stream = await _run_blocking(summarizer.gemini_summarize, request.abstract, use_streaming=True)
 
-            for chunk in stream:
-                if hasattr(chunk, 'text') and chunk.text:
-                    yield f"data: {json.dumps({'type': 'chunk', 'text': chunk.text})}\n\n"
+                async for chunk in _iterate_with_keepalive(stream):
+                    if chunk is SSE_PING:
+                        yield SSE_PING
+                    elif hasattr(chunk, 'text') and chunk.text:
+                        yield CHUNK_FRAME_PREFIX + orjson.dumps(chunk.text) + CHUNK_FRAME_SUFFIX
 
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield DONE_FRAME
 
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield _sse_frame({'type': 'error', 'message': str(e)})
 
-    return StreamingResponse(generate(), media_type="text/event-stream")
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @app.post("/api/analyze-multiple")
@@ -250,9 +602,9 @@ async def analyze_multiple_papers(
 ):
     """Analyze multiple papers together"""
     try:
-        summarizer = get_summarizer()
+        summarizer = await _run_blocking(get_summarizer)
         papers = [{"entry_id": pid, "url": f"https://arxiv.org/abs/{pid}"} for pid in paper_ids]
-        result = summarizer.analyze_multiple_papers(papers, use_structured_output=use_structured_output)
+        result = await _run_gemini(summarizer.analyze_multiple_papers, papers, use_structured_output=use_structured_output)
         if use_structured_output:
             return {"status": "success", "analysis": result.model_dump() if hasattr(result, 'model_dump') else str(result)}
         return {"status": "success", "analysis": result}
@@ -282,13 +634,48 @@ async def chat_ask(
     return {"status": "error", "message": "Session management not fully implemented"}
 
 
+def _embed_paper_batches(paper_lists):
+    """Embed the papers of several concurrent requests in one pass, split back per request."""
+    embeddings_gen = get_embeddings()
+    combined = embeddings_gen.generate_batch_embeddings([paper for papers in paper_lists for paper in papers])
+    results = []
+    for papers in paper_lists:
+        keys = (embeddings_gen.paper_key(paper) for paper in papers)
+        results.append({key: combined[key] for key in keys if key in combined})
+    return results
+
+# Each batch holds one Gemini slot while it runs (and fans out to at most EMBED_BATCH_CONCURRENCY requests)
+embedding_batcher = AsyncBatcher(_embed_paper_batches, max_batch_size=16, max_queue_time=0.05, run=_run_gemini)
+
+
+def _check_embedding_payload(count: int):
+    """Reject embedding requests larger than config.EMBEDDINGS_MAX_PAPERS."""
+    if count > config.EMBEDDINGS_MAX_PAPERS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many papers ({count}); the limit is {config.EMBEDDINGS_MAX_PAPERS} per request"
+        )
+
+def _msgpack_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+def _negotiate(request: Request, content: dict):
+    """Return msgpack when the client accepts it and msgpack is installed, otherwise JSON."""
+    if msgpack is not None and "application/msgpack" in request.headers.get("accept", ""):
+        body = msgpack.packb(content, default=_msgpack_default, use_bin_type=True, use_single_float=True)
+        return Response(body, media_type="application/msgpack")
+    return ORJSONResponse(content)
+
+
 @app.post("/api/embeddings/generate")
-async def generate_embeddings(papers: List[dict]):
+async def generate_embeddings(papers: List[dict], request: Request):
     """Generate embeddings for papers"""
+    _check_embedding_payload(len(papers))
     try:
-        embeddings_gen = PaperEmbeddings()
-        result = embeddings_gen.generate_batch_embeddings(papers)
-        return {"status": "success", "embeddings": result}
+        result = await embedding_batcher.process(papers)
+        return _negotiate(request, {"status": "success", "embeddings": result})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -297,14 +684,16 @@ async def generate_embeddings(papers: List[dict]):
 async def find_similar_papers(
     target_paper: dict,
     all_papers: List[dict],
+    request: Request,
     top_k: int = 5,
     threshold: float = 0.7
 ):
     """Find similar papers"""
+    _check_embedding_payload(len(all_papers))
     try:
-        embeddings_gen = PaperEmbeddings()
-        similar = embeddings_gen.find_similar_papers(target_paper, all_papers, top_k, threshold)
-        return {"status": "success", "similar_papers": similar}
+        embeddings_gen = get_embeddings()
+        similar = await _run_gemini(embeddings_gen.find_similar_papers, target_paper, all_papers, top_k, threshold)
+        return _negotiate(request, {"status": "success", "similar_papers": similar})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -313,8 +702,10 @@ async def find_similar_papers(
 async def submit_batch(papers: List[dict], model: str = None):
     """Submit papers for batch processing"""
     try:
-        processor = BatchPaperProcessor(model=model)
-        batch_id = processor.submit_batch(papers)
+        processor = get_batch_processor(model)
+        batch_id = await _run_gemini(processor.submit_batch, papers)
+        if batch_id is not None:
+            _register_batch(batch_id, processor.model, papers)
         return {"status": "success", "batch_id": batch_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -324,8 +715,9 @@ async def submit_batch(papers: List[dict], model: str = None):
 async def get_batch_status(batch_id: str):
     """Get batch processing status"""
     try:
-        processor = BatchPaperProcessor()
-        status = processor.check_batch_status(batch_id)
+        batch_info = batch_registry.get(batch_id, {})
+        processor = get_batch_processor(batch_info.get("model"))
+        status = await _run_blocking(processor.check_batch_status, batch_id)
         return {"status": "success", "batch_status": status}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -335,13 +727,91 @@ async def get_batch_status(batch_id: str):
 async def get_batch_results(batch_id: str):
     """Get batch processing results"""
     try:
-        processor = BatchPaperProcessor()
-        results = processor.get_batch_results(batch_id)
+        batch_info = batch_registry.get(batch_id, {})
+        processor = get_batch_processor(batch_info.get("model"))
+        results = await _run_blocking(processor.get_batch_results, batch_id)
+        # Results come back in submission order; tag them with the paper they belong to
+        for result, paper_id in zip(results, batch_info.get("paper_ids", [])):
+            result["paper_id"] = paper_id
         return {"status": "success", "results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Backoff between batch status polls: starts fast so short jobs are noticed quickly
+BATCH_POLL_INITIAL = 1.0
+BATCH_POLL_MAX = 60.0
+BATCH_POLL_TIMEOUT = 3600
+
+class _BatchWatch:
+    """Latest status of a polled batch, with an event that fires on every change."""
+
+    def __init__(self):
+        self.status = None
+        self.finished = False
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def publish(self, status):
+        self.status = status
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+# One poll task per batch, shared by every client watching it
+_batch_watches = {}
+
+async def _poll_batch(batch_id: str, watch: _BatchWatch):
+    """Poll a batch with exponential backoff, publishing each state transition."""
+    processor = get_batch_processor(batch_registry.get(batch_id, {}).get("model"))
+    deadline = time.monotonic() + BATCH_POLL_TIMEOUT
+    delay = BATCH_POLL_INITIAL
+    try:
+        while True:
+            status = await _run_blocking(processor.check_batch_status, batch_id)
+            if watch.status is None or batch_state(status) != batch_state(watch.status) or "error" in status:
+                watch.publish(status)
+            if "error" in status or is_terminal_state(batch_state(status)) or time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(delay)
+            delay = min(BATCH_POLL_MAX, delay * 1.5)
+    except Exception as e:
+        watch.publish({"id": batch_id, "error": str(e)})
+    finally:
+        _batch_watches.pop(batch_id, None)
+        watch.finished = True
+        watch.publish(watch.status)
+
+def _watch_batch(batch_id: str) -> _BatchWatch:
+    """Get the shared watch for a batch, starting its poll task if needed."""
+    watch = _batch_watches.get(batch_id)
+    if watch is None:
+        watch = _batch_watches[batch_id] = _BatchWatch()
+        watch.task = asyncio.ensure_future(_poll_batch(batch_id, watch))
+    return watch
+
+@app.get("/api/batch/{batch_id}/events")
+async def batch_events(batch_id: str):
+    """Stream batch state transitions as server-sent events until the job finishes."""
+    watch = _watch_batch(batch_id)
+
+    async def generate():
+        last_sent = None
+        while True:
+            event = watch.changed
+            if watch.status is not None and watch.status is not last_sent:
+                last_sent = watch.status
+                yield _sse_frame({'type': 'status', 'batch_status': watch.status})
+            if watch.finished:
+                yield DONE_FRAME
+                return
+            try:
+                await asyncio.wait_for(event.wait(), SSE_PING_INTERVAL)
+            except asyncio.TimeoutError:
+                yield SSE_PING
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @app.post("/api/url-context")
 async def summarize_with_url_context(
     paper_url: str,
@@ -349,15 +819,15 @@ async def summarize_with_url_context(
 ):
     """Summarize paper using URL context"""
     try:
-        summarizer = get_summarizer()
-        summary = summarizer.gemini_summarize_with_url_context(paper_url, use_grounding=use_grounding)
+        summarizer = await _run_blocking(get_summarizer)
+        summary = await _run_gemini(summarizer.gemini_summarize_with_url_context, paper_url, use_grounding=use_grounding)
         return {"status": "success", "summary": summary}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/generate-image")
-async def generate_image(request: dict):
+async def generate_image(request: dict, generator: ImageGenerator = Depends(get_image_generator)):
     """
     Generate an image from a text prompt using Gemini image generation.
     Layer 1: Image Generation Module
@@ -367,14 +837,12 @@ async def generate_image(request: dict):
         raise HTTPException(status_code=400, detail="Prompt is required")
 
     try:
-        generator = ImageGenerator()
 
-        # Generate filename from prompt (simple hash)
-        import hashlib
-        filename = hashlib.md5(prompt.encode()).hexdigest()[:12] + ".png"
+        # Generate filename from prompt (simple hash, 12 hex chars)
+        filename = blake2b(prompt.encode(), digest_size=6).hexdigest() + ".png"
         output_path = generator.output_dir / filename
 
-        saved_path = generator.generate_and_save(prompt, str(output_path))
+        saved_path = await _run_gemini(generator.generate_and_save, prompt, str(output_path))
 
         return {
             "status": "success",
@@ -406,7 +874,7 @@ async def generate_article_endpoint(request: dict):
         raise HTTPException(status_code=400, detail="output_format must be 'docx' or 'md'")
 
     try:
-        result_path = generate_article(paper_id, output_format=output_format)
+        result_path = await _run_gemini(generate_article, paper_id, output_format=output_format)
 
         return {
             "success": True,
@@ -429,27 +897,7 @@ async def list_articles():
     if not article_dir.exists():
         return {"articles": []}
 
-    articles = []
-    for article_file in sorted(article_dir.glob("*.md"), key=lambda x: x.stat().st_mtime, reverse=True):
-        articles.append({
-            "name": article_file.name,
-            "path": str(article_file),
-            "size": article_file.stat().st_size,
-            "modified": article_file.stat().st_mtime,
-            "format": "md"
-        })
-
-    for article_file in sorted(article_dir.glob("*.docx"), key=lambda x: x.stat().st_mtime, reverse=True):
-        articles.append({
-            "name": article_file.name,
-            "path": str(article_file),
-            "size": article_file.stat().st_size,
-            "modified": article_file.stat().st_mtime,
-            "format": "docx"
-        })
-
-    # Sort by modified time
-    articles.sort(key=lambda x: x["modified"], reverse=True)
+    articles = await run_in_threadpool(_list_article_files, article_dir)
 
     return {
         "articles": articles,
@@ -457,22 +905,66 @@ async def list_articles():
     }
 
 
+def _list_article_files(article_dir: Path):
+    """Return article metadata, reusing the last scan while the directory is unchanged."""
+    # The directory mtime changes whenever an article is added, removed or renamed
+    return list(_scan_articles(str(article_dir), article_dir.stat().st_mtime_ns))
+
+
+@lru_cache(maxsize=8)
+def _scan_articles(article_dir: str, dir_mtime_ns: int):
+    """Collect article metadata with a single scandir pass, newest first (blocking)."""
+    articles = []
+    with os.scandir(article_dir) as it:
+        for entry in it:
+            name = entry.name
+            fmt = name.rpartition(".")[2]
+            if fmt not in ("md", "docx") or not entry.is_file():
+                continue
+            st = entry.stat()
+            articles.append({
+                "name": name,
+                "path": entry.path,
+                "size": st.st_size,
+                "modified": st.st_mtime,
+                "format": fmt
+            })
+
+    articles.sort(key=itemgetter("modified"), reverse=True)
+    return tuple(articles)
+
+
 @app.get("/api/articles/{article_name}")
-async def get_article(article_name: str):
+async def get_article(article_name: str, request: Request):
     """Get specific article file."""
     article_dir = Path(config.ARTICLE_OUTPUT_DIR)
     article_path = article_dir / article_name
 
-    if not article_path.exists():
+    # One stat serves the existence check, the validators and FileResponse itself
+    try:
+        stat_result = os.stat(article_path)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Article not found")
 
     if article_path.suffix == ".md":
-        return FileResponse(str(article_path), media_type="text/markdown")
+        media_type = "text/markdown"
     elif article_path.suffix == ".docx":
-        return FileResponse(str(article_path), media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        media_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
     else:
         raise HTTPException(status_code=400, detail="Unsupported file format")
 
+    validators = _validators(stat_result)
+    if _is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators)
+    return FileResponse(
+        str(article_path),
+        media_type=media_type,
+        headers=validators,
+        filename=article_path.name,
+        stat_result=stat_result,
+        content_disposition_type="inline"
+    )
+
 
 # Beehiiv RSS Feed Endpoints
 @app.post("/api/beehiiv/feeds")
@@ -491,7 +983,7 @@ async def fetch_beehiiv_feed(request: dict):
 
         force_refresh = request.get("force_refresh", False)
         reader = BeehiivReader(feed_url)
-        feed_data = reader.fetch_feed(force_refresh=force_refresh)
+        feed_data = await _run_blocking(reader.fetch_feed, force_refresh=force_refresh)
         return feed_data
     except HTTPException:
         raise
@@ -513,7 +1005,7 @@ async def get_beehiiv_feed_info(request: dict):
             raise HTTPException(status_code=400, detail="feed_url is required")
 
         reader = BeehiivReader(feed_url)
-        feed_info = reader.get_feed_info()
+        feed_info = await _run_blocking(reader.get_feed_info)
         return feed_info
     except HTTPException:
         raise
@@ -530,10 +1022,7 @@ async def get_beehiiv_articles(limit: Optional[int] = None):
         limit: Maximum number of articles to return
     """
     try:
-        articles = get_stored_articles()
-
-        if limit:
-            articles = articles[:limit]
+        articles = await _run_blocking(lambda: list(islice(iter_stored_articles(), limit or None)))
 
         return {
             "articles": articles,
@@ -557,11 +1046,12 @@ async def get_beehiiv_article(article_id: str, feed_url: str = None):
             import urllib.parse
             decoded_url = urllib.parse.unquote(feed_url) if feed_url.startswith("http") else feed_url
             reader = BeehiivReader(decoded_url)
-            article = reader.get_article_by_id(article_id)
+            article = await _run_blocking(reader.get_article_by_id, article_id)
         else:
             # Search in all stored articles
-            articles = get_stored_articles()
-            article = next((a for a in articles if a.get("id") == article_id or a.get("link") == article_id), None)
+            article = await _run_blocking(lambda: next(
+                (a for a in iter_stored_articles() if a.get("id") == article_id or a.get("link") == article_id), None
+            ))
 
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
@@ -645,7 +1135,7 @@ async def generate_self_playing_game(request: dict):
         generator = SelfDesigningGame()
 
         # Generate game code
-        design_result = generator.design_game(prompt)
+        design_result = await _run_gemini(generator.design_game, prompt)
 
         if not design_result['valid']:
             return {
@@ -657,10 +1147,13 @@ async def generate_self_playing_game(request: dict):
             }
 
         # Execute game code
-        execution_result = generator.execute_game(design_result['code'])
+        execution_result = await anyio.to_thread.run_sync(
+            generator.execute_game, design_result['code'], limiter=_get_game_limiter()
+        )
 
         # Save game and results
-        game_dir = generator.save_game(
+        game_dir = await _run_blocking(
+            generator.save_game,
             design_result['code'],
             execution_result,
             Path(config.GAME_OUTPUT_DIR)
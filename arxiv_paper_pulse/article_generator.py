@@ -3,14 +3,22 @@
 Simple article generator that fetches arXiv papers, analyzes them,
 generates images, writes articles, and outputs DOCX files.
 """
+import re
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import arxiv
 from google import genai
 
 from .documents import DocumentProcessor, DocumentInput, DocumentFromURL, DocumentProcessingConfig, OutputFormat
 from .image_generator import ImageGenerator
 from . import config
+from .utils import get_arxiv_client
+
+
+# Markdown heading paragraph: up to three #'s set the level, any extra are dropped
+HEADING_RE = re.compile(r'(#{1,3})#*\s*(.*)', re.DOTALL)
 
 
 def _extract_paper_id(url_or_id: str) -> str:
@@ -22,14 +30,14 @@ def _extract_paper_id(url_or_id: str) -> str:
     return paper_id
 
 
+@lru_cache(maxsize=4096)
 def _fetch_paper_metadata(paper_id: str):
-    """Fetch paper metadata from arXiv."""
+    """Fetch paper metadata from arXiv (memoized; published metadata doesn't change)."""
     search = arxiv.Search(id_list=[paper_id])
-    client = arxiv.Client()
-    results = list(client.results(search))
-    if not results:
+    # Only the first result is needed; don't drain the generator
+    paper = next(iter(get_arxiv_client().results(search)), None)
+    if paper is None:
         raise ValueError(f"Paper {paper_id} not found on arXiv")
-    paper = results[0]
     return {
         'title': paper.title,
         'authors': [author.name for author in paper.authors],
@@ -91,13 +99,8 @@ Generate a clear, descriptive image prompt that captures the essence of this res
     )
     image_prompt = image_prompt_response.text.strip()
 
-    # Generate and save image
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     image_filename = f"article_image_{paper_id}_{timestamp}.png"
-    image_path = img_generator.generate_and_save(
-        image_prompt,
-        str(Path(config.IMAGE_OUTPUT_DIR) / image_filename)
-    )
 
     # Generate article text
     article_prompt = f"""Write a comprehensive article about this research paper.
@@ -121,10 +124,19 @@ Write an article with the following structure:
 
 Write in a clear, accessible style suitable for readers interested in research."""
 
-    article_response = client.models.generate_content(
-        model="gemini-2.5-pro",
-        contents=[article_prompt]
-    )
+    # Image generation and article writing are independent once the analysis exists:
+    # write the article on a worker thread while the image is generated and saved here
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        article_future = pool.submit(
+            client.models.generate_content,
+            model="gemini-2.5-pro",
+            contents=[article_prompt]
+        )
+        image_path = img_generator.generate_and_save(
+            image_prompt,
+            str(Path(config.IMAGE_OUTPUT_DIR) / image_filename)
+        )
+        article_response = article_future.result()
     article_text = article_response.text
     print(f"   ✅ Article text generated ({len(article_text)} characters)")
     
@@ -153,19 +165,14 @@ Write in a clear, accessible style suitable for readers interested in research."
         doc.add_paragraph()  # Spacing
 
         # Article content (split into paragraphs)
-        for paragraph in article_text.split('\n\n'):
-            if paragraph.strip():
-                if paragraph.strip().startswith('#'):
-                    # Heading
-                    heading_text = paragraph.strip().lstrip('#').strip()
-                    if paragraph.strip().startswith('###'):
-                        doc.add_heading(heading_text, level=3)
-                    elif paragraph.strip().startswith('##'):
-                        doc.add_heading(heading_text, level=2)
-                    else:
-                        doc.add_heading(heading_text, level=1)
-                else:
-                    doc.add_paragraph(paragraph.strip())
+        for paragraph in (p.strip() for p in article_text.split('\n\n')):
+            if not paragraph:
+                continue
+            heading = HEADING_RE.match(paragraph)
+            if heading:
+                doc.add_heading(heading.group(2), level=len(heading.group(1)))
+            else:
+                doc.add_paragraph(paragraph)
 
         # Add image if exists
         if Path(image_path).exists():
@@ -1,11 +1,33 @@
 # arxiv_paper_pulse/batch_processor.py
 
 import time
+import warnings
 from typing import List, Dict, Optional
 from google import genai
 from google.genai import types
 from . import config
 
+DEFAULT_SYSTEM_INSTRUCTION = """You are an expert scientific research analyst.
+Provide comprehensive, insightful analyses of research papers."""
+
+TERMINAL_STATES = frozenset({"SUCCEEDED", "COMPLETED", "FAILED", "CANCELLED", "EXPIRED"})
+
+
+def batch_state(status: Dict) -> str:
+    """
+    Normalized state name from a check_batch_status() result.
+
+    The SDK reports JobState enums such as JOB_STATE_SUCCEEDED; this returns
+    the bare name (SUCCEEDED) so callers can compare against plain strings.
+    """
+    state = status.get("state", "UNKNOWN")
+    return str(getattr(state, "value", state)).replace("JOB_STATE_", "")
+
+
+def is_terminal_state(state: str) -> bool:
+    """Whether a normalized batch state means the job will not change again."""
+    return state in TERMINAL_STATES
+
 
 class BatchPaperProcessor:
     """
@@ -13,47 +35,45 @@ class BatchPaperProcessor:
     Batch processing offers ~50% cost savings vs real-time processing.
     """
 
-    def __init__(self, model=None, api_key=None):
+    def __init__(self, model=None, api_key=None, client=None):
         """
         Initialize batch processor.
 
         Args:
             model: Model to use (default from config)
             api_key: API key (default from config)
+            client: Existing genai.Client to reuse instead of creating one
         """
         self.model = model or config.DEFAULT_MODEL
-        self.client = genai.Client(api_key=api_key or config.GEMINI_API_KEY)
+        self.client = client or genai.Client(api_key=api_key or config.GEMINI_API_KEY)
+
+    def _generation_config(self, system_instruction=None):
+        """Generation config shared by every request in a batch."""
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction or DEFAULT_SYSTEM_INSTRUCTION,
+            temperature=0.7,
+            top_p=0.95,
+            top_k=40
+        )
 
-    def _create_batch_request(self, paper, system_instruction=None):
+    def _create_batch_request(self, paper, system_instruction=None, generation_config=None):
         """
         Create a batch request for a single paper.
 
         Args:
             paper: Paper dict with abstract or prompt
             system_instruction: Optional system instruction
+            generation_config: Prebuilt config to reuse (overrides system_instruction)
 
         Returns:
             Batch request dict
         """
-        if system_instruction is None:
-            system_instruction = """You are an expert scientific research analyst.
-Provide comprehensive, insightful analyses of research papers."""
-
-        prompt = config.SUMMARY_PROMPT.format(
-            paper.get("abstract", paper.get("text", ""))
-        )
-
-        config_obj = types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            temperature=0.7,
-            top_p=0.95,
-            top_k=40
-        )
+        prompt = config.SUMMARY_PROMPT_TEMPLATE % (paper.get("abstract") or paper.get("text") or "")
 
         return {
             "model": f"models/{self.model}",
             "contents": [{"parts": [{"text": prompt}]}],
-            "config": config_obj
+            "config": generation_config or self._generation_config(system_instruction)
         }
 
     def submit_batch(self, papers: List[Dict], system_instruction=None) -> str:
@@ -72,17 +92,12 @@ Provide comprehensive, insightful analyses of research papers."""
 
         print(f"Submitting {len(papers)} papers for batch processing...")
 
-        # Create batch requests
-        batch_requests = []
-        for paper in papers:
-            try:
-                request = self._create_batch_request(paper, system_instruction)
-                batch_requests.append(request)
-            except Exception as e:
-                print(f"Failed to create request for {paper.get('title', 'Unknown')}: {e}")
-
-        if not batch_requests:
-            raise ValueError("No valid batch requests could be created")
+        # One request per paper, in order, so results line up with the submitted papers
+        generation_config = self._generation_config(system_instruction)
+        batch_requests = [
+            self._create_batch_request(paper, generation_config=generation_config)
+            for paper in papers
+        ]
 
         try:
             # Submit batch job (Note: Batch API structure may vary)
@@ -117,35 +132,48 @@ Provide comprehensive, insightful analyses of research papers."""
         except Exception as e:
             return {"id": batch_id, "error": str(e)}
 
-    def wait_for_completion(self, batch_id: str, max_wait_time=3600, check_interval=30) -> Dict:
+    def wait_for_completion(self, batch_id: str, max_wait_time=3600, max_interval=60,
+                            initial_interval=1.0, check_interval=None) -> Dict:
         """
         Wait for batch job to complete.
 
+        Polls with exponential backoff, so short jobs are noticed within seconds
+        while long ones are checked no more often than every max_interval seconds.
+
         Args:
             batch_id: Batch job ID
             max_wait_time: Maximum time to wait in seconds (default 1 hour)
-            check_interval: How often to check status in seconds
+            max_interval: Longest delay between status checks in seconds
+            initial_interval: Delay before the second status check in seconds
+            check_interval: Deprecated alias for max_interval
 
         Returns:
             Final status dict
         """
+        if check_interval is not None:
+            warnings.warn("check_interval is deprecated; use max_interval",
+                          DeprecationWarning, stacklevel=2)
+            max_interval = check_interval
+
         start_time = time.time()
+        delay = initial_interval
         print(f"Waiting for batch job {batch_id} to complete...")
 
         while time.time() - start_time < max_wait_time:
             status = self.check_batch_status(batch_id)
-            state = status.get("state", "UNKNOWN")
+            state = batch_state(status)
 
             if state in ["SUCCEEDED", "COMPLETED"]:
                 print(f"Batch job {batch_id} completed successfully")
                 return status
-            elif state in ["FAILED", "CANCELLED"]:
+            elif is_terminal_state(state):
                 print(f"Batch job {batch_id} {state.lower()}")
                 return status
 
             elapsed = int(time.time() - start_time)
             print(f"Batch job still processing... ({elapsed}s elapsed)")
-            time.sleep(check_interval)
+            time.sleep(delay)
+            delay = min(max_interval, delay * 1.5)
 
         print(f"Timeout waiting for batch job {batch_id}")
         return self.check_batch_status(batch_id)
@@ -1,29 +1,78 @@
 """Beehiiv RSS feed reader for fetching and parsing newsletter articles."""
-import feedparser
-import ssl
-import json
+import calendar
+import httpx
+import os
+import orjson
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Optional
+from hashlib import blake2b
+from itertools import islice
+from operator import attrgetter
+from typing import Iterator, List, Dict, NamedTuple, Optional
 from . import config
-from .utils import get_unique_id
+from .utils import get_unique_id, get_http_client
 
-# Handle SSL certificate issues (common on macOS)
-if hasattr(ssl, '_create_unverified_context'):
-    ssl._create_default_https_context = ssl._create_unverified_context
+_tag_term = attrgetter("term")
+
+
+class _CachedFeed(NamedTuple):
+    """A parsed feed plus what's needed to decide when and how to refetch it."""
+    fetched_at: float
+    ttl: float
+    feed_data: Dict
+    index: Dict[str, Dict]
+    validators: Optional[Dict[str, str]]
+
+
+# Parsed feeds by URL, shared by every reader instance
+_feed_cache: Dict[str, _CachedFeed] = {}
+_feed_cache_lock = threading.Lock()
+
+
+def _publish_interval(entries, sample_size: int = 10) -> Optional[float]:
+    """Median seconds between the most recent posts, or None with fewer than two dated posts."""
+    timestamps = sorted(
+        (calendar.timegm(parsed) for parsed in
+         (entry.get("published_parsed") or entry.get("updated_parsed") for entry in entries) if parsed),
+        reverse=True,
+    )[:sample_size]
+    if len(timestamps) < 2:
+        return None
+    return statistics.median(newer - older for newer, older in zip(timestamps, timestamps[1:]))
+
+
+def _index_articles(articles: List[Dict]) -> Dict[str, Dict]:
+    """Map each article's id and link to the article; the first article with a key wins."""
+    index = {}
+    for article in articles:
+        index.setdefault(article.get("id"), article)
+        index.setdefault(article.get("link"), article)
+    return index
 
 
 class BeehiivReader:
     """Reads and manages Beehiiv RSS feeds."""
 
-    def __init__(self, feed_url: str):
+    # How long a parsed feed is reused before the RSS is downloaded again. Feeds
+    # that publish rarely are reused for a quarter of their typical gap between
+    # posts, up to MAX_CACHE_TTL_SECONDS.
+    CACHE_TTL_SECONDS = 300
+    MAX_CACHE_TTL_SECONDS = 6 * 3600
+
+    def __init__(self, feed_url: str, http_client: Optional[httpx.Client] = None):
         """
         Initialize Beehiiv reader.
 
         Args:
             feed_url: URL of the Beehiiv RSS feed
+            http_client: Pooled HTTP client to fetch with (defaults to the shared client)
         """
         self.feed_url = feed_url
+        self.http_client = http_client or get_http_client()
         self._ensure_directories()
 
     def _ensure_directories(self):
@@ -31,6 +80,37 @@ class BeehiivReader:
         beehiiv_dir = Path(config.BEEHIIV_DATA_DIR)
         beehiiv_dir.mkdir(parents=True, exist_ok=True)
 
+    def _parse_feed(self, validators: Optional[Dict[str, str]] = None):
+        """
+        Download the feed over the pooled client and parse it.
+
+        Args:
+            validators: ETag/Last-Modified from a previous fetch, sent as a conditional GET
+
+        Returns:
+            Tuple of (parsed feed, or None if unchanged since validators; new validators)
+        """
+        import feedparser  # Deferred: heavy, and unneeded for reading stored snapshots
+
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            response = self.http_client.get(self.feed_url, headers=headers)
+            if response.status_code == 304 and headers:
+                return None, validators
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise ValueError(f"Failed to fetch RSS feed: {e}")
+        new_validators = {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        return feedparser.parse(response.content), new_validators
+
     def fetch_feed(self, force_refresh: bool = False) -> Dict:
         """
         Fetch and parse the RSS feed.
@@ -41,37 +121,39 @@ class BeehiivReader:
         Returns:
             Dictionary with feed metadata and articles
         """
-        feed = feedparser.parse(self.feed_url)
+        with _feed_cache_lock:
+            cached = _feed_cache.get(self.feed_url)
+        if cached and not force_refresh and time.monotonic() - cached.fetched_at < cached.ttl:
+            return cached.feed_data
+
+        # Revalidate with the previous ETag/Last-Modified; a 304 skips download and parse
+        feed, validators = self._parse_feed(cached.validators if cached else None)
+        if feed is None:
+            with _feed_cache_lock:
+                _feed_cache[self.feed_url] = cached._replace(fetched_at=time.monotonic())
+            return cached.feed_data
 
         if feed.bozo:
             raise ValueError(f"Failed to parse RSS feed: {feed.bozo_exception}")
 
-        feed_info = feed.feed
-
         # Extract feed metadata
-        feed_data = {
-            "feed_url": self.feed_url,
-            "title": feed_info.get("title", "Unknown"),
-            "description": feed_info.get("subtitle") or feed_info.get("description", ""),
-            "link": feed_info.get("link", ""),
-            "language": feed_info.get("language", ""),
-            "updated": feed_info.get("updated") or feed_info.get("published", ""),
-            "categories": [tag.term for tag in feed_info.tags] if "tags" in feed_info else [],
-            "image_url": feed_info.image.get("href") if "image" in feed_info and isinstance(feed_info.image, dict) else None,
-            "articles": []
-        }
+        feed_data = self._extract_feed_meta(self.feed_url, feed.feed)
+        feed_data["articles"] = []
 
         # Extract articles
         for entry in feed.entries:
+            g = entry.get
+            content = g("content")
+            tags = g("tags")
             article = {
-                "title": entry.get("title", "Untitled"),
-                "link": entry.get("link", ""),
-                "published": entry.get("published") or entry.get("updated", ""),
-                "summary": entry.get("summary", ""),
-                "content": entry.get("content", [{}])[0].get("value", "") if entry.get("content") else "",
-                "author": entry.get("author", ""),
-                "tags": [tag.term for tag in entry.tags] if "tags" in entry else [],
-                "id": entry.get("id") or entry.get("link", ""),
+                "title": g("title", "Untitled"),
+                "link": g("link", ""),
+                "published": g("published") or g("updated", ""),
+                "summary": g("summary", ""),
+                "content": content[0].get("value", "") if content else "",
+                "author": g("author", ""),
+                "tags": list(map(_tag_term, tags)) if tags else [],
+                "id": g("id") or g("link", ""),
                 "feed_url": self.feed_url
             }
             feed_data["articles"].append(article)
@@ -80,19 +162,47 @@ class BeehiivReader:
         if not force_refresh:
             self._save_feed_data(feed_data)
 
+        interval = _publish_interval(feed.entries)
+        ttl = self.CACHE_TTL_SECONDS
+        if interval:
+            ttl = min(max(ttl, interval / 4), self.MAX_CACHE_TTL_SECONDS)
+        with _feed_cache_lock:
+            _feed_cache[self.feed_url] = _CachedFeed(
+                time.monotonic(), ttl, feed_data, _index_articles(feed_data["articles"]), validators
+            )
+
         return feed_data
 
+    def invalidate(self):
+        """Drop the cached copy of this feed so the next fetch downloads it again."""
+        with _feed_cache_lock:
+            _feed_cache.pop(self.feed_url, None)
+
     def _create_file_path(self, directory: Path, prefix: str) -> Path:
-        """Create a timestamped file path."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return directory / f"{prefix}_{timestamp}.json"
+        """Create a file path stamped with the current time in epoch milliseconds."""
+        return directory / f"{prefix}_{int(time.time() * 1000)}.json"
 
     def _save_feed_data(self, feed_data: Dict):
-        """Save feed data to JSON file."""
+        """Save feed data to JSON file, unless it is identical to this feed's last snapshot."""
         beehiiv_dir = Path(config.BEEHIIV_DATA_DIR)
+        payload = orjson.dumps(feed_data, option=orjson.OPT_INDENT_2)
+        digest = blake2b(payload, digest_size=16).hexdigest()
+
+        # One digest file per feed, since several feeds share the directory
+        digest_path = beehiiv_dir / f".last_digest_{blake2b(self.feed_url.encode(), digest_size=8).hexdigest()}"
+        try:
+            if digest_path.read_text() == digest:
+                return
+        except FileNotFoundError:
+            pass
+
+        # Write to a temp name and rename, so readers never see a partial snapshot
         file_path = self._create_file_path(beehiiv_dir, "beehiiv_feed")
-        with open(file_path, "w") as f:
-            json.dump(feed_data, f, indent=2)
+        tmp_path = file_path.with_suffix(".json.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, file_path)
+        digest_path.write_text(digest)
         print(f"Saved Beehiiv feed data to {file_path}")
 
     def get_latest_articles(self, limit: Optional[int] = None) -> List[Dict]:
@@ -125,11 +235,14 @@ class BeehiivReader:
         """
         feed_data = self.fetch_feed()
 
-        for article in feed_data.get("articles", []):
-            if article.get("id") == article_id or article.get("link") == article_id:
-                return article
+        with _feed_cache_lock:
+            cached = _feed_cache.get(self.feed_url)
+        if cached and cached.feed_data is feed_data:
+            index = cached.index
+        else:
+            index = _index_articles(feed_data.get("articles", []))
 
-        return None
+        return index.get(article_id)
 
     def get_feed_info(self) -> Dict:
         """
@@ -138,48 +251,113 @@ class BeehiivReader:
         Returns:
             Dictionary with feed information
         """
-        feed = feedparser.parse(self.feed_url)
+        # Served from the feed cache when fresh; a miss fetches and caches the feed
+        feed_data = self.fetch_feed()
+        feed_info = {key: value for key, value in feed_data.items() if key != "articles"}
+        feed_info["article_count"] = len(feed_data["articles"])
+        return feed_info
+
+    @staticmethod
+    def _extract_feed_meta(feed_url: str, feed_info) -> Dict:
+        """Feed-level metadata shared by fetch_feed and get_feed_info."""
+        get = feed_info.get
+        tags = get("tags")
+        image = get("image")
+        return {
+            "feed_url": feed_url,
+            "title": get("title", "Unknown"),
+            "description": get("subtitle") or get("description", ""),
+            "link": get("link", ""),
+            "language": get("language", ""),
+            "updated": get("updated") or get("published", ""),
+            "categories": list(map(_tag_term, tags)) if tags else [],
+            "image_url": image.get("href") if isinstance(image, dict) else None,
+        }
 
-        if feed.bozo:
-            raise ValueError(f"Failed to parse RSS feed: {feed.bozo_exception}")
 
-        feed_info = feed.feed
+def _snapshot_time(path: str) -> int:
+    """
+    Epoch milliseconds a snapshot was saved at, taken from its file name.
 
-        return {
-            "feed_url": self.feed_url,
-            "title": feed_info.get("title", "Unknown"),
-            "description": feed_info.get("subtitle") or feed_info.get("description", ""),
-            "link": feed_info.get("link", ""),
-            "language": feed_info.get("language", ""),
-            "updated": feed_info.get("updated") or feed_info.get("published", ""),
-            "categories": [tag.term for tag in feed_info.tags] if "tags" in feed_info else [],
-            "image_url": feed_info.image.get("href") if "image" in feed_info and isinstance(feed_info.image, dict) else None,
-            "article_count": len(feed.entries)
-        }
+    Older snapshots were named with a local "%Y%m%d_%H%M%S" timestamp, which
+    would sort after every millisecond name, so those are converted.
+    """
+    stamp = os.path.basename(path)[len("beehiiv_feed_"):-len(".json")]
+    if stamp.isdigit():
+        return int(stamp)
+    try:
+        return int(time.mktime(time.strptime(stamp, "%Y%m%d_%H%M%S")) * 1000)
+    except ValueError:
+        return 0
 
 
-def get_stored_articles() -> List[Dict]:
+STORED_READ_WORKERS = 8
+
+
+def _read_snapshot(path: str) -> Optional[Dict]:
     """
-    Get all articles from stored feed files.
+    Load one stored feed file, or None (after reporting why) if it can't be read.
 
-    Returns:
-        List of all articles across all stored feeds
+    Read directly rather than through the memoized load_json_file, so each
+    snapshot is freed once its articles have been yielded.
     """
-    beehiiv_dir = Path(config.BEEHIIV_DATA_DIR)
+    try:
+        return orjson.loads(Path(path).read_bytes())
+    except (OSError, orjson.JSONDecodeError) as e:
+        print(f"Error reading {path}: {e}")
+        return None
 
-    if not beehiiv_dir.exists():
-        return []
 
-    all_articles = []
-    feed_files = sorted(beehiiv_dir.glob("beehiiv_feed_*.json"), reverse=True)
+def iter_stored_articles() -> Iterator[Dict]:
+    """
+    Iterate over articles from stored feed files.
 
-    for feed_file in feed_files:
-        try:
-            with open(feed_file, "r") as f:
-                feed_data = json.load(f)
-                articles = feed_data.get("articles", [])
-                all_articles.extend(articles)
-        except Exception as e:
-            print(f"Error reading {feed_file}: {e}")
-
-    return all_articles
+    Yields:
+        Articles across all stored feeds, newest snapshot first. Snapshots
+        overlap, so each article (by id, else link) is yielded once, as stored
+        in the newest snapshot that contains it. Only a few snapshots are held
+        at a time, and callers that stop early never read the oldest ones.
+    """
+    try:
+        with os.scandir(config.BEEHIIV_DATA_DIR) as entries:
+            feed_files = sorted(
+                (entry.path for entry in entries
+                 if entry.name.startswith("beehiiv_feed_") and entry.name.endswith(".json") and entry.is_file()),
+                key=_snapshot_time,
+                reverse=True,
+            )
+    except FileNotFoundError:
+        return
+    if not feed_files:
+        return
+
+    seen = set()
+    paths = iter(feed_files)
+
+    # Read ahead a bounded window of snapshots on the pool, consuming them in order
+    with ThreadPoolExecutor(max_workers=min(STORED_READ_WORKERS, len(feed_files))) as executor:
+        pending = deque(executor.submit(_read_snapshot, path)
+                        for path in islice(paths, STORED_READ_WORKERS))
+        while pending:
+            feed_data = pending.popleft().result()
+            for path in islice(paths, 1):
+                pending.append(executor.submit(_read_snapshot, path))
+            if feed_data is None:
+                continue
+            for article in feed_data.get("articles", []):
+                article_id = article.get("id") or article.get("link")
+                if article_id:
+                    if article_id in seen:
+                        continue
+                    seen.add(article_id)
+                yield article
+
+
+def get_stored_articles() -> List[Dict]:
+    """
+    Get all articles from stored feed files.
+
+    Returns:
+        List of the articles yielded by iter_stored_articles()
+    """
+    return list(iter_stored_articles())
@@ -6,17 +6,199 @@ Single AI unit with display capabilities for multi-agent systems.
 
 import sqlite3
 import json
-import hashlib
+import math
+from hashlib import blake2b
 import os
 import time
 import re
+import zlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional, Any, Union
 import numpy as np
+import orjson
 from google import genai
 from . import config
 
+# Hot-path statements, kept as constants so each is prepared once per connection
+# and then served from sqlite3's statement cache
+_SQL_INSERT_API_LOG_IN = (
+    "INSERT INTO api_logs (timestamp, direction, content, prompt_hash, model) VALUES (?, 'in', ?, ?, ?)"
+)
+_SQL_INSERT_API_LOG_OUT = (
+    "INSERT INTO api_logs (timestamp, direction, content, response_hash, model, response_time) "
+    "VALUES (?, 'out', ?, ?, ?, ?)"
+)
+_SQL_UPSERT_MEMORY = "INSERT OR REPLACE INTO memory (key, namespace, value, timestamp, metadata) VALUES (?, ?, ?, ?, ?)"
+_SQL_INSERT_THOUGHT = "INSERT INTO thoughts (timestamp, thought_type, content, tags, parent_id) VALUES (?, ?, ?, ?, ?)"
+_SQL_INSERT_ACTION = "INSERT INTO actions (timestamp, action_type, details) VALUES (?, ?, ?)"
+# attempt_number is the request's response count plus one, counted on idx_responses_request
+_SQL_INSERT_RESPONSE = (
+    "INSERT INTO responses (request_id, response_text, attempt_number, timestamp, metadata) "
+    "SELECT ?1, ?2, COUNT(*) + 1, ?3, ?4 FROM responses WHERE request_id = ?1"
+)
+_SQL_THOUGHT_CHAIN = """
+    WITH RECURSIVE chain(id, timestamp, thought_type, content, parent_id, depth) AS (
+        SELECT id, timestamp, thought_type, content, parent_id, 0 FROM thoughts WHERE id = ?
+        UNION ALL
+        SELECT t.id, t.timestamp, t.thought_type, t.content, t.parent_id, chain.depth + 1
+        FROM thoughts t JOIN chain ON t.id = chain.parent_id
+    )
+    SELECT id, timestamp, thought_type, content, parent_id FROM chain ORDER BY depth DESC
+"""
+STATEMENT_CACHE_SIZE = 256
+# RETURNING clauses need SQLite 3.35+; older libraries take the two-statement paths
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# context.md structure: lines starting a section, and candidate header lines (group 1 is the stripped line)
+_SECTION_RE = re.compile(r'^##', re.MULTILINE)
+_HEADER_LINE_RE = re.compile(r'^[^\S\n]*(##[^\n]*?)[^\S\n]*$', re.MULTILINE)
+# A line ending (\r\n, \r or \n) with any whitespace trailing the line before it
+_LINE_END_RE = re.compile(r'[^\S\r\n]*(?:\r\n?|\n)')
+_LAST_UPDATED_RE = re.compile(r"(-\s*Last Updated:\s*)(.*)")
+# Request normalization maps each line break to a space in one C-level pass
+_LINE_BREAKS_TO_SPACES = str.maketrans('\r\n', '  ')
+
+# Bumped when stored data must be migrated; tracked in PRAGMA user_version
+# (1: request hashes switched from SHA-256 to BLAKE2b; 2: requests.embedding_dtype;
+#  3: context_snapshots index of history files; 4: request hashes stored as raw digest bytes)
+SCHEMA_VERSION = 4
+
+# Storage type for request embeddings; rows written before it was recorded are float32.
+# "int8" rows are a float32 scale followed by the values quantized to [-127, 127].
+EMBEDDING_DTYPE = "int8"
+_INT8_SCALE = np.dtype(np.float32)
+
+# Embeddings kept in memory per bot, keyed by text digest (least recently used evicted first)
+EMBEDDING_CACHE_SIZE = 256
+
+# api_logs payloads at least this large are stored zlib-compressed as BLOBs; smaller ones stay TEXT
+LOG_COMPRESS_MIN_BYTES = 512
+
+
+def _now_iso():
+    """Current local time as a fixed-width ISO string, so stored timestamps sort correctly."""
+    return datetime.now().isoformat(timespec='microseconds')
+
+
+def _dumps(obj):
+    """Compact JSON text for log/memory columns (UTF-8 kept as-is, not \\u-escaped)."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _content_hash(text):
+    """Hex digest used to address/deduplicate text (not a security boundary)."""
+    return blake2b(text.encode(), digest_size=32).hexdigest()
+
+
+def _normalize_request_text(text):
+    """Normalize request text for matching."""
+    return text.lower().strip().translate(_LINE_BREAKS_TO_SPACES)
+
+
+@lru_cache(maxsize=1024)
+def _request_hash(text):
+    """
+    Raw 32-byte digest of normalized request text, memoized so a lookup followed by a
+    record hashes once. Stored as a BLOB: half the key size of hex in the UNIQUE index.
+    """
+    return blake2b(_normalize_request_text(text).encode(), digest_size=32).digest()
+
+
+def _pack_log_content(obj):
+    """Encode an api_logs payload: JSON text, or a compressed BLOB when it is large."""
+    data = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    if len(data) < LOG_COMPRESS_MIN_BYTES:
+        return data.decode()
+    return zlib.compress(data, 1)
+
+
+def _unpack_log_content(value):
+    """Decode an api_logs payload written by _pack_log_content (TEXT or compressed BLOB)."""
+    if isinstance(value, bytes):
+        value = zlib.decompress(value)
+    return orjson.loads(value)
+
+
+def _pack_embedding(embedding, dtype=None):
+    """Encode an embedding for the requests table; returns (blob, dtype name)."""
+    dtype = dtype or EMBEDDING_DTYPE
+    if dtype != "int8":
+        return np.asarray(embedding, dtype=dtype).tobytes(), dtype
+    vector = np.asarray(embedding, dtype=np.float32)
+    peak = float(np.abs(vector).max()) if vector.size else 0.0
+    scale = np.float32(peak / 127 if peak else 1.0)
+    quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+    return scale.tobytes() + quantized.tobytes(), dtype
+
+
+def _embedding_nbytes(dim, dtype=None):
+    """Size of one stored embedding of the given dimension."""
+    if dtype == "int8":
+        return _INT8_SCALE.itemsize + dim
+    return dim * np.dtype(dtype or "float32").itemsize
+
+
+def _unpack_embedding(blob, dtype=None, dim=None):
+    """
+    Decode a stored embedding (or several concatenated, each of dimension dim) back to
+    a flat float32 array.
+    """
+    if dtype != "int8":
+        return np.frombuffer(blob, dtype=dtype or "float32").astype(np.float32)
+    row_bytes = _embedding_nbytes(dim, dtype) if dim is not None else len(blob)
+    rows = np.frombuffer(blob, dtype=np.uint8).reshape(-1, row_bytes)
+    scales = rows[:, :_INT8_SCALE.itemsize].copy().view(np.float32)
+    return (rows[:, _INT8_SCALE.itemsize:].view(np.int8) * scales).ravel()
+
+
+# External memory databases opened by any Bot in this process, so bots coupled to the
+# same file share one connection: resolved path -> [connection, lock, refcount]
+_external_pool = {}
+_external_pool_lock = threading.Lock()
+
+
+def _acquire_external_conn(path):
+    """Return (connection, lock) for an external memory database, opening it on first use."""
+    key = str(Path(path).resolve())
+    with _external_pool_lock:
+        entry = _external_pool.get(key)
+        if entry is None:
+            is_new = not Path(path).exists()
+            conn = Bot._connect(path)
+            if is_new:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS memory (
+                        key TEXT PRIMARY KEY,
+                        namespace TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        timestamp TEXT NOT NULL,
+                        metadata TEXT
+                    )
+                """)
+            entry = _external_pool[key] = [conn, threading.RLock(), 0]
+        entry[2] += 1
+        return entry[0], entry[1]
+
+
+def _release_external_conn(path):
+    """Drop one reference to an external memory database, closing it when none remain."""
+    key = str(Path(path).resolve())
+    with _external_pool_lock:
+        entry = _external_pool.get(key)
+        if entry is None:
+            return
+        entry[2] -= 1
+        if entry[2] <= 0:
+            del _external_pool[key]
+            with entry[1]:
+                entry[0].close()
+
 
 class Bot:
     """
@@ -70,12 +252,25 @@ class Bot:
         self.context_history_dir.mkdir(parents=True, exist_ok=True)
         self.context_max_bytes = config.CONTEXT_MAX_BYTES
         self.context_history_retention = config.CONTEXT_HISTORY_RETENTION
+        self._context_cache = None  # (mtime_ns, size, content) last returned by _get_context_for_prompt
 
         # Display buffer
         self.display_buffer = []
 
         # External memory state
         self.external_memory_path = None
+        self._external_conn = None  # shared via _external_pool with other bots on the same file
+        self._external_lock = None
+
+        # Safety protocol lookups, reused until the working directory / permissions file changes
+        self._workspace_root = None  # (cwd, root, resolved root)
+        self._permissions_cache = None  # (file, mtime_ns, size, allowed paths, denied paths), resolved
+
+        # One long-lived connection per database, shared across threads under a lock
+        self._conn_lock = threading.RLock()
+        self._conn = self._connect(self.db_path)
+        self._batch_depth = 0
+        self._action_buffer = []  # actions logged inside a batch, inserted together when it ends
 
         # Initialize database
         self._init_database()
@@ -85,12 +280,98 @@ class Bot:
 
         # Embedding client (lazy initialization)
         self._embedding_client = None
+        self._embedding_index = None
+        self._embedding_cache = OrderedDict()  # _content_hash(text) -> float32 embedding
+        self._embedding_cache_lock = threading.Lock()
+
+        # Background log writer (lazy initialization)
+        self._log_writer = None
+
+    @staticmethod
+    def _connect(path):
+        """Open a connection in autocommit mode, usable from any thread (callers hold _conn_lock)."""
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        Bot._configure_connection(conn)
+        return conn
+
+    @staticmethod
+    def _configure_connection(conn):
+        """Use WAL with NORMAL sync so small writes don't each wait on an fsync; enlarge caches."""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA busy_timeout=5000")
+
+    def close(self):
+        """Finish pending log writes and close the bot's database connections."""
+        if self._log_writer is not None:
+            self._log_writer.shutdown(wait=True)
+            self._log_writer = None
+        self._release_external()
+        with self._conn_lock:
+            self._conn.close()
+
+    def _release_external(self):
+        """Give this bot's external connection back to the shared pool."""
+        if self._external_conn is not None:
+            _release_external_conn(self.external_memory_path)
+        self._external_conn = self._external_lock = self.external_memory_path = None
+
+    def begin_batch(self):
+        """
+        Start grouping writes into one transaction (nestable).
+
+        Until the matching end_batch(), this thread holds the connection and
+        every write joins a single transaction, committed once at the end.
+        Actions logged meanwhile are buffered and inserted with one executemany.
+        """
+        self._conn_lock.acquire()
+        if self._batch_depth == 0:
+            self._conn.execute("BEGIN")
+        self._batch_depth += 1
+
+    def end_batch(self, commit=True):
+        """Finish a batch started with begin_batch(); the outermost call commits (or rolls back)."""
+        try:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                try:
+                    if commit:
+                        self._flush_actions()
+                except BaseException:
+                    commit = False
+                    raise
+                finally:
+                    self._action_buffer.clear()
+                    self._conn.execute("COMMIT" if commit else "ROLLBACK")
+        finally:
+            self._conn_lock.release()
+
+    def _flush_actions(self):
+        """Insert actions buffered by the current batch (caller holds _conn_lock)."""
+        if self._action_buffer:
+            self._conn.executemany(_SQL_INSERT_ACTION, self._action_buffer)
+            self._action_buffer.clear()
+
+    @contextmanager
+    def batch(self):
+        """Context manager around begin_batch()/end_batch(); rolls back if the block raises."""
+        self.begin_batch()
+        try:
+            yield self
+        except BaseException:
+            self.end_batch(commit=False)
+            raise
+        self.end_batch()
 
     def _init_database(self):
         """Initialize SQLite database with all tables."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._conn_lock:
             # Memory table
-            conn.execute("""
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS memory (
                     key TEXT PRIMARY KEY,
                     namespace TEXT NOT NULL,
@@ -101,7 +382,7 @@ class Bot:
             """)
 
             # Thoughts table
-            conn.execute("""
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS thoughts (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
@@ -114,10 +395,10 @@ class Bot:
             """)
 
             # Requests table
-            conn.execute("""
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS requests (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    request_hash TEXT UNIQUE NOT NULL,
+                    request_hash BLOB UNIQUE NOT NULL,
                     request_text TEXT NOT NULL,
                     timestamp TEXT NOT NULL,
                     embedding BLOB
@@ -125,7 +406,7 @@ class Bot:
             """)
 
             # Responses table
-            conn.execute("""
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS responses (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     request_id INTEGER NOT NULL,
@@ -139,7 +420,7 @@ class Bot:
             """)
 
             # Actions table
-            conn.execute("""
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS actions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
@@ -150,7 +431,7 @@ class Bot:
             """)
 
             # API logs table
-            conn.execute("""
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS api_logs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp TEXT NOT NULL,
@@ -163,13 +444,66 @@ class Bot:
                 )
             """)
 
-            # Create indexes
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_requests_hash ON requests(request_hash)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_namespace ON memory(namespace)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_thoughts_tags ON thoughts(tags)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_type ON actions(action_type)")
+            # Context snapshot index (files live in context_history_dir)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS context_snapshots (
+                    name TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    reason TEXT
+                )
+            """)
 
-            conn.commit()
+            # Create indexes
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_context_snapshots_created ON context_snapshots(created_at)")
+            # request_hash is UNIQUE, so its automatic index already serves lookups; a second one only slows writes
+            self._conn.execute("DROP INDEX IF EXISTS idx_requests_hash")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_memory_namespace ON memory(namespace)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_thoughts_tags ON thoughts(tags)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_type ON actions(action_type)")
+            # Let the newest-first listings walk an index instead of sorting the whole table
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_request "
+                               "ON responses(request_id, attempt_number DESC)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_timestamp ON actions(timestamp DESC)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_actions_reflected "
+                               "ON actions(timestamp DESC) WHERE reflection IS NOT NULL")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_thoughts_timestamp ON thoughts(timestamp DESC)")
+
+            self._migrate_database()
+
+    def _migrate_database(self):
+        """Bring data written by older versions up to SCHEMA_VERSION."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        with self.batch():
+            if version < 1:
+                # Recompute request hashes so exact matching keeps finding old requests
+                rows = self._conn.execute("SELECT id, request_text FROM requests").fetchall()
+                self._conn.executemany(
+                    "UPDATE requests SET request_hash = ? WHERE id = ?",
+                    [(self._hash_request(text), request_id) for request_id, text in rows]
+                )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(requests)")}
+            if version < 2 and "embedding_dtype" not in columns:
+                # NULL means the legacy float32 layout
+                self._conn.execute("ALTER TABLE requests ADD COLUMN embedding_dtype TEXT")
+            if version < 3:
+                # Index snapshots written before the table existed, dated by file mtime
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO context_snapshots (name, created_at) VALUES (?, ?)",
+                    [(path.name, datetime.fromtimestamp(path.stat().st_mtime).isoformat(timespec='microseconds'))
+                     for path in self.context_history_dir.glob("context_*.md")]
+                )
+            if version < 4:
+                # Hex digests become the raw bytes they encode (rows rehashed above already are bytes)
+                rows = self._conn.execute(
+                    "SELECT id, request_hash FROM requests WHERE typeof(request_hash) = 'text'"
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE requests SET request_hash = ? WHERE id = ?",
+                    [(bytes.fromhex(request_hash), request_id) for request_id, request_hash in rows]
+                )
+            self._conn.execute(f"PRAGMA user_version = {int(SCHEMA_VERSION)}")
 
     def _init_context_file(self):
         """Initialize context.md file if it doesn't exist."""
@@ -240,47 +574,33 @@ class Bot:
         """
         def modifier(existing):
             existing = (existing or "").rstrip('\n')
-            lines = existing.split('\n') if existing else []
 
-            def ensure_blank_before(idx):
-                if idx > 0 and lines[idx - 1].strip():
-                    lines.insert(idx, "")
-                    return idx + 1
-                return idx
+            def joiner(before):
+                # Keep a blank line between the preceding text and the new content
+                last_line = before[before.rfind('\n') + 1:]
+                return "\n\n" if last_line.strip() else "\n"
 
             if section:
                 header = section.strip()
                 if not header.startswith("##"):
                     header = f"## {header}"
 
-                section_index = None
-                for i, line in enumerate(lines):
-                    if line.strip() == header:
-                        section_index = i
-                        break
-
-                if section_index is None:
-                    if lines and lines[-1].strip():
-                        lines.append("")
-                    lines.append(header)
-                    lines.append(content)
-                else:
-                    insert_index = section_index + 1
-                    for i in range(section_index + 1, len(lines)):
-                        if lines[i].startswith('##'):
-                            insert_index = i
-                            break
-                        insert_index = i + 1
-                    insert_index = ensure_blank_before(insert_index)
-                    lines.insert(insert_index, content)
-                return "\n".join(lines)
+                span = self._section_span(existing, header)
+                if span is None:
+                    if not existing:
+                        return f"{header}\n{content}"
+                    return f"{existing}{joiner(existing)}{header}\n{content}"
+
+                # Insert at the end of the section, just before the next header
+                _, next_start = span
+                if next_start is None:
+                    return f"{existing}{joiner(existing)}{content}"
+                before = existing[:next_start - 1]
+                return f"{before}{joiner(before)}{content}\n{existing[next_start:]}"
 
             # No section specified
-            if lines:
-                if lines[-1].strip():
-                    lines.append("")
-                lines.append(content)
-                return "\n".join(lines)
+            if existing:
+                return f"{existing}{joiner(existing)}{content}"
             return content
 
         updated = modifier(self.get_context())
@@ -300,56 +620,72 @@ class Bot:
 
         def modifier(existing):
             existing = existing or ""
-            lines = existing.split('\n') if existing else []
-            section_index = None
-            for i, line in enumerate(lines):
-                if line.strip() == header:
-                    section_index = i
-                    break
-
-            if section_index is None:
-                new_lines = lines + (["", header, content] if lines else [header, content])
-                return "\n".join(new_lines)
-
-            end_index = section_index + 1
-            for i in range(section_index + 1, len(lines)):
-                if lines[i].startswith('##'):
-                    end_index = i
-                    break
-                end_index = i + 1
-
-            new_lines = lines[:section_index + 1] + [content] + lines[end_index:]
-            return "\n".join(new_lines)
+            span = self._section_span(existing, header)
+            if span is None:
+                return f"{existing}\n\n{header}\n{content}" if existing else f"{header}\n{content}"
+
+            # Replace everything between the header line and the next header
+            line_end, next_start = span
+            if next_start is None:
+                return f"{existing[:line_end]}\n{content}"
+            return f"{existing[:line_end]}\n{content}\n{existing[next_start:]}"
 
         updated = modifier(self.get_context())
         self._write_context(updated, action='section_update', metadata={'section': section_name})
 
+    @staticmethod
+    def _section_span(content, header):
+        """
+        Locate a "## ..." section in context markdown.
+
+        Returns (end of the header line, start of the next line beginning with
+        "##" or None) for the first line that equals header once stripped, or
+        None if there is no such line.
+        """
+        for match in _HEADER_LINE_RE.finditer(content):
+            if match.group(1) == header:
+                line_end = match.end()
+                if line_end == len(content):
+                    return line_end, None
+                next_header = _SECTION_RE.search(content, line_end + 1)
+                return line_end, next_header.start() if next_header else None
+        return None
+
     def list_context_history(self, limit=None):
         """List available context snapshots (newest first)."""
-        snapshots = sorted(self.context_history_dir.glob("context_*.md"), reverse=True)
+        limit_value = -1  # SQLite: no limit
         if limit is not None:
             try:
-                limit_value = int(limit)
-                if limit_value >= 0:
-                    snapshots = snapshots[:limit_value]
+                limit_value = max(-1, int(limit))
             except (ValueError, TypeError):
                 pass
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT name, created_at FROM context_snapshots ORDER BY created_at DESC LIMIT ?",
+                (limit_value,)
+            ).fetchall()
         return [
             {
-                'path': str(path),
-                'name': path.name,
-                'modified': datetime.fromtimestamp(path.stat().st_mtime).isoformat(),
+                'path': str(self.context_history_dir / name),
+                'name': name,
+                'modified': created_at,
             }
-            for path in snapshots
+            for name, created_at in rows
         ]
 
     def load_context_snapshot(self, snapshot: Union[int, str, Path]):
         """Load snapshot content by index or path."""
         if isinstance(snapshot, int):
-            snapshots = sorted(self.context_history_dir.glob("context_*.md"), reverse=True)
-            if snapshot < 0 or snapshot >= len(snapshots):
+            row = None
+            if snapshot >= 0:
+                with self._conn_lock:
+                    row = self._conn.execute(
+                        "SELECT name FROM context_snapshots ORDER BY created_at DESC LIMIT 1 OFFSET ?",
+                        (snapshot,)
+                    ).fetchone()
+            if row is None:
                 raise IndexError("Snapshot index out of range")
-            path = snapshots[snapshot]
+            path = self.context_history_dir / row[0]
         else:
             path = Path(snapshot)
             if not path.is_absolute():
@@ -362,11 +698,21 @@ class Bot:
 
     def _get_context_for_prompt(self):
         """Ensure context fits within size limit before inclusion in prompt."""
+        try:
+            st = self.context_file.stat()
+        except FileNotFoundError:
+            return ""
+        # Reuse the last checked content while the file is unchanged
+        cached = self._context_cache
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+
         content = self.get_context()
         if not content:
             return ""
 
-        if len(content.encode('utf-8')) <= self.context_max_bytes:
+        if self._utf8_length(content) <= self.context_max_bytes:
+            self._context_cache = (st.st_mtime_ns, st.st_size, content)
             return content
 
         # Context exceeds limit (likely edited externally) – snapshot & trim automatically
@@ -380,40 +726,42 @@ class Bot:
 
     def _write_context(self, content, *, action, metadata=None, snapshot_reason=None):
         """Normalize, limit, snapshot, and write context content."""
+        timestamp = _now_iso()
         normalized = self._normalize_context_content(content)
-        normalized = self._refresh_last_updated(normalized)
+        normalized = self._refresh_last_updated(normalized, timestamp)
 
-        encoded = normalized.encode('utf-8')
+        size = self._utf8_length(normalized)
         trimmed = False
-        if len(encoded) > self.context_max_bytes:
+        if size > self.context_max_bytes:
             self._save_context_snapshot(normalized, reason=snapshot_reason or action)
             normalized, trimmed = self._trim_context(normalized)
+            size = self._utf8_length(normalized)
 
         if not normalized.endswith('\n'):
             normalized += '\n'
+            size += 1
 
+        self._context_cache = None
         self.context_file.write_text(normalized, encoding='utf-8')
 
-        log_details = {'action': action, 'bytes': len(normalized.encode('utf-8'))}
+        log_details = {'action': action, 'bytes': size}
         if metadata:
             log_details.update(metadata)
         if trimmed:
             log_details['trimmed'] = True
-        self.log_action('context_update', log_details)
+        self.log_action('context_update', log_details, timestamp=timestamp)
 
     def _normalize_context_content(self, content):
-        normalized = (content or "").replace('\r\n', '\n').replace('\r', '\n')
-        lines = [line.rstrip() for line in normalized.split('\n')]
-        normalized = '\n'.join(lines).strip()
-        return normalized
+        # One pass: unify line endings and drop trailing whitespace before each
+        return _LINE_END_RE.sub('\n', content or "").strip()
 
-    def _refresh_last_updated(self, content):
-        timestamp = datetime.now().isoformat()
+    def _refresh_last_updated(self, content, timestamp=None):
+        timestamp = timestamp or _now_iso()
 
         def replacer(match):
             return f"{match.group(1)}{timestamp}"
 
-        updated, count = re.subn(r"(-\s*Last Updated:\s*)(.*)", replacer, content, count=1)
+        updated, count = _LAST_UPDATED_RE.subn(replacer, content, count=1)
         if count == 0:
             updated = updated.replace(
                 "## Current Status",
@@ -436,44 +784,60 @@ class Bot:
             header, body = "", content
 
         notice = "\n\n(… trimmed to fit context limit …)\n"
-        static_block = header + notice
-
-        if len(static_block.encode('utf-8')) >= max_bytes:
-            truncated = content
-            while len(truncated.encode('utf-8')) > max_bytes and truncated:
-                truncated = truncated[1:]
-            return truncated, True
-
-        # Trim from the front until fits
-        body_tail = body
-        while body_tail and len((static_block + body_tail).encode('utf-8')) > max_bytes:
-            body_tail = body_tail[1:]
-
-        trimmed = header + notice + body_tail
-        while len(trimmed.encode('utf-8')) > max_bytes and trimmed:
-            trimmed = trimmed[1:]
-
-        return trimmed, True
+        static_bytes = len((header + notice).encode('utf-8'))
+
+        if static_bytes >= max_bytes:
+            return self._utf8_tail(encoded, max_bytes), True
+
+        # Keep as much of the end of the body as fits after the header and notice
+        body_tail = self._utf8_tail(body.encode('utf-8'), max_bytes - static_bytes)
+        return header + notice + body_tail, True
+
+    @staticmethod
+    def _utf8_length(text):
+        """UTF-8 size of text; ASCII text (the usual case) is measured without encoding it."""
+        if text.isascii():
+            return len(text)
+        return len(text.encode('utf-8'))
+
+    @staticmethod
+    def _utf8_tail(encoded, max_bytes):
+        """Longest whole-character suffix of UTF-8 bytes that fits in max_bytes, decoded."""
+        if max_bytes <= 0:
+            return ""
+        # A cut inside a character leaves leading continuation bytes; 'ignore' drops them
+        return encoded[-max_bytes:].decode('utf-8', 'ignore')
 
     def _save_context_snapshot(self, content, reason):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        snapshot_path = self.context_history_dir / f"context_{timestamp}.md"
-        header = f"<!-- Snapshot created {datetime.now().isoformat()} | Reason: {reason} -->\n\n"
+        now = datetime.now()
+        snapshot_path = self.context_history_dir / f"context_{now.strftime('%Y%m%d_%H%M%S_%f')}.md"
+        header = f"<!-- Snapshot created {now.isoformat()} | Reason: {reason} -->\n\n"
         snapshot_path.write_text(header + content + ("\n" if not content.endswith('\n') else ""), encoding='utf-8')
+        with self._conn_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO context_snapshots (name, created_at, reason) VALUES (?, ?, ?)",
+                (snapshot_path.name, now.isoformat(timespec='microseconds'), reason)
+            )
         self.log_action('context_snapshot', {'path': str(snapshot_path), 'reason': reason})
         self._prune_context_history()
 
     def _prune_context_history(self):
         retention = max(0, int(self.context_history_retention))
-        snapshots = sorted(self.context_history_dir.glob("context_*.md"))
-        if retention == 0:
-            for path in snapshots:
-                path.unlink(missing_ok=True)
-            return
-
-        excess = len(snapshots) - retention
-        for path in snapshots[:max(0, excess)]:
-            path.unlink(missing_ok=True)
+        with self._conn_lock:
+            if _SQLITE_HAS_RETURNING:
+                pruned = self._conn.execute("""
+                    DELETE FROM context_snapshots WHERE name IN (
+                        SELECT name FROM context_snapshots ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                    ) RETURNING name
+                """, (retention,)).fetchall()
+            else:
+                pruned = self._conn.execute(
+                    "SELECT name FROM context_snapshots ORDER BY created_at DESC LIMIT -1 OFFSET ?",
+                    (retention,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM context_snapshots WHERE name = ?", pruned)
+        for (name,) in pruned:
+            (self.context_history_dir / name).unlink(missing_ok=True)
 
     # ============================================================================
     # 2. SYNCHRONOUS API INTEGRATION
@@ -492,45 +856,118 @@ class Bot:
             Response text from Gemini API
         """
         start_time = time.time()
-
-        # Log input
-        self._log_input(prompt, context)
-
-        # Build full prompt with context
-        full_prompt = self._build_prompt(prompt, context)
-
-        # Log action
-        self.log_action('api_call', {'prompt': prompt[:100], 'model': self.model, 'include_context': include_context})
+        logged_input = self._log_call_start(prompt, context, include_context)
 
         # Make synchronous Gemini API call
         try:
-            if include_context:
-                current_context = self._get_context_for_prompt()
-                prompt_with_context = f"{full_prompt}\n\n---\n\nCurrent Context (from context.md):\n{current_context}"
-            else:
-                prompt_with_context = full_prompt
-
             response = self.client.models.generate_content(
                 model=self.model,
-                contents=[self.system_instruction, prompt_with_context]
+                contents=self._call_contents(prompt, context, include_context)
             )
 
             response_text = response.text if hasattr(response, 'text') else str(response)
-            response_time = time.time() - start_time
+            self._log_call_end(prompt, response_text, start_time, logged_input)
+            return response_text
 
-            # Log output
-            self._log_output(response_text, {'model': self.model, 'response_time': response_time})
+        except Exception as e:
+            self._log_call_error(prompt, e, logged_input)
+            raise
 
-            # Record thought
-            self.record_thought('processing', f"Processed prompt: {prompt[:100]}...")
+    def process_stream(self, prompt, context=None, include_context=True):
+        """
+        Process a prompt like process(), yielding response text as it arrives.
 
-            return response_text
+        Args:
+            prompt: Input prompt text
+            context: Optional context dict
+            include_context: Whether to include context.md contents in the prompt
+
+        Yields:
+            Response text chunks from Gemini API; the full response is logged
+            once the stream ends
+        """
+        start_time = time.time()
+        logged_input = self._log_call_start(prompt, context, include_context)
+
+        parts = []
+        try:
+            stream = self.client.models.generate_content_stream(
+                model=self.model,
+                contents=self._call_contents(prompt, context, include_context)
+            )
+            for chunk in stream:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+
+            self._log_call_end(prompt, "".join(parts), start_time, logged_input)
 
         except Exception as e:
-            # Log error
-            self.log_action('api_call', {'error': str(e), 'prompt': prompt[:100]})
+            self._log_call_error(prompt, e, logged_input)
             raise
 
+    def _call_contents(self, prompt, context, include_context):
+        """System instruction and full prompt (with context.md if requested) for a Gemini call."""
+        full_prompt = self._build_prompt(prompt, context)
+        if include_context:
+            current_context = self._get_context_for_prompt()
+            full_prompt = f"{full_prompt}\n\n---\n\nCurrent Context (from context.md):\n{current_context}"
+        return [self.system_instruction, full_prompt]
+
+    def _log_call_start(self, prompt, context, include_context):
+        """
+        Log the input and api_call action on the background writer.
+
+        Returns a future; the writes overlap the Gemini request and are
+        awaited before anything about the call's outcome is logged. Inside
+        the caller's own batch() the writer thread could never get the
+        connection, so the input is then logged synchronously instead.
+        """
+        timestamp = _now_iso()
+
+        def write():
+            with self.batch():
+                self._log_input(prompt, context, timestamp=timestamp)
+                self.log_action('api_call', {'prompt': prompt[:100], 'model': self.model,
+                                             'include_context': include_context}, timestamp=timestamp)
+
+        if self._in_own_batch():
+            write()
+            logged = Future()
+            logged.set_result(None)
+            return logged
+        return self._get_log_writer().submit(write)
+
+    def _in_own_batch(self):
+        """True if the current thread is inside a begin_batch()/end_batch() block."""
+        if not self._conn_lock.acquire(blocking=False):
+            return False  # another thread holds the connection, so this one can't be batching
+        try:
+            return self._batch_depth > 0
+        finally:
+            self._conn_lock.release()
+
+    def _log_call_end(self, prompt, response_text, start_time, logged_input):
+        """Log output and record thought in one transaction, after the input log."""
+        response_time = time.time() - start_time
+        logged_input.result()
+        with self.batch():
+            self._log_output(response_text, {'model': self.model, 'response_time': response_time})
+            self.record_thought('processing', f"Processed prompt: {prompt[:100]}...")
+
+    def _log_call_error(self, prompt, error, logged_input):
+        """Log a failed call, after the input log."""
+        try:
+            logged_input.result()
+        finally:
+            self.log_action('api_call', {'error': str(error), 'prompt': prompt[:100]})
+
+    def _get_log_writer(self):
+        """Single background thread for log writes (lazy initialization)."""
+        if self._log_writer is None:
+            self._log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"bot-log-{self.name}")
+        return self._log_writer
+
     def _build_prompt(self, prompt, context=None):
         """Build full prompt with context."""
         parts = [prompt]
@@ -545,30 +982,23 @@ class Bot:
     # 3. I/O LOGGING SYSTEM
     # ============================================================================
 
-    def _log_input(self, prompt, context=None):
+    def _log_input(self, prompt, context=None, timestamp=None):
         """Log incoming request."""
-        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
-        content = json.dumps({'prompt': prompt, 'context': context})
+        prompt_hash = _content_hash(prompt)
+        content = _pack_log_content({'prompt': prompt, 'context': context})
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO api_logs (timestamp, direction, content, prompt_hash, model)
-                VALUES (?, 'in', ?, ?, ?)
-            """, (datetime.now().isoformat(), content, prompt_hash, self.model))
-            conn.commit()
+        with self._conn_lock:
+            self._conn.execute(_SQL_INSERT_API_LOG_IN, (timestamp or _now_iso(), content, prompt_hash, self.model))
 
-    def _log_output(self, response, metadata=None):
+    def _log_output(self, response, metadata=None, timestamp=None):
         """Log outgoing response."""
-        response_hash = hashlib.sha256(response.encode()).hexdigest()
-        content = json.dumps({'response': response, 'metadata': metadata})
+        response_hash = _content_hash(response)
+        content = _pack_log_content({'response': response, 'metadata': metadata})
         response_time = metadata.get('response_time') if metadata else None
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO api_logs (timestamp, direction, content, response_hash, model, response_time)
-                VALUES (?, 'out', ?, ?, ?, ?)
-            """, (datetime.now().isoformat(), content, response_hash, self.model, response_time))
-            conn.commit()
+        with self._conn_lock:
+            self._conn.execute(_SQL_INSERT_API_LOG_OUT,
+                               (timestamp or _now_iso(), content, response_hash, self.model, response_time))
 
     # ============================================================================
     # 4. DUAL MEMORY SYSTEM (INTERNAL)
@@ -576,22 +1006,19 @@ class Bot:
 
     def store_internal(self, key, value, metadata=None):
         """Store in internal memory (permanent)."""
-        value_json = json.dumps(value) if not isinstance(value, str) else value
-        metadata_json = json.dumps(metadata) if metadata else None
+        value_json = _dumps(value) if not isinstance(value, str) else value
+        metadata_json = _dumps(metadata) if metadata else None
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO memory (key, namespace, value, timestamp, metadata)
-                VALUES (?, 'internal', ?, ?, ?)
-            """, (key, value_json, datetime.now().isoformat(), metadata_json))
-            conn.commit()
+        timestamp = _now_iso()
+        with self._conn_lock:
+            self._conn.execute(_SQL_UPSERT_MEMORY, (key, 'internal', value_json, timestamp, metadata_json))
 
-        self.log_action('memory_write', {'key': key, 'namespace': 'internal'})
+        self.log_action('memory_write', {'key': key, 'namespace': 'internal'}, timestamp=timestamp)
 
     def retrieve_internal(self, key):
         """Retrieve from internal memory."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
+        with self._conn_lock:
+            cursor = self._conn.execute("""
                 SELECT value, metadata FROM memory
                 WHERE key = ? AND namespace = 'internal'
             """, (key,))
@@ -614,37 +1041,34 @@ class Bot:
         if not self.external_memory_path:
             raise ValueError("External memory not coupled. Use couple_external_memory() first.")
 
-        value_json = json.dumps(value) if not isinstance(value, str) else value
-        metadata_json = json.dumps(metadata) if metadata else None
+        value_json = _dumps(value) if not isinstance(value, str) else value
+        metadata_json = _dumps(metadata) if metadata else None
 
-        with sqlite3.connect(self.external_memory_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO memory (key, namespace, value, timestamp, metadata)
-                VALUES (?, 'external', ?, ?, ?)
-            """, (key, value_json, datetime.now().isoformat(), metadata_json))
-            conn.commit()
+        timestamp = _now_iso()
+        with self._external_lock:
+            self._external_conn.execute(_SQL_UPSERT_MEMORY, (key, 'external', value_json, timestamp, metadata_json))
 
-        self.log_action('memory_write', {'key': key, 'namespace': 'external'})
+        self.log_action('memory_write', {'key': key, 'namespace': 'external'}, timestamp=timestamp)
 
     def retrieve_external(self, key):
         """Retrieve from external memory."""
         if not self.external_memory_path:
             raise ValueError("External memory not coupled. Use couple_external_memory() first.")
 
-        with sqlite3.connect(self.external_memory_path) as conn:
-            cursor = conn.execute("""
+        with self._external_lock:
+            cursor = self._external_conn.execute("""
                 SELECT value, metadata FROM memory
                 WHERE key = ? AND namespace = 'external'
             """, (key,))
             row = cursor.fetchone()
 
-            if row:
-                self.log_action('memory_read', {'key': key, 'namespace': 'external'})
-                try:
-                    return json.loads(row[0])
-                except json.JSONDecodeError:
-                    return row[0]
-            return None
+        if row:
+            self.log_action('memory_read', {'key': key, 'namespace': 'external'})
+            try:
+                return json.loads(row[0])
+            except json.JSONDecodeError:
+                return row[0]
+        return None
 
     def couple_external_memory(self, external_path, request_permission=True):
         """
@@ -664,20 +1088,10 @@ class Bot:
         # Ensure directory exists
         external_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialize external database if needed
-        if not external_path.exists():
-            with sqlite3.connect(external_path) as conn:
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS memory (
-                        key TEXT PRIMARY KEY,
-                        namespace TEXT NOT NULL,
-                        value TEXT NOT NULL,
-                        timestamp TEXT NOT NULL,
-                        metadata TEXT
-                    )
-                """)
-                conn.commit()
-
+        # Open (and initialize if needed) the external database, replacing any previous coupling
+        external_conn, external_lock = _acquire_external_conn(external_path)
+        self._release_external()
+        self._external_conn, self._external_lock = external_conn, external_lock
         self.external_memory_path = external_path
         self.log_action('memory_coupling', {'path': str(external_path)})
 
@@ -685,7 +1099,7 @@ class Bot:
         """Uncouple external memory."""
         if self.external_memory_path:
             self.log_action('memory_uncoupling', {'path': str(self.external_memory_path)})
-            self.external_memory_path = None
+        self._release_external()
 
     # ============================================================================
     # 6. THOUGHT JOURNAL
@@ -704,16 +1118,38 @@ class Bot:
         if tags is None:
             tags = self._extract_tags(content)
 
-        tags_json = json.dumps(tags) if tags else None
+        tags_json = _dumps(tags) if tags else None
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO thoughts (timestamp, thought_type, content, tags, parent_id)
-                VALUES (?, ?, ?, ?, ?)
-            """, (datetime.now().isoformat(), thought_type, content, tags_json, parent_id))
-            conn.commit()
+        timestamp = _now_iso()
+        with self._conn_lock:
+            self._conn.execute(_SQL_INSERT_THOUGHT, (timestamp, thought_type, content, tags_json, parent_id))
 
-        self.log_action('thought', {'type': thought_type, 'content_length': len(content)})
+        self.log_action('thought', {'type': thought_type, 'content_length': len(content)}, timestamp=timestamp)
+
+    def record_thoughts_batch(self, entries):
+        """
+        Record several thoughts in one transaction.
+
+        Args:
+            entries: Iterable of dicts with record_thought() arguments
+                     ('thought_type', 'content', optional 'tags' and 'parent_id')
+        """
+        timestamp = _now_iso()
+        thought_rows = []
+        action_rows = []
+        for entry in entries:
+            content = entry['content']
+            tags = entry.get('tags')
+            if tags is None:
+                tags = self._extract_tags(content)
+            thought_rows.append((timestamp, entry['thought_type'], content,
+                                 _dumps(tags) if tags else None, entry.get('parent_id')))
+            action_rows.append((timestamp, 'thought',
+                                _dumps({'type': entry['thought_type'], 'content_length': len(content)})))
+
+        with self.batch():
+            self._conn.executemany(_SQL_INSERT_THOUGHT, thought_rows)
+            self._conn.executemany(_SQL_INSERT_ACTION, action_rows)
 
     def _extract_tags(self, content):
         """Extract simple tags from content."""
@@ -743,10 +1179,10 @@ class Bot:
                 params.append(filters['thought_type'])
 
         if tags:
-            # Simple tag matching (tags stored as JSON array)
+            # Exact tag matching against the JSON array (a substring match would let 'plan' match 'planning')
             for tag in tags:
-                query += " AND tags LIKE ?"
-                params.append(f'%{tag}%')
+                query += " AND EXISTS (SELECT 1 FROM json_each(thoughts.tags) WHERE value = ?)"
+                params.append(tag)
 
         if time_range:
             query += " AND timestamp BETWEEN ? AND ?"
@@ -754,8 +1190,8 @@ class Bot:
 
         query += " ORDER BY timestamp DESC"
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(query, params)
+        with self._conn_lock:
+            cursor = self._conn.execute(query, params)
             rows = cursor.fetchall()
 
             thoughts = []
@@ -765,7 +1201,7 @@ class Bot:
                     'timestamp': row[1],
                     'thought_type': row[2],
                     'content': row[3],
-                    'tags': json.loads(row[4]) if row[4] else [],
+                    'tags': orjson.loads(row[4]) if row[4] else [],
                     'parent_id': row[5]
                 })
 
@@ -773,30 +1209,20 @@ class Bot:
 
     def get_thought_chain(self, thought_id):
         """Get reasoning chain starting from thought_id."""
-        chain = []
-        current_id = thought_id
-
-        with sqlite3.connect(self.db_path) as conn:
-            while current_id:
-                cursor = conn.execute("""
-                    SELECT id, timestamp, thought_type, content, parent_id
-                    FROM thoughts WHERE id = ?
-                """, (current_id,))
-                row = cursor.fetchone()
-
-                if row:
-                    chain.append({
-                        'id': row[0],
-                        'timestamp': row[1],
-                        'thought_type': row[2],
-                        'content': row[3],
-                        'parent_id': row[4]
-                    })
-                    current_id = row[4]
-                else:
-                    break
+        # Walk parent links in one recursive query; deepest ancestor first is chronological order
+        with self._conn_lock:
+            rows = self._conn.execute(_SQL_THOUGHT_CHAIN, (thought_id,)).fetchall()
 
-        return list(reversed(chain))  # Return in chronological order
+        return [
+            {
+                'id': row[0],
+                'timestamp': row[1],
+                'thought_type': row[2],
+                'content': row[3],
+                'parent_id': row[4]
+            }
+            for row in rows
+        ]
 
     # ============================================================================
     # 7. EXACT REQUEST MATCHING
@@ -804,12 +1230,11 @@ class Bot:
 
     def _normalize_request(self, text):
         """Normalize request text for matching."""
-        return text.lower().strip().replace('\n', ' ').replace('\r', ' ')
+        return _normalize_request_text(text)
 
     def _hash_request(self, text):
         """Hash normalized request text."""
-        normalized = self._normalize_request(text)
-        return hashlib.sha256(normalized.encode()).hexdigest()
+        return _request_hash(text)
 
     def find_exact_match(self, request_text):
         """
@@ -820,8 +1245,8 @@ class Bot:
         """
         request_hash = self._hash_request(request_text)
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
+        with self._conn_lock:
+            cursor = self._conn.execute(
                 "SELECT id, request_text FROM requests WHERE request_hash = ?",
                 (request_hash,)
             )
@@ -838,25 +1263,27 @@ class Bot:
         Returns:
             Request ID
         """
-        normalized = self._normalize_request(request_text)
         request_hash = self._hash_request(request_text)
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
+        with self._conn_lock:
+            if _SQLITE_HAS_RETURNING:
+                # The no-op update on conflict makes RETURNING yield the existing row's id too
+                return self._conn.execute("""
+                    INSERT INTO requests (request_hash, request_text, timestamp)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(request_hash) DO UPDATE SET request_hash = excluded.request_hash
+                    RETURNING id
+                """, (request_hash, request_text, _now_iso())).fetchone()[0]
+
+            cursor = self._conn.execute("""
                 INSERT OR IGNORE INTO requests (request_hash, request_text, timestamp)
                 VALUES (?, ?, ?)
-            """, (request_hash, request_text, datetime.now().isoformat()))
-
-            if cursor.rowcount == 0:
-                # Already exists, get ID
-                cursor = conn.execute(
-                    "SELECT id FROM requests WHERE request_hash = ?",
-                    (request_hash,)
-                )
-                return cursor.fetchone()[0]
-
-            conn.commit()
-            return cursor.lastrowid
+            """, (request_hash, request_text, _now_iso()))
+            if cursor.rowcount:
+                return cursor.lastrowid
+            return self._conn.execute(
+                "SELECT id FROM requests WHERE request_hash = ?", (request_hash,)
+            ).fetchone()[0]
 
     # ============================================================================
     # 9. PAST RESPONSE LOOKUP AND DECISION
@@ -864,8 +1291,8 @@ class Bot:
 
     def find_past_responses(self, request_id):
         """Get all past responses for a request."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
+        with self._conn_lock:
+            cursor = self._conn.execute("""
                 SELECT id, response_text, attempt_number, timestamp, success_rating, metadata
                 FROM responses WHERE request_id = ?
                 ORDER BY attempt_number DESC
@@ -878,27 +1305,37 @@ class Bot:
                     'response_text': row[1],
                     'attempt_number': row[2],
                     'timestamp': row[3],
-                    'success_rating': json.loads(row[4]) if row[4] else None,
-                    'metadata': json.loads(row[5]) if row[5] else None
+                    'success_rating': orjson.loads(row[4]) if row[4] else None,
+                    'metadata': orjson.loads(row[5]) if row[5] else None
                 })
 
             return responses
 
-    def should_make_new_attempt(self, request_id, past_responses):
+    def should_make_new_attempt(self, request_id, past_responses=None):
         """
         Decide if new attempt needed (simple heuristic, not AI).
 
+        Args:
+            request_id: Request to decide for
+            past_responses: Responses already loaded by the caller; if omitted, only the
+                            newest response timestamp is read from the database
+
         Returns:
             True if new attempt needed, False to reuse existing
         """
-        if not past_responses:
-            return True
+        if past_responses is None:
+            with self._conn_lock:
+                latest = self._conn.execute(
+                    "SELECT MAX(timestamp) FROM responses WHERE request_id = ?", (request_id,)
+                ).fetchone()[0]
+        else:
+            latest = max((r['timestamp'] for r in past_responses), default=None)
 
-        # Get most recent response
-        most_recent = max(past_responses, key=lambda r: r['timestamp'])
-        age = datetime.now() - datetime.fromisoformat(most_recent['timestamp'])
+        if latest is None:
+            return True
 
-        # If recent (< 1 hour), reuse
+        # If the most recent response is recent (< 1 hour), reuse
+        age = datetime.now() - datetime.fromisoformat(latest)
         if age.total_seconds() < 3600:
             return False
 
@@ -906,17 +1343,10 @@ class Bot:
 
     def record_new_attempt(self, request_id, response, metadata=None):
         """Record new response attempt."""
-        past_responses = self.find_past_responses(request_id)
-        attempt_number = len(past_responses) + 1
+        metadata_json = _dumps(metadata) if metadata else None
 
-        metadata_json = json.dumps(metadata) if metadata else None
-
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO responses (request_id, response_text, attempt_number, timestamp, metadata)
-                VALUES (?, ?, ?, ?, ?)
-            """, (request_id, response, attempt_number, datetime.now().isoformat(), metadata_json))
-            conn.commit()
+        with self._conn_lock:
+            self._conn.execute(_SQL_INSERT_RESPONSE, (request_id, response, _now_iso(), metadata_json))
 
     # ============================================================================
     # 10. SIMILAR PROMPT DETECTION
@@ -930,21 +1360,69 @@ class Bot:
         return self._embedding_client
 
     def _generate_embedding(self, text):
-        """Generate embedding for text."""
+        """Generate embedding for text, reusing one computed earlier for the same text."""
+        key = _content_hash(text)
+        with self._embedding_cache_lock:
+            embedding = self._embedding_cache.get(key)
+            if embedding is not None:
+                self._embedding_cache.move_to_end(key)
+                return embedding.copy()
+
         client = self._get_embedding_client()
-        embedding = client.generate_embedding(text)
-        return np.array(embedding, dtype=np.float32)
+        embedding = np.array(client.generate_embedding(text), dtype=np.float32)
+        if embedding.size:
+            with self._embedding_cache_lock:
+                self._embedding_cache[key] = embedding.copy()
+                while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
+        return embedding
 
     def _cosine_similarity(self, embedding1, embedding2):
         """Calculate cosine similarity between embeddings."""
-        dot_product = np.dot(embedding1, embedding2)
-        norm1 = np.linalg.norm(embedding1)
-        norm2 = np.linalg.norm(embedding2)
-
-        if norm1 == 0 or norm2 == 0:
+        # Squared norms via vdot, so one sqrt replaces two np.linalg.norm calls
+        denominator = math.sqrt(np.vdot(embedding1, embedding1) * np.vdot(embedding2, embedding2))
+        if denominator == 0:
             return 0.0
 
-        return float(dot_product / (norm1 * norm2))
+        return float(np.dot(embedding1, embedding2) / denominator)
+
+    def _get_embedding_index(self, dim):
+        """
+        In-memory flat index of stored request embeddings of the given dimension.
+
+        Returns a dict with 'ids', 'texts' and 'matrix' (unit rows, float32),
+        loaded from the database on first use and kept current by
+        store_embedding_for_request().
+        """
+        index = self._embedding_index
+        if index is not None and index['matrix'].shape[1] == dim:
+            return index
+
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT id, request_text, embedding, embedding_dtype FROM requests WHERE embedding IS NOT NULL"
+            ).fetchall()
+        rows = [row for row in rows if len(row[2]) == _embedding_nbytes(dim, row[3])]
+
+        # Decode each storage dtype's blobs with one frombuffer over their concatenation
+        matrix = np.empty((len(rows), dim), dtype=np.float32)
+        for dtype in {row[3] for row in rows}:
+            positions = [i for i, row in enumerate(rows) if row[3] == dtype]
+            blobs = b"".join(rows[i][2] for i in positions)
+            matrix[positions] = _unpack_embedding(blobs, dtype, dim).reshape(len(positions), dim)
+        index = {
+            'ids': [row[0] for row in rows],
+            'texts': [row[1] for row in rows],
+            'matrix': self._unit_rows(matrix),
+        }
+        self._embedding_index = index
+        return index
+
+    @staticmethod
+    def _unit_rows(matrix):
+        """Scale rows to unit length (zero rows stay zero, so they score 0)."""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms != 0)
 
     def find_similar_requests(self, prompt, threshold=0.8):
         """
@@ -959,58 +1437,77 @@ class Bot:
         """
         # Generate embedding for current prompt
         embedding = self._generate_embedding(prompt)
+        query = self._unit_rows(embedding.reshape(1, -1))[0]
 
-        # Get all requests with embeddings
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT id, request_text, embedding FROM requests WHERE embedding IS NOT NULL"
-            )
-
-            similar = []
-            for row in cursor.fetchall():
-                stored_embedding = np.frombuffer(row[2], dtype=np.float32)
-                similarity = self._cosine_similarity(embedding, stored_embedding)
-
-                if similarity >= threshold:
-                    similar.append({
-                        'id': row[0],
-                        'text': row[1],
-                        'similarity': similarity
-                    })
+        # Score every stored request with one matrix-vector product
+        index = self._get_embedding_index(query.shape[0])
+        similarities = index['matrix'] @ query
+        matches = np.flatnonzero(similarities >= threshold)
+        order = matches[np.argsort(-similarities[matches], kind='stable')]
 
-            # Sort by similarity (descending)
-            similar.sort(key=lambda x: x['similarity'], reverse=True)
-            return similar
+        return [
+            {'id': index['ids'][i], 'text': index['texts'][i], 'similarity': float(similarities[i])}
+            for i in order
+        ]
 
     def store_embedding_for_request(self, request_id, embedding):
         """Store embedding for a request (lazy generation)."""
-        embedding_bytes = embedding.tobytes()
-
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "UPDATE requests SET embedding = ? WHERE id = ?",
-                (embedding_bytes, request_id)
-            )
-            conn.commit()
+        embedding_bytes, dtype = _pack_embedding(embedding)
+        # Index what a reload would read back, not the pre-rounding values
+        embedding = _unpack_embedding(embedding_bytes, dtype)
+
+        with self._conn_lock:
+            if _SQLITE_HAS_RETURNING:
+                rows = self._conn.execute(
+                    "UPDATE requests SET embedding = ?, embedding_dtype = ? WHERE id = ? RETURNING request_text",
+                    (embedding_bytes, dtype, request_id)
+                ).fetchall()
+            else:
+                updated = self._conn.execute(
+                    "UPDATE requests SET embedding = ?, embedding_dtype = ? WHERE id = ?",
+                    (embedding_bytes, dtype, request_id)
+                ).rowcount
+                rows = self._conn.execute(
+                    "SELECT request_text FROM requests WHERE id = ?", (request_id,)
+                ).fetchall() if updated else []
+
+            # Keep a loaded index in step with the table
+            index = self._embedding_index
+            if rows and index is not None and index['matrix'].shape[1] == embedding.shape[0]:
+                unit = self._unit_rows(embedding.reshape(1, -1))
+                if request_id in index['ids']:
+                    index['matrix'][index['ids'].index(request_id)] = unit[0]
+                else:
+                    index['ids'].append(request_id)
+                    index['texts'].append(rows[0][0])
+                    index['matrix'] = np.vstack([index['matrix'], unit])
 
     # ============================================================================
     # 11. WORKING FOLDER SYSTEM WITH SAFETY PROTOCOLS
     # ============================================================================
 
     def _get_workspace_root(self):
-        """Find workspace root by looking for .git or pyproject.toml."""
+        """Find workspace root by looking for .git or pyproject.toml (cached per working directory)."""
         current = Path.cwd()
+        cached = self._workspace_root
+        if cached is not None and cached[0] == current:
+            return cached[1]
+
+        root = current  # Fallback to current directory
         for parent in [current] + list(current.parents):
             if (parent / '.git').exists() or (parent / 'pyproject.toml').exists():
-                return parent
-        return current  # Fallback to current directory
+                root = parent
+                break
+        self._workspace_root = (current, root, root.resolve())
+        return root
 
     def _is_within_workspace(self, path):
         """Check if path is within workspace root."""
-        workspace = self._get_workspace_root()
+        self._get_workspace_root()
+        workspace = self._workspace_root[2]
         try:
-            common = os.path.commonpath([Path(workspace).resolve(), Path(path).resolve()])
-            return common == str(Path(workspace).resolve())
+            common = os.path.commonpath([workspace, Path(path).resolve()])
+            return common == str(workspace)
         except ValueError:
             return False  # No common path = not within workspace
 
@@ -1019,27 +1516,27 @@ class Bot:
         workspace = self._get_workspace_root()
         permissions_file = workspace / '.bot_permissions.json'
 
-        if not permissions_file.exists():
+        try:
+            stat = permissions_file.stat()
+        except OSError:
             return False
 
         try:
-            with open(permissions_file, 'r') as f:
-                permissions = json.load(f)
-
-            allowed_paths = permissions.get('allowed_paths', [])
-            denied_paths = permissions.get('denied_paths', [])
+            # Re-read and re-resolve the lists only when the file changes
+            cached = self._permissions_cache
+            if cached is None or cached[:3] != (permissions_file, stat.st_mtime_ns, stat.st_size):
+                permissions = orjson.loads(permissions_file.read_bytes())
+                cached = self._permissions_cache = (
+                    permissions_file, stat.st_mtime_ns, stat.st_size,
+                    {Path(allowed).resolve() for allowed in permissions.get('allowed_paths', [])},
+                    {Path(denied).resolve() for denied in permissions.get('denied_paths', [])},
+                )
 
             # Check denied first
-            for denied in denied_paths:
-                if Path(path).resolve() == Path(denied).resolve():
-                    return False
-
-            # Check allowed
-            for allowed in allowed_paths:
-                if Path(path).resolve() == Path(allowed).resolve():
-                    return True
-
-            return False
+            target = Path(path).resolve()
+            if target in cached[4]:
+                return False
+            return target in cached[3]
         except Exception:
             return False
 
@@ -1054,30 +1551,32 @@ class Bot:
     # 12. ACTION LOGGING AND REFLECTION
     # ============================================================================
 
-    def log_action(self, action_type, details):
+    def log_action(self, action_type, details, timestamp=None):
         """
         Log an action.
 
         Args:
             action_type: Type of action ('api_call', 'memory_read', 'memory_write', 'thought', 'decision')
             details: Dict of action details
+            timestamp: ISO timestamp to record (default: now); lets callers reuse one for related rows
         """
-        details_json = json.dumps(details) if not isinstance(details, str) else details
+        details_json = _dumps(details) if not isinstance(details, str) else details
+        row = (timestamp or _now_iso(), action_type, details_json)
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO actions (timestamp, action_type, details)
-                VALUES (?, ?, ?)
-            """, (datetime.now().isoformat(), action_type, details_json))
-            conn.commit()
+        with self._conn_lock:
+            if self._batch_depth:
+                self._action_buffer.append(row)
+            else:
+                self._conn.execute(_SQL_INSERT_ACTION, row)
 
-    def get_action_history(self, limit=None, with_reflection=False):
+    def get_action_history(self, limit=None, with_reflection=False, parse_details=True):
         """
         Get recent actions.
 
         Args:
             limit: Maximum number of actions to return
             with_reflection: If True, only return actions with reflection
+            parse_details: If False, 'details' is left as the stored JSON text
 
         Returns:
             List of action dicts
@@ -1094,8 +1593,9 @@ class Bot:
             limit = int(limit)
             query += f" LIMIT {limit}"
 
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(query)
+        with self._conn_lock:
+            self._flush_actions()
+            cursor = self._conn.execute(query)
             rows = cursor.fetchall()
 
             actions = []
@@ -1104,12 +1604,28 @@ class Bot:
                     'id': row[0],
                     'timestamp': row[1],
                     'action_type': row[2],
-                    'details': json.loads(row[3]) if row[3] else {},
+                    'details': (orjson.loads(row[3]) if row[3] else {}) if parse_details else row[3],
                     'reflection': row[4]
                 })
 
             return actions
 
+    def get_unreflected_actions(self, limit=None):
+        """
+        Get recent actions that have no reflection yet, newest first.
+
+        Returns:
+            List of (id, action_type, details JSON text) tuples
+        """
+        query = ("SELECT id, action_type, details FROM actions "
+                 "WHERE reflection IS NULL OR reflection = '' ORDER BY timestamp DESC")
+        if limit:
+            query += f" LIMIT {int(limit)}"
+
+        with self._conn_lock:
+            self._flush_actions()
+            return self._conn.execute(query).fetchall()
+
     def batch_reflect(self, limit=50):
         """
         Batch reflect on recent actions (calls Gemini API).
@@ -1120,17 +1636,16 @@ class Bot:
         Returns:
             Dict mapping action IDs to reflections
         """
-        # Get recent actions without reflection
-        actions = self.get_action_history(limit=limit)
-        actions_without_reflection = [a for a in actions if not a.get('reflection')]
+        # Get recent actions without reflection (details stay JSON text for the prompt)
+        actions_without_reflection = self.get_unreflected_actions(limit=limit)
 
         if not actions_without_reflection:
             return {}
 
         # Build reflection prompt
         actions_summary = "\n".join([
-            f"{i+1}. [{a['action_type']}] {a['details']}"
-            for i, a in enumerate(actions_without_reflection[:limit])
+            f"{i+1}. [{action_type}] {details}"
+            for i, (_, action_type, details) in enumerate(actions_without_reflection)
         ])
 
         prompt = f"""Reflect on these recent actions:
@@ -1161,25 +1676,23 @@ Format your response as a JSON array where each element corresponds to an action
             except json.JSONDecodeError:
                 # Fallback: create simple reflection for all actions
                 reflections = [
-                    {'action_id': a['id'], 'reflection': reflection_text}
-                    for a in actions_without_reflection
+                    {'action_id': action_id, 'reflection': reflection_text}
+                    for action_id, _, _ in actions_without_reflection
                 ]
 
             # Store reflections
             reflection_map = {}
-            with sqlite3.connect(self.db_path) as conn:
+            with self._conn_lock:
                 for reflection in reflections:
                     action_id = reflection.get('action_id')
                     reflection_text = reflection.get('reflection', '')
 
                     if action_id:
-                        conn.execute("""
+                        self._conn.execute("""
                             UPDATE actions SET reflection = ? WHERE id = ?
                         """, (reflection_text, action_id))
                         reflection_map[action_id] = reflection_text
 
-                conn.commit()
-
             return reflection_map
 
         except Exception as e:
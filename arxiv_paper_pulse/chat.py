@@ -24,6 +24,7 @@ class PaperChatSession:
         self.model = model or config.DEFAULT_MODEL
         self.client = genai.Client(api_key=config.GEMINI_API_KEY)
         self.papers = papers
+        self._paper_context = None  # (paper fields, context text) last built by _create_paper_context
 
         # Create initial history with paper context
         history = self._create_paper_context(papers)
@@ -54,17 +55,21 @@ Be thorough but accessible in your explanations."""
         Returns:
             List of history dicts
         """
-        context_parts = ["I have the following research papers to discuss:\n\n"]
-
-        for i, paper in enumerate(papers, 1):
-            context_parts.append(f"{i}. {paper.get('title', 'Unknown Title')}\n")
-            context_parts.append(f"   URL: {paper.get('url', 'N/A')}\n")
-            if paper.get('abstract'):
-                context_parts.append(f"   Abstract: {paper.get('abstract')[:500]}...\n")
-            context_parts.append("\n")
-
-        context_text = "".join(context_parts)
-        context_text += "\nYou can ask me questions about these papers, and I'll provide detailed answers."
+        # Only the fields that reach the prompt; reset() with unchanged papers reuses the text
+        fields = tuple(
+            (paper.get('title', 'Unknown Title'), paper.get('url', 'N/A'), (paper.get('abstract') or '')[:500])
+            for paper in papers
+        )
+        if self._paper_context is not None and self._paper_context[0] == fields:
+            context_text = self._paper_context[1]
+        else:
+            entries = (
+                f"{i}. {title}\n   URL: {url}\n" + (f"   Abstract: {abstract}...\n" if abstract else "") + "\n"
+                for i, (title, url, abstract) in enumerate(fields, 1)
+            )
+            context_text = ("I have the following research papers to discuss:\n\n" + "".join(entries)
+                            + "\nYou can ask me questions about these papers, and I'll provide detailed answers.")
+            self._paper_context = (fields, context_text)
 
         # Create history with user and model messages
         history = [
@@ -22,6 +22,14 @@ BEEHIIV_FEEDS = os.getenv("BEEHIIV_FEEDS", "").split(",") if os.getenv("BEEHIIV_
 CONTEXT_MAX_BYTES = int(os.getenv("CONTEXT_MAX_BYTES", str(65536)))  # 64KB default
 CONTEXT_HISTORY_RETENTION = int(os.getenv("CONTEXT_HISTORY_RETENTION", "20"))
 CONTEXT_HISTORY_DIRNAME = "context_history"
+EMBEDDINGS_MAX_PAPERS = int(os.getenv("EMBEDDINGS_MAX_PAPERS", "500"))  # Per-request cap on embedding endpoints
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))  # Concurrent Gemini calls per process
+BATCH_REGISTRY_SIZE = int(os.getenv("BATCH_REGISTRY_SIZE", "256"))  # Submitted batch jobs remembered by the API
+SEMANTIC_CACHE_FILE = os.getenv(  # Absolute by default so the cache is found whatever the working directory
+    "SEMANTIC_CACHE_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "semantic_cache.json")
+)
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # Cosine similarity for a near-match hit
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "10000"))
 
 # Feature flags for Gemini API capabilities
 USE_PDF_PROCESSING = os.getenv("USE_PDF_PROCESSING", "false").lower() == "true"
@@ -59,6 +67,8 @@ SUMMARY_PROMPT = """Analyze the following research paper abstract and provide a
 Paper Abstract:
 {}
 """
+# Same prompt as a %-template; `SUMMARY_PROMPT_TEMPLATE % (abstract,)` skips str.format's parse per call
+SUMMARY_PROMPT_TEMPLATE = SUMMARY_PROMPT.replace("%", "%%").replace("{}", "%s")
 
 # Synthesis prompt for creating the final briefing
 SYNTHESIS_PROMPT = """Based on the following article summaries from arXiv, create a comprehensive executive briefing that:
@@ -1,16 +1,27 @@
 import arxiv
 import json
+import orjson
 import io
+import re
 import httpx
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from . import config
-from .utils import get_unique_id
+from .utils import get_unique_id, get_http_client, get_arxiv_client
+from .batch_processor import BatchPaperProcessor
 from .models import PaperAnalysis, Methodology, Results, ComparativeAnalysis
 from google import genai
 from google.genai import types
 
+_THINK_TAG_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_NUMBERED_POINT_RE = re.compile(r"\d+\.\s+")
+_NUMBERED_SECTION_RE = re.compile(r"(\d+\.\s+[^\n]+)")
+# Parallel PDF uploads per multi-paper analysis. Small and fixed (not GEMINI_MAX_CONCURRENCY)
+# because the API runs the whole analysis inside a single Gemini concurrency slot.
+MULTI_PAPER_UPLOAD_WORKERS = 2
+
 class ArxivSummarizer:
     """
     Fetches and summarizes arXiv papers using Google's Gemini API.
@@ -18,8 +29,9 @@ class ArxivSummarizer:
     Raw data is always pulled fresh from arXiv.
     """
 
-    def __init__(self, max_results=10, model=None, query="cat:cs.AI", use_caching=None):
+    def __init__(self, max_results=10, model=None, query="cat:cs.AI", use_caching=None, http_client=None, client=None):
         self.max_results = max_results
+        self.http_client = http_client or get_http_client()
         # Auto-select model if not specified and auto-selection enabled
         if model is None:
             if config.AUTO_MODEL_SELECTION:
@@ -32,8 +44,8 @@ class ArxivSummarizer:
         self.use_caching = use_caching if use_caching is not None else config.USE_CONTEXT_CACHING
         self._cached_contexts = {}  # Store cache names/URIs
         self._ensure_directories()
-        self._initialize_gemini()
-        self.initialize_briefing_file()
+        self._initialize_gemini(client)
+        self.briefing_file = None  # Created on first write, so unused summarizers leave no empty briefings
 
     def _select_optimal_model(self, query, max_results):
         """
@@ -63,13 +75,25 @@ class ArxivSummarizer:
         Path(config.SUMMARY_DIR).mkdir(parents=True, exist_ok=True)
         Path(config.BRIEFING_DIR).mkdir(parents=True, exist_ok=True)
 
-    def _initialize_gemini(self):
+    def _initialize_gemini(self, client=None):
+        # A shared client passed in by the caller is reused and left open on close()
+        self._owns_client = client is None
+        if client is not None:
+            self.client = client
+            print(f"Using Gemini model: {self.model}")
+            return
         if not config.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in environment. Please set it in your .env file.")
         # Client can auto-detect from GEMINI_API_KEY env var, but we pass it explicitly for clarity
         self.client = genai.Client(api_key=config.GEMINI_API_KEY)
         print(f"Using Gemini model: {self.model}")
 
+    def close(self):
+        """Release the Gemini client's pooled HTTP connections (unless the client is shared)."""
+        client = getattr(self, "client", None)
+        if client is not None and getattr(self, "_owns_client", True):
+            client.close()
+
     def download_and_process_pdf(self, paper):
         """
         Download PDF from arXiv and upload to Gemini File API.
@@ -98,7 +122,7 @@ class ArxivSummarizer:
         print(f"Downloading PDF from {pdf_url}...")
         try:
             # Download PDF
-            response = httpx.get(pdf_url, timeout=60.0)
+            response = self.http_client.get(pdf_url, timeout=60.0)
             response.raise_for_status()
             pdf_data = response.content
 
@@ -248,15 +272,18 @@ class ArxivSummarizer:
 
         print(f"Initialized briefing report at: {self.briefing_file}")
 
+    def _ensure_briefing_file(self):
+        """Create the briefing file if nothing has been written to one yet."""
+        if self.briefing_file is None:
+            self.initialize_briefing_file()
+
     def update_briefing_report(self, paper):
         """
         Appends a well-formatted section for a single paper to the briefing file,
         ensuring proper markdown formatting with article details and summary.
         """
-        import re
-
         def remove_think_tags(text):
-            return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+            return _THINK_TAG_RE.sub("", text)
 
         # Make a proper URL if it's just an ID
         if paper['url'].startswith("http"):
@@ -267,6 +294,7 @@ class ArxivSummarizer:
             url = f"https://arxiv.org/abs/{paper_id}"
 
         # Create a well-formatted markdown section for the paper
+        self._ensure_briefing_file()
         with open(self.briefing_file, "a") as f:
             # Article header with title and link
             f.write(f"### [{paper['title']}]({url})\n\n")
@@ -281,15 +309,15 @@ class ArxivSummarizer:
             f.write("#### Key Insights:\n\n")
 
             # Check if the summary already has numbered points
-            if re.search(r"\d+\.\s+", summary):
+            if _NUMBERED_POINT_RE.search(summary):
                 # If it has numbered sections, try to extract them
-                sections = re.split(r"(\d+\.\s+[^\n]+)", summary)
+                sections = _NUMBERED_SECTION_RE.split(summary)
                 sections = [s for s in sections if s.strip()]
 
                 for section in sections:
-                    if re.match(r"\d+\.\s+", section):
+                    if _NUMBERED_POINT_RE.match(section):
                         # Convert numbered points to bullet points
-                        point = re.sub(r"^\d+\.\s+", "- **", section.strip()) + "**\n"
+                        point = _NUMBERED_POINT_RE.sub("- **", section.strip(), count=1) + "**\n"
                         f.write(f"{point}\n")
                     else:
                         # Add the content as regular text with indentation
@@ -316,9 +344,9 @@ class ArxivSummarizer:
             use_structured_output: If True, generate structured JSON briefing
             format_type: Briefing format - "executive", "technical", or "visual"
         """
-        import re
         print(f"Creating final comprehensive briefing (format: {format_type})...")
 
+        self._ensure_briefing_file()
         with open(self.briefing_file, "r") as f:
             content = f.read()
 
@@ -413,7 +441,7 @@ Format for easy visualization and data extraction."""
         except Exception as e:
             final_synthesis = f"Error generating synthesis: {str(e)}"
 
-        final_synthesis = re.sub(r"<think>.*?</think>", "", final_synthesis, flags=re.DOTALL)
+        final_synthesis = _THINK_TAG_RE.sub("", final_synthesis)
 
         with open(self.briefing_file, "a") as f:
             f.write(f"\n## Executive Summary ({format_type.capitalize()})\n\n")
@@ -468,8 +496,7 @@ Format for easy visualization and data extraction."""
         print("Fetching new data from arXiv...")
         search = arxiv.Search(query=self.query, max_results=self.max_results,
                               sort_by=arxiv.SortCriterion.SubmittedDate)
-        client = arxiv.Client()
-        papers = list(client.results(search))
+        papers = list(get_arxiv_client().results(search))
 
         data = []
         for paper in papers:
@@ -503,8 +530,8 @@ Format for easy visualization and data extraction."""
             existing = self._latest_file(summary_dir, "summary")
             if existing:
                 print(f"Loading summaries from {existing}")
-                with open(existing, "r") as f:
-                    return json.load(f)
+                with open(existing, "rb") as f:
+                    return orjson.loads(f.read())
         raw_data = self.fetch_raw_data(force_pull=force_pull)
         for i, paper in enumerate(raw_data, start=1):
             print(f"Summarizing paper {i}/{len(raw_data)}: {paper['title']}")
@@ -517,6 +544,18 @@ Format for easy visualization and data extraction."""
         self.generate_final_briefing()
         return summaries
 
+    def submit_summary_batch(self, force_pull=False):
+        """
+        Fetch raw data and submit all abstracts as a single Gemini Batch API job
+        instead of one generate_content call per paper (~50% cheaper).
+
+        Returns:
+            Tuple of (batch job ID or None if the Batch API is unavailable, submitted papers)
+        """
+        raw_data = self.fetch_raw_data(force_pull=force_pull)
+        processor = BatchPaperProcessor(model=self.model, client=self.client)
+        return processor.submit_batch(raw_data), raw_data
+
     def summarize_selected_papers(self, selected_papers, force_pull=False):
         """
         Summarize only the selected papers from the raw data.
@@ -685,7 +724,7 @@ Focus on clarity, depth, and practical relevance. Write in a professional yet ac
 
         try:
             # Use structured prompt for better analysis (system instruction provides context)
-            prompt = config.SUMMARY_PROMPT.format(text)
+            prompt = config.SUMMARY_PROMPT_TEMPLATE % (text,)
 
             if use_streaming:
                 # Return streaming response generator
@@ -763,6 +802,7 @@ Focus on clarity, depth, and practical relevance. Write in a professional yet ac
         """
         Analyze multiple papers together in a single long-context request.
         Identifies cross-paper themes, contradictions, and complementary insights.
+        PDFs are uploaded up to MULTI_PAPER_UPLOAD_WORKERS at a time.
 
         Args:
             papers_list: List of paper dicts with entry_id/url
@@ -777,16 +817,19 @@ Focus on clarity, depth, and practical relevance. Write in a professional yet ac
         print(f"Analyzing {len(papers_list)} papers together using long context...")
 
         try:
-            # Download and upload all PDFs
-            uploaded_files = []
-            for i, paper in enumerate(papers_list, 1):
+            # Download and upload all PDFs, a bounded number at a time
+            def upload(indexed_paper):
+                i, paper = indexed_paper
                 print(f"Processing paper {i}/{len(papers_list)}: {paper.get('title', 'Unknown')}")
                 try:
-                    uploaded_file = self.download_and_process_pdf(paper)
-                    uploaded_files.append(uploaded_file)
+                    return self.download_and_process_pdf(paper)
                 except Exception as e:
                     print(f"Failed to process PDF for {paper.get('title', 'Unknown')}: {e}")
-                    # Continue with other papers
+                    return None  # Continue with other papers
+
+            workers = min(MULTI_PAPER_UPLOAD_WORKERS, len(papers_list))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                uploaded_files = [f for f in executor.map(upload, enumerate(papers_list, 1)) if f is not None]
 
             if not uploaded_files:
                 return "No papers could be processed for analysis."
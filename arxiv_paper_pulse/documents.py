@@ -10,6 +10,10 @@ from pydantic import BaseModel, Field, ConfigDict, field_validator
 from enum import Enum
 import os
 
+FILE_API_MAX_SIZE = 50 * 1024 * 1024  # File API upload limit
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # Read size when streaming remote PDFs
+DOWNLOAD_SPOOL_SIZE = 4 * 1024 * 1024  # Streamed PDFs larger than this spill to a temp file
+
 
 # ============================================================================
 # INPUT SCHEMAS
@@ -471,43 +475,75 @@ class DocumentProcessor:
 
     def _upload_file(self, document: DocumentInput):
         """Upload file to Gemini File API"""
-        import httpx
         import io
 
         source = document.source
 
-        # Get file bytes
+        # URLs are streamed to a spooled buffer; other sources are already in memory or on disk
         if source.source_type == "url":
-            response = httpx.get(source.url, timeout=60.0)
-            response.raise_for_status()
-            pdf_bytes = response.content
-        elif source.source_type == "path":
-            pdf_bytes = Path(source.file_path).read_bytes()
-        elif source.source_type == "bytes":
-            pdf_bytes = source.data
-        elif source.source_type == "base64":
-            import base64
-            pdf_bytes = base64.b64decode(source.data)
+            pdf_io = self._download_to_spool(source.url)
         else:
-            raise ValueError(f"Unknown source type: {source.source_type}")
+            if source.source_type == "path":
+                pdf_bytes = Path(source.file_path).read_bytes()
+            elif source.source_type == "bytes":
+                pdf_bytes = source.data
+            elif source.source_type == "base64":
+                import base64
+                pdf_bytes = base64.b64decode(source.data)
+            else:
+                raise ValueError(f"Unknown source type: {source.source_type}")
 
-        # Check size limit (50MB for File API)
-        max_size = 50 * 1024 * 1024
-        if len(pdf_bytes) > max_size:
-            raise ValueError(f"PDF too large ({len(pdf_bytes) / 1024 / 1024:.2f}MB). File API limit is 50MB.")
+            # Check size limit (50MB for File API)
+            if len(pdf_bytes) > FILE_API_MAX_SIZE:
+                raise ValueError(f"PDF too large ({len(pdf_bytes) / 1024 / 1024:.2f}MB). File API limit is 50MB.")
+            pdf_io = io.BytesIO(pdf_bytes)
 
         # Upload to File API
-        pdf_io = io.BytesIO(pdf_bytes)
-        uploaded_file = self.client.files.upload(
-            file=pdf_io,
-            config=dict(
-                mime_type="application/pdf",
-                display_name=getattr(source, 'display_name', None)
+        with pdf_io:
+            uploaded_file = self.client.files.upload(
+                file=pdf_io,
+                config=dict(
+                    mime_type="application/pdf",
+                    display_name=getattr(source, 'display_name', None)
+                )
             )
-        )
 
         return uploaded_file
 
+    def _download_to_spool(self, url: str):
+        """
+        Stream a remote PDF into a seekable buffer in DOWNLOAD_CHUNK_SIZE pieces.
+
+        Small files stay in an io.BytesIO; larger ones spill to a temporary
+        file, so a 50MB PDF never has to be held in RAM. Both are real io.IOBase
+        objects, which files.upload() needs to treat them as streams rather than
+        paths (SpooledTemporaryFile is not one before Python 3.11). Downloads
+        that exceed the File API limit are aborted as soon as they cross it.
+        """
+        import io
+        import tempfile
+        from .utils import get_http_client
+
+        spool = io.BytesIO()
+        try:
+            with get_http_client().stream("GET", url, timeout=60.0) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                    spool.write(chunk)
+                    size = spool.tell()
+                    if size > FILE_API_MAX_SIZE:
+                        raise ValueError("PDF too large (over 50MB). File API limit is 50MB.")
+                    if size > DOWNLOAD_SPOOL_SIZE and isinstance(spool, io.BytesIO):
+                        spilled = tempfile.TemporaryFile()
+                        spilled.write(spool.getvalue())
+                        spool.close()
+                        spool = spilled
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
     def _wait_for_file_processing(self, uploaded_file, max_wait_time: int = 300):
         """Wait for file processing to complete"""
         import time
@@ -1,26 +1,37 @@
 # arxiv_paper_pulse/embeddings.py
 
+import math
 from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from google import genai
 from . import config
 
+EMBED_BATCH_SIZE = 100  # Texts per embed_content request (API maximum)
+EMBED_BATCH_CONCURRENCY = 4  # embed_content requests in flight per batch
+
 
 class PaperEmbeddings:
     """
     Generate embeddings for papers to enable semantic search and clustering.
     """
 
-    def __init__(self, model="models/text-embedding-004", api_key=None):
+    def __init__(self, model="models/text-embedding-004", api_key=None, client=None):
         """
         Initialize embeddings generator.
 
         Args:
             model: Embedding model to use
             api_key: API key (default from config)
+            client: Existing genai.Client to reuse instead of creating one
         """
         self.model = model
-        self.client = genai.Client(api_key=api_key or config.GEMINI_API_KEY)
+        self.client = client or genai.Client(api_key=api_key or config.GEMINI_API_KEY)
+
+    @staticmethod
+    def paper_key(paper: Dict) -> str:
+        """Key under which a paper's embedding is stored in batch results."""
+        return paper.get("id") or paper.get("entry_id") or str(hash(paper.get("title", "")))
 
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -35,9 +46,9 @@ class PaperEmbeddings:
         try:
             result = self.client.models.embed_content(
                 model=self.model,
-                content=text
+                contents=[text]
             )
-            return result.embedding if hasattr(result, 'embedding') else []
+            return (result.embeddings[0].values or []) if result.embeddings else []
         except Exception as e:
             print(f"Error generating embedding: {e}")
             return []
@@ -54,33 +65,67 @@ class PaperEmbeddings:
         Returns:
             Embedding vector
         """
+        return self.generate_embedding(self._paper_text(paper, use_abstract, use_title))
+
+    @staticmethod
+    def _paper_text(paper: Dict, use_abstract=True, use_title=True) -> str:
+        """Text embedded for a paper: its title and/or abstract."""
         parts = []
         if use_title and paper.get("title"):
             parts.append(f"Title: {paper['title']}")
         if use_abstract and paper.get("abstract"):
             parts.append(f"Abstract: {paper['abstract']}")
+        return "\n".join(parts)
 
-        text = "\n".join(parts)
-        return self.generate_embedding(text)
-
-    def generate_batch_embeddings(self, papers: List[Dict]) -> Dict[str, List[float]]:
+    def generate_batch_embeddings(self, papers: List[Dict]) -> Dict[str, np.ndarray]:
         """
         Generate embeddings for multiple papers.
 
+        Papers are sent EMBED_BATCH_SIZE at a time in a single embed_content call
+        each, with up to EMBED_BATCH_CONCURRENCY calls in flight.
+
         Args:
             papers: List of paper dicts
 
         Returns:
-            Dict mapping paper IDs to embeddings
+            Dict mapping paper IDs to float32 embedding arrays (rows of one
+            contiguous matrix)
         """
-        embeddings = {}
-        for paper in papers:
-            paper_id = paper.get("id") or paper.get("entry_id") or str(hash(paper.get("title", "")))
-            embedding = self.generate_paper_embedding(paper)
-            if embedding:
-                embeddings[paper_id] = embedding
+        keyed_texts = [(self.paper_key(paper), self._paper_text(paper)) for paper in papers]
+        keyed_texts = [(key, text) for key, text in keyed_texts if text]
+        if not keyed_texts:
+            return {}
+
+        chunks = [keyed_texts[i:i + EMBED_BATCH_SIZE] for i in range(0, len(keyed_texts), EMBED_BATCH_SIZE)]
+        if len(chunks) == 1:
+            chunk_vectors = [self._embed_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(EMBED_BATCH_CONCURRENCY, len(chunks))) as executor:
+                chunk_vectors = list(executor.map(self._embed_chunk, chunks))
+
+        keys, vectors = [], []
+        for chunk, chunk_result in zip(chunks, chunk_vectors):
+            for (key, _), vector in zip(chunk, chunk_result):
+                if vector:
+                    keys.append(key)
+                    vectors.append(vector)
+        if not vectors:
+            return {}
 
-        return embeddings
+        matrix = np.asarray(vectors, dtype=np.float32)
+        return dict(zip(keys, matrix))
+
+    def _embed_chunk(self, keyed_texts) -> List[List[float]]:
+        """Embed one chunk of (key, text) pairs in a single request; empty vectors on failure."""
+        try:
+            result = self.client.models.embed_content(
+                model=self.model,
+                contents=[text for _, text in keyed_texts]
+            )
+            return [embedding.values or [] for embedding in result.embeddings or []]
+        except Exception as e:
+            print(f"Error generating batch embeddings: {e}")
+            return [[] for _ in keyed_texts]
 
     def cosine_similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
         """
@@ -93,20 +138,18 @@ class PaperEmbeddings:
         Returns:
             Similarity score between -1 and 1
         """
-        if not embedding1 or not embedding2:
+        if len(embedding1) == 0 or len(embedding2) == 0:
             return 0.0
 
         vec1 = np.array(embedding1)
         vec2 = np.array(embedding2)
 
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-
-        if norm1 == 0 or norm2 == 0:
+        # Squared norms via vdot, so one sqrt replaces two np.linalg.norm calls
+        denominator = math.sqrt(np.vdot(vec1, vec1) * np.vdot(vec2, vec2))
+        if denominator == 0:
             return 0.0
 
-        return float(dot_product / (norm1 * norm2))
+        return float(np.dot(vec1, vec2) / denominator)
 
     def find_similar_papers(self, target_paper: Dict, all_papers: List[Dict],
                            top_k: int = 5, threshold: float = 0.7) -> List[Dict]:
@@ -127,22 +170,26 @@ class PaperEmbeddings:
             return []
 
         all_embeddings = self.generate_batch_embeddings(all_papers)
+        candidates = [(paper, all_embeddings[self.paper_key(paper)])
+                      for paper in all_papers if self.paper_key(paper) in all_embeddings]
+        if not candidates or top_k <= 0:
+            return []
 
-        similarities = []
-        for paper in all_papers:
-            paper_id = paper.get("id") or paper.get("entry_id") or str(hash(paper.get("title", "")))
-            if paper_id in all_embeddings:
-                similarity = self.cosine_similarity(target_embedding, all_embeddings[paper_id])
-                if similarity >= threshold:
-                    similarities.append({
-                        "paper": paper,
-                        "similarity": similarity
-                    })
-
-        # Sort by similarity (descending)
-        similarities.sort(key=lambda x: x["similarity"], reverse=True)
-
-        return similarities[:top_k]
+        # Score every candidate with one matrix-vector product
+        papers, vectors = zip(*candidates)
+        matrix = np.stack(vectors)
+        target = np.asarray(target_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(target)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(norms > 0, (matrix @ target) / norms, 0.0)
+
+        # Keep the top_k above threshold, most similar first
+        matches = np.flatnonzero(scores >= threshold)
+        if len(matches) > top_k:
+            matches = matches[np.argpartition(-scores[matches], top_k - 1)[:top_k]]
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+
+        return [{"paper": papers[i], "similarity": float(scores[i])} for i in matches]
 
     def cluster_papers(self, papers: List[Dict], n_clusters: Optional[int] = None) -> Dict[int, List[Dict]]:
         """
@@ -16,14 +16,14 @@ class ImageGenerator:
     Images are saved to: arxiv_paper_pulse/data/generated_images/
     """
 
-    def __init__(self, api_key=None, model=None, output_dir=None, log_dir=None):
+    def __init__(self, api_key=None, model=None, output_dir=None, log_dir=None, client=None):
         self.api_key = api_key or config.GEMINI_API_KEY
         self.model = model or "gemini-2.5-flash-image-preview"
         self.output_dir = Path(output_dir or config.IMAGE_OUTPUT_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.log_dir = Path(log_dir or config.IMAGE_API_LOG_DIR)
         self.log_dir.mkdir(parents=True, exist_ok=True)
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = client or genai.Client(api_key=self.api_key)
 
     def generate_from_text(self, prompt: str, log_call=True) -> Image.Image:
         """
@@ -36,6 +36,10 @@ class ImageGenerator:
         Returns:
             PIL Image object
         """
+        return self._generate_from_text(prompt, log_call=log_call)[0]
+
+    def _generate_from_text(self, prompt: str, log_call=True):
+        """Generate an image from a text prompt, returning (PIL Image, encoded bytes from the API)."""
         start_time = time.time()
         timestamp = datetime.now().isoformat()
 
@@ -72,7 +76,7 @@ class ImageGenerator:
                 'response_metadata': self._extract_response_metadata(response)
             })
 
-        return image
+        return image, image_data
 
     def _extract_response_metadata(self, response):
         """Extract useful metadata from API response"""
@@ -165,6 +169,21 @@ class ImageGenerator:
         image.save(filepath)
         return str(filepath)
 
+    def _save_encoded(self, image: Image.Image, image_data: bytes, filepath: str) -> str:
+        """
+        Save an image the API already encoded.
+
+        When the file extension matches the format the API returned (usually
+        PNG), the original bytes are written as-is instead of being decoded and
+        re-compressed by PIL; otherwise falls back to save_image().
+        """
+        filepath = Path(filepath)
+        if Image.registered_extensions().get(filepath.suffix.lower()) != image.format:
+            return self.save_image(image, filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_bytes(image_data)
+        return str(filepath)
+
     def generate_and_save(self, prompt: str, output_path: str, log_call=True) -> str:
         """
         Generate image from prompt and save to file.
@@ -177,8 +196,8 @@ class ImageGenerator:
         Returns:
             Path to saved file
         """
-        image = self.generate_from_text(prompt, log_call=log_call)
-        saved_path = self.save_image(image, output_path)
+        image, image_data = self._generate_from_text(prompt, log_call=log_call)
+        saved_path = self._save_encoded(image, image_data, output_path)
 
         # Update log with file information
         if log_call:
@@ -0,0 +1,212 @@
+# arxiv_paper_pulse/semantic_cache.py
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+
+class _UnitRowIndex:
+    """
+    Unit embeddings of one namespace and dimension, kept as rows of one
+    contiguous matrix so a near-match search is a single matmul. Rows are
+    added in place (the buffer doubles when full) and removed by moving the
+    last row into the gap.
+    """
+
+    __slots__ = ("matrix", "keys", "rows")
+
+    def __init__(self, dim: int):
+        self.matrix = np.empty((16, dim), dtype=np.float32)
+        self.keys = []  # row -> cache key
+        self.rows = {}  # cache key -> row
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key: str, vector: np.ndarray):
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.matrix):
+                grown = np.empty((2 * row, self.matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self.matrix
+                self.matrix = grown
+            self.keys.append(key)
+            self.rows[key] = row
+        self.matrix[row] = vector
+
+    def remove(self, key: str):
+        row = self.rows.pop(key, None)
+        if row is None:
+            return
+        last_key = self.keys.pop()
+        if last_key != key:
+            self.matrix[row] = self.matrix[len(self.keys)]
+            self.keys[row] = last_key
+            self.rows[last_key] = row
+
+    def best(self, vector: np.ndarray) -> Tuple[str, float]:
+        """Key of the most similar row and its cosine similarity."""
+        similarities = self.matrix[:len(self.keys)] @ vector
+        row = int(np.argmax(similarities))
+        return self.keys[row], float(similarities[row])
+
+
+class SemanticCache:
+    """
+    Cache for LLM results keyed by their input text.
+
+    Lookups first try an exact match on a SHA-256 of the text. On a miss, and
+    when an embedding function is configured, the text is embedded and compared
+    against cached entries in the same namespace; a cosine similarity at or
+    above the threshold counts as a hit, so near-identical abstracts reuse one
+    generation instead of paying for another.
+    """
+
+    def __init__(self, embed_fn: Optional[Callable[[str], List[float]]] = None,
+                 threshold: float = 0.92, maxsize: int = 10000):
+        """
+        Initialize semantic cache.
+
+        Args:
+            embed_fn: Function returning an embedding for a text (None for exact-only)
+            threshold: Minimum cosine similarity for a near-match hit
+            maxsize: Maximum number of entries (least recently used evicted first)
+        """
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (namespace, embedding dimension or None, value)
+        self._indexes = {}  # (namespace, dimension) -> _UnitRowIndex of the entries' embeddings
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{text}".encode()).hexdigest()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, text: str, namespace: str = "", semantic: bool = True) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        Find a cached value for text.
+
+        Args:
+            text: Input text (e.g. abstract or paper ID)
+            namespace: Partition for entries that must not match each other (e.g. model name)
+            semantic: Whether to fall back to embedding similarity on an exact miss
+
+        Returns:
+            Tuple of (cached value or None, the text's embedding if one was computed).
+            Pass the embedding back to store() to avoid embedding the text twice.
+        """
+        key = self._key(namespace, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[2], None
+
+        if not semantic or self.embed_fn is None:
+            return None, None
+
+        embedding = self._normalize(self.embed_fn(text))
+        if embedding is None:
+            return None, None
+
+        with self._lock:
+            index = self._indexes.get((namespace, embedding.shape[0]))
+            if not index:
+                return None, embedding
+            best_key, similarity = index.best(embedding)
+            if similarity >= self.threshold:
+                self._entries.move_to_end(best_key)
+                return self._entries[best_key][2], embedding
+        return None, embedding
+
+    def store(self, text: str, value: Any, namespace: str = "", embedding: Optional[np.ndarray] = None):
+        """
+        Cache a value for text.
+
+        Args:
+            text: Input text the value was generated from
+            value: Result to cache (must be JSON-serializable to persist)
+            namespace: Partition the entry belongs to
+            embedding: Unit embedding returned by lookup(), if any
+        """
+        key = self._key(namespace, text)
+        with self._lock:
+            self._put(key, namespace, embedding, value)
+
+    def save(self, path):
+        """Write the cache to disk as JSON."""
+        with self._lock:
+            data = [
+                {"key": key, "namespace": ns, "embedding": self._embedding(key, ns, dim), "value": value}
+                for key, (ns, dim, value) in self._entries.items()
+            ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY))
+
+    def load(self, path):
+        """Load entries previously written by save(); missing files are ignored."""
+        path = Path(path)
+        if not path.exists():
+            return
+        data = orjson.loads(path.read_bytes())
+        with self._lock:
+            for item in data:
+                embedding = item.get("embedding")
+                if embedding is not None:
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                self._put(item["key"], item["namespace"], embedding, item["value"])
+
+    def _put(self, key: str, namespace: str, embedding: Optional[np.ndarray], value: Any):
+        """Insert or replace an entry, keeping the indexes in step (caller holds _lock)."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._unindex(key, previous)
+        dim = None
+        if embedding is not None:
+            dim = embedding.shape[0]
+            index = self._indexes.get((namespace, dim))
+            if index is None:
+                index = self._indexes[(namespace, dim)] = _UnitRowIndex(dim)
+            index.add(key, embedding)
+        self._entries[key] = (namespace, dim, value)
+        while len(self._entries) > self.maxsize:
+            self._unindex(*self._entries.popitem(last=False))
+
+    def _embedding(self, key: str, namespace: str, dim: Optional[int]) -> Optional[np.ndarray]:
+        """An entry's unit embedding, read from its index row (caller holds _lock)."""
+        if dim is None:
+            return None
+        index = self._indexes[(namespace, dim)]
+        return index.matrix[index.rows[key]]
+
+    def _unindex(self, key: str, entry):
+        namespace, dim, _ = entry
+        if dim is None:
+            return
+        index_key = (namespace, dim)
+        index = self._indexes.get(index_key)
+        if index is not None:
+            index.remove(key)
+            if not index:
+                del self._indexes[index_key]
+
+    @staticmethod
+    def _normalize(embedding) -> Optional[np.ndarray]:
+        if embedding is None or len(embedding) == 0:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
@@ -2,6 +2,7 @@
 
 from typing import List, Dict
 from google.genai import types
+from .utils import get_arxiv_client
 
 
 def define_arxiv_tools() -> List[Dict]:
@@ -159,8 +160,7 @@ class ArxivToolHandler:
                 max_results=max_results,
                 sort_by=getattr(arxiv.SortCriterion, sort_by, arxiv.SortCriterion.SubmittedDate)
             )
-            client = arxiv.Client()
-            papers = list(client.results(search))
+            papers = list(get_arxiv_client().results(search))
 
             results = []
             for paper in papers:
@@ -182,8 +182,7 @@ class ArxivToolHandler:
         try:
             import arxiv
             search = arxiv.Search(id_list=[paper_id])
-            client = arxiv.Client()
-            paper = next(iter(search.results()), None)
+            paper = next(iter(get_arxiv_client().results(search)), None)
 
             if not paper:
                 return {"error": f"Paper {paper_id} not found"}
@@ -3,9 +3,14 @@ import subprocess
 import feedparser
 import urllib.parse
 import time
+import os
 import random
-from functools import wraps
-from typing import Callable, Any
+import asyncio
+import threading
+import httpx
+import orjson
+from functools import lru_cache, wraps
+from typing import Awaitable, Callable, Any, List, Optional
 
 def get_unique_id(paper: dict) -> str:
     """
@@ -23,10 +28,23 @@ def parse_date(date_str: str) -> datetime:
         date_str = date_str[:-1]
     return datetime.fromisoformat(date_str)
 
+TOTAL_AVAILABLE_TTL = 60  # Seconds a query's total count is reused; counts change slowly
+
 def get_total_available(query: str, sort_by="submittedDate", sort_order="descending", start=0, max_results=0):
     """
     Returns the total number of articles for a given arXiv query.
+    Counts are reused for up to TOTAL_AVAILABLE_TTL seconds; failed lookups
+    return None and are retried on the next call.
     """
+    ttl_bucket = int(time.monotonic() // TOTAL_AVAILABLE_TTL)
+    try:
+        return _total_available(query, sort_by, sort_order, start, max_results, ttl_bucket)
+    except (httpx.HTTPError, LookupError):
+        return None
+
+@lru_cache(maxsize=256)
+def _total_available(query, sort_by, sort_order, start, max_results, ttl_bucket):
+    # Raises instead of returning None so lru_cache only keeps successful counts
     base_url = "http://export.arxiv.org/api/query?"
     params = {
         "search_query": query,
@@ -36,10 +54,77 @@ def get_total_available(query: str, sort_by="submittedDate", sort_order="descend
         "sortOrder": sort_order
     }
     url = base_url + urllib.parse.urlencode(params)
-    feed = feedparser.parse(url)
+    response = get_http_client().get(url)
+    response.raise_for_status()
+    feed = feedparser.parse(response.content)
     if hasattr(feed, "feed") and "opensearch_totalresults" in feed.feed:
         return int(feed.feed.opensearch_totalresults)
-    return None
+    raise LookupError("arXiv response has no total results count")
+
+@lru_cache(maxsize=64)
+def _load_json(path: str, mtime_ns: int, size: int):
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+@lru_cache(maxsize=64)
+def _read_text(path: str, mtime_ns: int, size: int) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def load_json_file(path):
+    """
+    Parses a JSON file, memoized on (path, mtime, size) so unchanged files
+    are only read once. Callers must treat the returned object as read-only.
+    """
+    st = os.stat(path)
+    return _load_json(os.fspath(path), st.st_mtime_ns, st.st_size)
+
+def read_text_file(path) -> str:
+    """
+    Reads a UTF-8 text file, memoized on (path, mtime, size).
+    """
+    st = os.stat(path)
+    return _read_text(os.fspath(path), st.st_mtime_ns, st.st_size)
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    """
+    Returns the process-wide pooled HTTP client, creating it on first use.
+    Sharing one client lets outbound requests reuse keep-alive connections
+    instead of paying a TCP+TLS handshake per call.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        with _http_client_lock:
+            if _http_client is None or _http_client.is_closed:
+                _http_client = httpx.Client(
+                    timeout=httpx.Timeout(30.0),
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=300),
+                    follow_redirects=True,
+                )
+    return _http_client
+
+@lru_cache(maxsize=1)
+def get_arxiv_client():
+    """
+    Returns the process-wide arXiv API client, creating it on first use.
+    Reusing it keeps one HTTP session (and its connections) to export.arxiv.org
+    and lets the client's built-in request spacing apply across calls.
+    """
+    import arxiv
+    return arxiv.Client(page_size=100, num_retries=3)
+
+def close_http_client():
+    """
+    Closes the shared HTTP client, if one was created.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
 
 def get_installed_ollama_models():
     """
@@ -159,3 +244,74 @@ class RateLimiter:
 
         # Record this call
         self.calls.append(time.time())
+
+
+class AsyncBatcher:
+    """
+    Coalesces concurrent async requests into a single blocking batch call.
+
+    Items submitted via process() within max_queue_time of each other (up to
+    max_batch_size) are handed to process_batch together on a worker thread;
+    process_batch must return one result per item, in order.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 16,
+                 max_queue_time: float = 0.05, run: Optional[Callable[..., Awaitable[Any]]] = None):
+        """
+        Initialize batcher.
+
+        Args:
+            process_batch: Blocking function mapping a list of items to a list of results
+            max_batch_size: Flush immediately once this many items are queued
+            max_queue_time: Maximum seconds an item waits for companions before flushing
+            run: Coroutine function run(func, *args) that calls func off the event loop
+                (default: the loop's default executor)
+        """
+        self.process_batch = process_batch
+        self.run = run
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def process(self, item: Any) -> Any:
+        """Queue an item and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_queue_time, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            if self.run is not None:
+                results = await self.run(self.process_batch, items)
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(None, self.process_batch, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
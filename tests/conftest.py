@@ -1,5 +1,6 @@
 # tests/conftest.py
 import sys
+import pytest
 from pathlib import Path
 
 print("sys.executable:", sys.executable)
@@ -23,3 +24,34 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "gui: mark a test as a GUI test that requires a display")
     config.addinivalue_line("markers", "live_api: mark a test as requiring live API calls")
     config.addinivalue_line("markers", "saves_images: mark a test as saving actual image files")
+
+
+# Settings naming where the app writes its output (all under arxiv_paper_pulse/data by default)
+OUTPUT_PATH_SETTINGS = (
+    "RAW_DATA_DIR", "SUMMARY_DIR", "BRIEFING_DIR", "IMAGE_OUTPUT_DIR", "IMAGE_API_LOG_DIR",
+    "GAME_OUTPUT_DIR", "ARTICLE_OUTPUT_DIR", "BOT_WORKING_DIR", "BEEHIIV_DATA_DIR", "SEMANTIC_CACHE_FILE",
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_output_dirs(tmp_path_factory, monkeypatch):
+    """Keep files written by the code under test out of the source tree."""
+    from arxiv_paper_pulse import config
+
+    data_dir = tmp_path_factory.mktemp("output") / "data"
+    for name in OUTPUT_PATH_SETTINGS:
+        monkeypatch.setattr(config, name, str(data_dir / Path(getattr(config, name)).name))
+
+
+@pytest.fixture(autouse=True)
+def clear_upstream_caches():
+    """arXiv lookups and feeds are memoized; keep mocked results from leaking between tests."""
+    from arxiv_paper_pulse.article_generator import _fetch_paper_metadata
+    from arxiv_paper_pulse.utils import _total_available, get_arxiv_client
+    from arxiv_paper_pulse import beehiiv_reader
+
+    _fetch_paper_metadata.cache_clear()
+    _total_available.cache_clear()
+    get_arxiv_client.cache_clear()
+    beehiiv_reader._feed_cache.clear()
+    yield
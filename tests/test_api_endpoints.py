@@ -13,6 +13,18 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def fresh_semantic_cache(monkeypatch, tmp_path):
+    """Isolate each test from summaries cached (or persisted) by other tests"""
+    from arxiv_paper_pulse import api, config
+    from arxiv_paper_pulse.semantic_cache import SemanticCache
+
+    cache = SemanticCache()
+    monkeypatch.setattr(api, "semantic_cache", cache)
+    monkeypatch.setattr(config, "SEMANTIC_CACHE_FILE", str(tmp_path / "semantic_cache.json"))
+    return cache
+
+
 @pytest.fixture
 def mock_summarizer():
     """Mock summarizer for API tests"""
@@ -128,6 +140,32 @@ class TestAdvancedEndpoints:
             )
             assert response.status_code == 200
 
+    def test_embeddings_generate_endpoint_serializes_numpy_vectors(self, client):
+        """Embedding vectors returned as numpy arrays are rendered as JSON lists"""
+        import numpy as np
+
+        with patch('arxiv_paper_pulse.api.PaperEmbeddings') as mock_embeddings:
+            mock_gen = Mock()
+            mock_gen.paper_key.side_effect = lambda paper: paper["id"]
+            mock_gen.generate_batch_embeddings.return_value = {
+                "p1": np.array([0.5, 0.25], dtype=np.float32),
+                "p2": np.array([1.0, 0.0], dtype=np.float32),
+            }
+            mock_embeddings.return_value = mock_gen
+
+            response = client.post(
+                "/api/embeddings/generate",
+                json=[
+                    {"id": "p1", "title": "First", "abstract": "A"},
+                    {"id": "p2", "title": "Second", "abstract": "B"},
+                ]
+            )
+            assert response.status_code == 200
+            assert response.json() == {
+                "status": "success",
+                "embeddings": {"p1": [0.5, 0.25], "p2": [1.0, 0.0]},
+            }
+
 
 class TestBatchEndpoints:
     """Tests for batch processing endpoints"""
@@ -157,3 +195,562 @@ class TestBatchEndpoints:
             response = client.get("/api/batch/test_batch_id/status")
             assert response.status_code == 200
 
+
+
+class TestResponseSerialization:
+    """Tests for orjson-backed response rendering"""
+
+    def test_orjson_response_handles_numpy_and_int_keys(self):
+        """ORJSONResponse serializes numpy arrays and non-string keys"""
+        import numpy as np
+        from arxiv_paper_pulse.api import ORJSONResponse
+
+        response = ORJSONResponse({1: np.array([0.5, 1.0], dtype=np.float32)})
+        assert response.body == b'{"1":[0.5,1.0]}'
+
+    def test_papers_endpoint_reads_latest_summary(self, client, tmp_path, monkeypatch):
+        """GET /api/papers returns the newest summary file's contents"""
+        from arxiv_paper_pulse import config
+
+        (tmp_path / "2024-01-01_000000_summary.json").write_text('[{"title": "Old"}]')
+        (tmp_path / "2024-01-02_000000_summary.json").write_text('[{"title": "New"}]')
+        monkeypatch.setattr(config, "SUMMARY_DIR", str(tmp_path))
+
+        response = client.get("/api/papers")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["papers"] == [{"title": "New"}]
+        assert data["file"] == "2024-01-02_000000_summary.json"
+
+
+class TestSummarizerCache:
+    """Tests for the bounded summarizer cache"""
+
+    def test_least_recently_used_summarizer_is_evicted_and_closed(self, monkeypatch):
+        """get_summarizer keeps at most SUMMARIZER_CACHE_SIZE instances"""
+        from collections import OrderedDict
+        from arxiv_paper_pulse import api
+
+        monkeypatch.setattr(api, "summarizer_cache", OrderedDict())
+        monkeypatch.setattr(api, "SUMMARIZER_CACHE_SIZE", 2)
+        monkeypatch.setattr(api, "ArxivSummarizer", lambda **kwargs: Mock())
+
+        first = api.get_summarizer(query="a")
+        second = api.get_summarizer(query="b")
+        assert api.get_summarizer(query="a") is first
+        api.get_summarizer(query="c")
+
+        second.close.assert_called_once()
+        first.close.assert_not_called()
+        assert len(api.summarizer_cache) == 2
+
+    def test_expired_summarizer_is_replaced(self, monkeypatch):
+        """Entries older than SUMMARIZER_TTL are closed and rebuilt"""
+        from collections import OrderedDict
+        from arxiv_paper_pulse import api
+
+        monkeypatch.setattr(api, "summarizer_cache", OrderedDict())
+        monkeypatch.setattr(api, "ArxivSummarizer", lambda **kwargs: Mock())
+
+        first = api.get_summarizer(query="a")
+        monkeypatch.setattr(api, "SUMMARIZER_TTL", 0)
+        second = api.get_summarizer(query="a")
+
+        assert second is not first
+        first.close.assert_called_once()
+
+    def test_summarizer_built_off_the_event_loop_and_outside_the_lock(self, client, monkeypatch):
+        """Handlers build summarizers on the worker pool without holding the cache lock"""
+        import threading
+        from collections import OrderedDict
+        from arxiv_paper_pulse import api
+
+        built = []
+
+        def build(**kwargs):
+            built.append((threading.current_thread().name, api._summarizer_lock.locked()))
+            summarizer = Mock()
+            summarizer.fetch_raw_data.return_value = []
+            return summarizer
+
+        monkeypatch.setattr(api, "summarizer_cache", OrderedDict())
+        monkeypatch.setattr(api, "ArxivSummarizer", build)
+
+        response = client.post("/api/search", params={"query": "cat:cs.LG"})
+
+        assert response.status_code == 200
+        assert len(built) == 1
+        thread_name, lock_held = built[0]
+        assert thread_name.startswith("api-worker")
+        assert not lock_held
+
+
+class TestStreamingEndpoints:
+    """Tests for server-sent event streaming"""
+
+    def test_summarize_stream_frames(self, client, mock_summarizer):
+        """POST /api/summarize-stream emits status, chunk and done frames"""
+        mock_summarizer.gemini_summarize.return_value = iter([Mock(text="Hello"), Mock(text=""), Mock(text=" world")])
+
+        response = client.post("/api/summarize-stream", json={"abstract": "Test abstract"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["x-accel-buffering"] == "no"
+        assert response.text == (
+            'data: {"type":"status","text":"Starting analysis..."}\n\n'
+            'data: {"type":"chunk","text":"Hello"}\n\n'
+            'data: {"type":"chunk","text":" world"}\n\n'
+            'data: {"type":"done"}\n\n'
+        )
+
+    def test_summarize_stream_chunk_frames_escape_text(self, client, mock_summarizer):
+        """Pre-encoded chunk frames match a full JSON encode for quotes, newlines and unicode"""
+        from arxiv_paper_pulse import api
+
+        text = 'He said "hi"\nthen left ✓'
+        mock_summarizer.gemini_summarize.return_value = iter([Mock(text=text)])
+
+        response = client.post("/api/summarize-stream", json={"abstract": "Test abstract"})
+
+        assert api._sse_frame({'type': 'chunk', 'text': text}) in response.content
+
+    def test_summarize_stream_sends_keepalive_while_idle(self, client, mock_summarizer, monkeypatch):
+        """A ping comment is emitted while waiting on a slow chunk"""
+        import time
+        from arxiv_paper_pulse import api
+
+        monkeypatch.setattr(api, "SSE_PING_INTERVAL", 0.05)
+
+        def slow_stream():
+            time.sleep(0.2)
+            yield Mock(text="late")
+
+        mock_summarizer.gemini_summarize.return_value = slow_stream()
+
+        response = client.post("/api/summarize-stream", json={"abstract": "Test abstract"})
+
+        assert ": ping\n\n" in response.text
+        assert response.text.endswith('data: {"type":"chunk","text":"late"}\n\ndata: {"type":"done"}\n\n')
+
+    def test_summarize_stream_is_not_compressed(self, client, mock_summarizer):
+        """Streaming responses bypass gzip even when the client accepts it"""
+        mock_summarizer.gemini_summarize.return_value = iter([Mock(text="x" * 4096)])
+
+        response = client.post(
+            "/api/summarize-stream",
+            json={"abstract": "Test abstract"},
+            headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "content-encoding" not in response.headers
+
+
+class TestCompression:
+    """Tests for response compression"""
+
+    def test_large_json_response_is_gzipped(self, client, tmp_path, monkeypatch):
+        """Large JSON bodies are gzip-compressed for clients that accept it"""
+        from arxiv_paper_pulse import config
+
+        papers = '[' + ','.join('{"title": "Paper %d", "summary": "%s"}' % (i, "text " * 50) for i in range(20)) + ']'
+        (tmp_path / "2024-01-01_000000_summary.json").write_text(papers)
+        monkeypatch.setattr(config, "SUMMARY_DIR", str(tmp_path))
+
+        response = client.get("/api/papers", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()["papers"]) == 20
+
+
+class TestFileMemoization:
+    """Tests for mtime-keyed file loading"""
+
+    def test_load_json_file_reuses_parse_until_file_changes(self, tmp_path):
+        """load_json_file returns the cached object until the file is rewritten"""
+        import os
+        from arxiv_paper_pulse.utils import load_json_file
+
+        path = tmp_path / "data.json"
+        path.write_text('{"a": 1}')
+        first = load_json_file(path)
+        assert load_json_file(path) is first
+
+        path.write_text('{"a": 22}')
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+        assert load_json_file(path) == {"a": 22}
+
+    def test_briefing_endpoint_serves_latest_content(self, client, tmp_path, monkeypatch):
+        """GET /api/briefing reflects edits to the briefing file"""
+        from arxiv_paper_pulse import config
+
+        briefing = tmp_path / "2024-01-01_000000_briefing.md"
+        briefing.write_text("# Draft")
+        monkeypatch.setattr(config, "BRIEFING_DIR", str(tmp_path))
+        assert client.get("/api/briefing").json()["content"] == "# Draft"
+
+        briefing.write_text("# Final version")
+        assert client.get("/api/briefing").json()["content"] == "# Final version"
+
+
+class TestConditionalRequests:
+    """Tests for ETag / 304 handling on file-backed endpoints"""
+
+    def test_papers_returns_304_for_matching_etag(self, client, tmp_path, monkeypatch):
+        """A matching If-None-Match short-circuits with 304 and no body"""
+        from arxiv_paper_pulse import config
+
+        (tmp_path / "2024-01-01_000000_summary.json").write_text('[{"title": "Paper"}]')
+        monkeypatch.setattr(config, "SUMMARY_DIR", str(tmp_path))
+
+        first = client.get("/api/papers")
+        etag = first.headers["etag"]
+
+        second = client.get("/api/papers", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.content == b""
+
+        stale = client.get("/api/papers", headers={"If-None-Match": '"0-0"'})
+        assert stale.status_code == 200
+
+    def test_article_honours_if_modified_since(self, client, tmp_path, monkeypatch):
+        """GET /api/articles/{name} returns 304 when unchanged since Last-Modified"""
+        from arxiv_paper_pulse import config
+
+        (tmp_path / "article.md").write_text("# Article")
+        monkeypatch.setattr(config, "ARTICLE_OUTPUT_DIR", str(tmp_path))
+
+        first = client.get("/api/articles/article.md")
+        assert first.status_code == 200
+        assert first.text == "# Article"
+        assert first.headers["content-disposition"] == 'inline; filename="article.md"'
+
+        second = client.get(
+            "/api/articles/article.md",
+            headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+        assert second.status_code == 304
+
+    def test_latest_file_scanned_off_the_event_loop(self, client, tmp_path, monkeypatch):
+        """The directory scan and stat for /api/papers and /api/briefing run on a worker thread"""
+        import asyncio
+        from arxiv_paper_pulse import api, config
+
+        (tmp_path / "2024-01-01_000000_summary.json").write_text('[]')
+        (tmp_path / "2024-01-01_000000_briefing.md").write_text('# Briefing')
+        monkeypatch.setattr(config, "SUMMARY_DIR", str(tmp_path))
+        monkeypatch.setattr(config, "BRIEFING_DIR", str(tmp_path))
+        on_loop = []
+
+        def latest_file_stat(directory, suffix):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(suffix)
+            except RuntimeError:
+                pass
+            return real_latest_file_stat(directory, suffix)
+
+        real_latest_file_stat = api._latest_file_stat
+        monkeypatch.setattr(api, "_latest_file_stat", latest_file_stat)
+
+        assert client.get("/api/papers").status_code == 200
+        assert client.get("/api/briefing").json()["content"] == "# Briefing"
+        assert on_loop == []
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical in-flight fetches"""
+
+    def test_concurrent_identical_calls_share_one_fetch(self):
+        """Concurrent callers with the same key trigger a single upstream call"""
+        import asyncio
+        import threading
+        from arxiv_paper_pulse import api
+
+        calls = []
+        release = threading.Event()
+
+        def fetch(query):
+            calls.append(query)
+            release.wait(1)
+            return [query]
+
+        async def run():
+            pending = [asyncio.ensure_future(api._single_flight(("search", "q"), fetch, "q")) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*pending)
+
+        assert asyncio.run(run()) == [["q"], ["q"], ["q"]]
+        assert calls == ["q"]
+        assert api._inflight == {}
+
+
+class TestGeminiConcurrency:
+    """Tests for the cap on concurrent Gemini calls"""
+
+    def test_gemini_calls_limited_to_configured_concurrency(self, monkeypatch):
+        """No more than GEMINI_MAX_CONCURRENCY calls run at once; the rest queue"""
+        import asyncio
+        import threading
+        import time
+        from arxiv_paper_pulse import api, config
+
+        monkeypatch.setattr(config, "GEMINI_MAX_CONCURRENCY", 2)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def call(i):
+            with lock:
+                running.append(i)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(i)
+            return i
+
+        async def run():
+            return await asyncio.gather(*(api._run_gemini(call, i) for i in range(6)))
+
+        assert asyncio.run(run()) == list(range(6))
+        assert max(peak) == 2
+
+    def test_streaming_embedding_and_cache_calls_hold_a_gemini_slot(self, client, mock_summarizer, monkeypatch,
+                                                                    fresh_semantic_cache):
+        """Streamed summaries, embedding batches and cache embeds all run inside the limiter"""
+        import numpy as np
+        from arxiv_paper_pulse import api
+
+        class RecordingLimiter:
+            held = 0
+
+            async def __aenter__(self):
+                RecordingLimiter.held += 1
+
+            async def __aexit__(self, *exc):
+                RecordingLimiter.held -= 1
+
+        monkeypatch.setattr(api, "_get_gemini_limiter", RecordingLimiter)
+        seen = {}
+
+        def stream_chunks():
+            seen["stream"] = RecordingLimiter.held
+            yield Mock(text="chunk")
+
+        mock_summarizer.gemini_summarize.side_effect = lambda *args, **kwargs: stream_chunks()
+        client.post("/api/summarize-stream", json={"abstract": "Streamed"})
+
+        def cache_embed(text):
+            seen["cache_embed"] = RecordingLimiter.held
+            return []
+
+        fresh_semantic_cache.embed_fn = cache_embed
+        mock_summarizer.gemini_summarize.side_effect = None
+        mock_summarizer.gemini_summarize.return_value = "plain text"
+        client.post("/api/summarize-structured", json={"abstract": "Structured"})
+
+        with patch('arxiv_paper_pulse.api.PaperEmbeddings') as mock_embeddings:
+            mock_gen = mock_embeddings.return_value
+            mock_gen.paper_key.side_effect = lambda paper: paper["id"]
+
+            def embed(papers):
+                seen["embeddings"] = RecordingLimiter.held
+                return {"p1": np.array([1.0], dtype=np.float32)}
+
+            mock_gen.generate_batch_embeddings.side_effect = embed
+            client.post("/api/embeddings/generate", json=[{"id": "p1", "title": "T"}])
+
+        assert seen == {"stream": 1, "cache_embed": 1, "embeddings": 1}
+
+
+class TestEmbeddingPayloadLimits:
+    """Tests for embedding request size limits"""
+
+    def test_oversized_similarity_request_is_rejected(self, client, monkeypatch):
+        """POST /api/embeddings/similar returns 413 above EMBEDDINGS_MAX_PAPERS"""
+        from arxiv_paper_pulse import config
+
+        monkeypatch.setattr(config, "EMBEDDINGS_MAX_PAPERS", 2)
+        with patch('arxiv_paper_pulse.api.PaperEmbeddings') as mock_embeddings:
+            response = client.post(
+                "/api/embeddings/similar",
+                json={"target_paper": {"title": "T"}, "all_papers": [{"title": str(i)} for i in range(3)]}
+            )
+
+        assert response.status_code == 413
+        mock_embeddings.assert_not_called()
+
+
+class TestSelfPlayingGameEndpoint:
+    """Tests for the self-playing game endpoint"""
+
+    def test_game_is_designed_executed_and_saved(self, client, tmp_path):
+        """POST /api/generate-self-playing-game runs the generated code via the limiter"""
+        with patch('arxiv_paper_pulse.api.SelfDesigningGame') as mock_game_class:
+            generator = mock_game_class.return_value
+            generator.design_game.return_value = {"valid": True, "code": "print('hi')", "response_time": 0.1}
+            generator.execute_game.return_value = {
+                "success": True, "stdout": "hi\n", "stderr": "", "returncode": 0, "execution_time": 0.01
+            }
+            generator.save_game.return_value = tmp_path
+
+            response = client.post("/api/generate-self-playing-game", json={"prompt": "pong"})
+
+        assert response.status_code == 200
+        assert response.json()["execution"]["stdout"] == "hi\n"
+        generator.execute_game.assert_called_once_with("print('hi')")
+
+
+class TestBatchSummarize:
+    """Tests for routing summarization through the Batch API"""
+
+    def test_summarize_with_use_batch_returns_202(self, client, mock_summarizer, monkeypatch):
+        """POST /api/summarize?use_batch=true submits one batch job and registers it"""
+        from collections import OrderedDict
+        from arxiv_paper_pulse import api
+
+        monkeypatch.setattr(api, "batch_registry", OrderedDict())
+        mock_summarizer.model = "gemini-2.5-flash"
+        mock_summarizer.submit_summary_batch.return_value = ("batches/123", [{"id": "p1"}, {"id": "p2"}])
+
+        response = client.post("/api/summarize?use_batch=true")
+
+        assert response.status_code == 202
+        assert response.json() == {"status": "accepted", "batch_id": "batches/123", "count": 2}
+        assert api.batch_registry["batches/123"]["paper_ids"] == ["p1", "p2"]
+        mock_summarizer.summarize_papers.assert_not_called()
+
+    def test_batch_results_are_tagged_with_paper_ids(self, client, monkeypatch):
+        """GET /api/batch/{id}/results uses the registered model and paper order"""
+        from collections import OrderedDict
+        from arxiv_paper_pulse import api
+
+        registry = OrderedDict({"b1": {"model": "gemini-2.5-pro", "paper_ids": ["p1", "p2"], "submitted_at": 0}})
+        monkeypatch.setattr(api, "batch_registry", registry)
+        with patch('arxiv_paper_pulse.api.BatchPaperProcessor') as mock_batch:
+            mock_batch.return_value.get_batch_results.return_value = [{"text": "A"}, {"text": "B"}]
+
+            response = client.get("/api/batch/b1/results")
+
+        mock_batch.assert_called_once_with(model="gemini-2.5-pro", client=None)
+        assert [r["paper_id"] for r in response.json()["results"]] == ["p1", "p2"]
+
+
+class TestBatchEvents:
+    """Tests for streaming batch state transitions"""
+
+    def test_batch_events_stream_transitions_until_done(self, client, monkeypatch):
+        """GET /api/batch/{id}/events emits each new state once, then done"""
+        from arxiv_paper_pulse import api
+
+        monkeypatch.setattr(api, "BATCH_POLL_INITIAL", 0)
+        states = ["JOB_STATE_PENDING", "JOB_STATE_RUNNING", "JOB_STATE_RUNNING", "JOB_STATE_SUCCEEDED"]
+        with patch('arxiv_paper_pulse.api.BatchPaperProcessor') as mock_batch:
+            mock_batch.return_value.check_batch_status.side_effect = [{"id": "b1", "state": s} for s in states]
+
+            response = client.get("/api/batch/b1/events")
+
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text == (
+            'data: {"type":"status","batch_status":{"id":"b1","state":"JOB_STATE_PENDING"}}\n\n'
+            'data: {"type":"status","batch_status":{"id":"b1","state":"JOB_STATE_RUNNING"}}\n\n'
+            'data: {"type":"status","batch_status":{"id":"b1","state":"JOB_STATE_SUCCEEDED"}}\n\n'
+            'data: {"type":"done"}\n\n'
+        )
+        assert api._batch_watches == {}
+
+    def test_concurrent_watchers_share_one_poll(self, monkeypatch):
+        """Clients watching the same batch are served by a single poll task"""
+        import asyncio
+        from arxiv_paper_pulse import api
+
+        async def run():
+            first = api._watch_batch("b1")
+            second = api._watch_batch("b1")
+            await first.task
+            return first, second
+
+        with patch('arxiv_paper_pulse.api.BatchPaperProcessor') as mock_batch:
+            mock_batch.return_value.check_batch_status.return_value = {"id": "b1", "state": "JOB_STATE_FAILED"}
+            first, second = asyncio.run(run())
+
+        assert first is second
+        assert first.finished
+        mock_batch.return_value.check_batch_status.assert_called_once_with("b1")
+
+
+class TestLifespanSingletons:
+    """Tests for clients shared across requests via the app lifespan"""
+
+    def test_lifespan_shares_one_genai_client(self, monkeypatch):
+        """Startup builds one Gemini client for all helpers; shutdown releases it"""
+        from arxiv_paper_pulse import api, config
+
+        monkeypatch.setattr(config, "GEMINI_API_KEY", "test-key")
+        with patch('arxiv_paper_pulse.api.genai.Client') as mock_client_class, \
+                patch('arxiv_paper_pulse.api.get_summarizer'):
+            with TestClient(app):
+                shared = app.state.genai_client
+                assert shared is mock_client_class.return_value
+                assert app.state.image_generator.client is shared
+                assert app.state.embeddings.client is shared
+                assert api.get_batch_processor("gemini-2.5-pro").client is shared
+
+            shared.close.assert_called_once()
+            assert not hasattr(app.state, "genai_client")
+
+
+class TestSemanticCache:
+    """Tests for reuse of structured and PDF summaries"""
+
+    def test_structured_summary_reused_for_near_duplicate_abstract(self, client, mock_summarizer, fresh_semantic_cache):
+        """A near-identical abstract is answered from the cache without calling Gemini"""
+        from arxiv_paper_pulse.models import PaperAnalysis, Methodology, Results
+
+        vectors = {"Test abstract": [1.0, 0.0], "Test abstract.": [0.99, 0.05]}
+        fresh_semantic_cache.embed_fn = vectors.get
+        mock_summarizer.model = "gemini-2.5-flash"
+        mock_summarizer.gemini_summarize.return_value = PaperAnalysis(
+            problem_statement="Test",
+            methodology=Methodology(approach="test"),
+            results=Results(key_findings=[]),
+            relevance_score=5
+        )
+
+        first = client.post("/api/summarize-structured", json={"abstract": "Test abstract"})
+        second = client.post("/api/summarize-structured", json={"abstract": "Test abstract."})
+
+        assert mock_summarizer.gemini_summarize.call_count == 1
+        assert second.json()["cached"] is True
+        assert second.json()["analysis"] == first.json()["analysis"]
+
+    def test_pdf_summary_cached_per_paper_but_not_errors(self, client, mock_summarizer):
+        """PDF summaries are reused by paper ID; error text is never cached"""
+        mock_summarizer.model = "gemini-2.5-flash"
+        mock_summarizer.gemini_summarize_from_pdf.side_effect = ["Error generating summary: boom", "PDF summary"]
+
+        responses = [client.post("/api/summarize-pdf", params={"paper_id": "2301.12345"}) for _ in range(3)]
+
+        assert [r.json()["summary"] for r in responses] == [
+            "Error generating summary: boom", "PDF summary", "PDF summary"
+        ]
+        assert mock_summarizer.gemini_summarize_from_pdf.call_count == 2
+
+    def test_cache_embedding_matches_sdk_signature(self, monkeypatch):
+        """The cache's embed call is accepted by the real embed_content signature"""
+        from unittest.mock import create_autospec
+        from google.genai import models, types
+        from arxiv_paper_pulse import api
+        from arxiv_paper_pulse.embeddings import PaperEmbeddings
+
+        client = Mock()
+        client.models = create_autospec(models.Models, instance=True)
+        client.models.embed_content.return_value = types.EmbedContentResponse(
+            embeddings=[types.ContentEmbedding(values=[0.6, 0.8])]
+        )
+        monkeypatch.setattr(app.state, "embeddings", PaperEmbeddings(client=client), raising=False)
+
+        assert api._embed_for_cache("Test abstract") == [0.6, 0.8]
+        client.models.embed_content.assert_called_once_with(model="models/text-embedding-004", contents=["Test abstract"])
@@ -202,6 +202,41 @@ class TestGenerateArticle:
         # Cleanup
         Path(result_path).unlink()
 
+    @patch('arxiv_paper_pulse.article_generator.ImageGenerator')
+    @patch('arxiv_paper_pulse.article_generator.DocumentProcessor')
+    @patch('arxiv_paper_pulse.article_generator.genai.Client')
+    @patch('arxiv_paper_pulse.article_generator._fetch_paper_metadata')
+    def test_docx_article_maps_markdown_headings(self, mock_fetch_metadata, mock_client, mock_doc_processor, mock_img_generator):
+        """Markdown headings become DOCX headings at their level; other blocks become paragraphs."""
+        from docx import Document
+
+        mock_fetch_metadata.return_value = {
+            'title': "Test Paper",
+            'authors': ["Author One"],
+            'published': "2023-01-01",
+            'paper_id': "2301.12345",
+            'arxiv_url': "http://arxiv.org/abs/2301.12345"
+        }
+        mock_doc_processor.return_value.process.return_value = Mock(success=True, text="Test analysis content")
+        mock_img_generator.return_value.generate_and_save.return_value = "/path/to/image.png"
+        mock_client.return_value.models.generate_content.side_effect = [
+            Mock(text="Image prompt text"),
+            Mock(text="# Title\n\n## Section\n\n  Body text.  \n\n\n\n#### Deep\n\nClosing.")
+        ]
+
+        result_path = generate_article("2301.12345", output_format="docx")
+
+        body = [(p.style.name, p.text) for p in Document(result_path).paragraphs if p.text][-5:]
+        assert body == [
+            ("Heading 1", "Title"),
+            ("Heading 2", "Section"),
+            ("Normal", "Body text."),
+            ("Heading 3", "Deep"),
+            ("Normal", "Closing."),
+        ]
+
+        Path(result_path).unlink()
+
     @patch('arxiv_paper_pulse.article_generator.ImageGenerator')
     @patch('arxiv_paper_pulse.article_generator.DocumentProcessor')
     @patch('arxiv_paper_pulse.article_generator.genai.Client')
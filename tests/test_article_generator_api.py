@@ -74,22 +74,32 @@ class TestArticleGeneratorAPI:
         assert response.status_code == 400
         assert "Paper not found" in response.json()["detail"]
 
-    def test_list_articles_endpoint(self, client):
+    def test_list_articles_endpoint(self, client, tmp_path, monkeypatch):
         """GET /api/articles lists all generated articles."""
-        with patch('pathlib.Path.exists', return_value=True):
-            with patch('pathlib.Path.glob') as mock_glob:
-                mock_article = Mock()
-                mock_article.name = "article_1706.03762.md"
-                mock_article.stat.return_value.st_size = 1024
-                mock_article.stat.return_value.st_mtime = 1234567890
-                mock_glob.return_value = [mock_article]
-
-                response = client.get("/api/articles")
-
-                assert response.status_code == 200
-                data = response.json()
-                assert "articles" in data
-                assert "count" in data
+        import os
+        from arxiv_paper_pulse import config
+        monkeypatch.setattr(config, "ARTICLE_OUTPUT_DIR", str(tmp_path))
+        older = tmp_path / "article_1706.03762.md"
+        older.write_text("# Old")
+        os.utime(older, (1234567890, 1234567890))
+        (tmp_path / "article_2401.00001.docx").write_bytes(b"docx")
+        (tmp_path / "notes.txt").write_text("ignored")
+
+        response = client.get("/api/articles")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert [a["name"] for a in data["articles"]] == [
+            "article_2401.00001.docx", "article_1706.03762.md"
+        ]
+        assert data["articles"][1]["size"] == 5
+        assert data["articles"][1]["format"] == "md"
+
+        # A new file bumps the directory mtime and invalidates the cached scan
+        (tmp_path / "article_2402.00002.md").write_text("# New")
+        os.utime(tmp_path, ns=(0, tmp_path.stat().st_mtime_ns + 1))
+        assert client.get("/api/articles").json()["count"] == 3
 
     def test_list_articles_endpoint_empty(self, client):
         """GET /api/articles returns empty list when no articles exist."""
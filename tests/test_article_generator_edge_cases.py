@@ -115,6 +115,105 @@ class TestFetchPaperMetadataEdgeCases:
         metadata = _fetch_paper_metadata("2301.12345")
         assert len(metadata['authors']) == 100
 
+    @patch('arxiv_paper_pulse.article_generator.arxiv.Client')
+    @patch('arxiv_paper_pulse.article_generator.arxiv.Search')
+    def test_stops_after_first_result(self, mock_search, mock_client):
+        """Only the first result is pulled from the results generator."""
+        pulled = []
+
+        def results(search):
+            for i in range(3):
+                pulled.append(i)
+                paper = Mock(title=f"Paper {i}", authors=[], published="2023-01-01",
+                             entry_id="http://arxiv.org/abs/2301.12345")
+                yield paper
+
+        mock_client.return_value.results.side_effect = results
+
+        metadata = _fetch_paper_metadata("2301.12345")
+        assert metadata['title'] == "Paper 0"
+        assert pulled == [0]
+
+    @patch('arxiv_paper_pulse.article_generator.arxiv.Client')
+    @patch('arxiv_paper_pulse.article_generator.arxiv.Search')
+    def test_missing_paper_raises(self, mock_search, mock_client):
+        """An empty result set reports the paper as not found."""
+        mock_client.return_value.results.return_value = iter([])
+
+        with pytest.raises(ValueError, match="not found"):
+            _fetch_paper_metadata("2301.12345")
+
+
+    @patch('arxiv_paper_pulse.article_generator.arxiv.Client')
+    @patch('arxiv_paper_pulse.article_generator.arxiv.Search')
+    def test_repeat_lookups_are_cached(self, mock_search, mock_client):
+        """Metadata for the same paper is fetched from arXiv once."""
+        mock_paper = Mock(title="Test Paper", authors=[], published="2023-01-01",
+                          entry_id="http://arxiv.org/abs/2301.12345")
+        mock_client.return_value.results.side_effect = lambda search: iter([mock_paper])
+
+        first = _fetch_paper_metadata("2301.12345")
+        second = _fetch_paper_metadata("2301.12345")
+
+        assert first == second
+        assert mock_client.return_value.results.call_count == 1
+
+
+class TestPdfDownloadEdgeCases:
+    """Test edge cases for streaming PDFs into the File API."""
+
+    def _processor(self):
+        from arxiv_paper_pulse.documents import DocumentProcessor
+        with patch('google.genai.Client'):
+            return DocumentProcessor(api_key="test-key")
+
+    def _url_input(self):
+        from arxiv_paper_pulse.documents import DocumentInput, DocumentFromURL
+        return DocumentInput(source=DocumentFromURL(url="https://arxiv.org/pdf/2301.12345"))
+
+    def test_url_pdf_streamed_to_upload(self):
+        """Remote PDFs are streamed to a seekable buffer and uploaded from it."""
+        import httpx
+        body = b"%PDF-1.4" + b"x" * 600_000
+        http = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+        processor = self._processor()
+        uploaded = {}
+        processor.client.files.upload.side_effect = lambda file, config: uploaded.setdefault("data", file.read())
+
+        with patch('arxiv_paper_pulse.utils.get_http_client', return_value=http):
+            processor._upload_file(self._url_input())
+
+        assert uploaded["data"] == body
+
+    def test_url_pdf_upload_receives_io_stream(self, monkeypatch):
+        """Small and spilled downloads are both io.IOBase streams, never mistaken for paths."""
+        import io
+        import httpx
+        from arxiv_paper_pulse import documents
+        monkeypatch.setattr(documents, "DOWNLOAD_SPOOL_SIZE", 1024)
+        processor = self._processor()
+
+        for body in (b"%PDF" + b"x" * 100, b"%PDF" + b"x" * 4096):
+            http = httpx.Client(transport=httpx.MockTransport(lambda request, body=body: httpx.Response(200, content=body)))
+            with patch('arxiv_paper_pulse.utils.get_http_client', return_value=http):
+                spool = processor._download_to_spool("https://arxiv.org/pdf/2301.12345")
+            assert isinstance(spool, io.IOBase)
+            assert spool.read() == body
+            spool.close()
+
+    def test_oversized_url_pdf_aborts_download(self, monkeypatch):
+        """Downloads stop once they cross the File API size limit."""
+        import httpx
+        from arxiv_paper_pulse import documents
+        monkeypatch.setattr(documents, "FILE_API_MAX_SIZE", 1024)
+        http = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 4096)))
+        processor = self._processor()
+
+        with patch('arxiv_paper_pulse.utils.get_http_client', return_value=http):
+            with pytest.raises(ValueError, match="too large"):
+                processor._upload_file(self._url_input())
+        processor.client.files.upload.assert_not_called()
+
 
 class TestGenerateArticleEdgeCases:
     """Test edge cases for article generation."""
@@ -249,7 +249,7 @@ class TestStepByStepProcess:
             raise
 
     @patch('arxiv_paper_pulse.article_generator.ImageGenerator')
-    def test_step_5_image_generation(self, mock_img_generator_class):
+    def test_step_5_image_generation(self, mock_img_generator_class, tmp_path):
         """STEP 5: Generate image from prompt (MOCKED)."""
         print("\n" + "="*80)
         print("STEP 5: Testing Image Generation (MOCKED - NO API CALLS)")
@@ -258,8 +258,7 @@ class TestStepByStepProcess:
         try:
             # Mock image generator
             mock_generator = Mock()
-            test_image_path = Path("arxiv_paper_pulse/data/generated_images/test_step_image.png")
-            test_image_path.parent.mkdir(parents=True, exist_ok=True)
+            test_image_path = tmp_path / "test_step_image.png"
 
             # Create a dummy image file
             test_image_path.write_bytes(b'fake image data')
@@ -388,7 +387,7 @@ The Transformer architecture has revolutionized sequence processing.
             traceback.print_exc()
             raise
 
-    def test_step_7_file_creation(self):
+    def test_step_7_file_creation(self, tmp_path):
         """STEP 7: Create output files (markdown and DOCX) - NO MOCKS NEEDED."""
         print("\n" + "="*80)
         print("STEP 7: Testing File Creation (NO MOCKS - ACTUAL FILE OPERATIONS)")
@@ -398,8 +397,8 @@ The Transformer architecture has revolutionized sequence processing.
         from docx import Document
 
         try:
-            output_dir = Path("arxiv_paper_pulse/data/articles")
-            output_dir.mkdir(parents=True, exist_ok=True)
+            output_dir = tmp_path / "articles"
+            output_dir.mkdir()
 
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             test_content = "# Test Article\n\nThis is a test article for file creation testing."
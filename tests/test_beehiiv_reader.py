@@ -0,0 +1,314 @@
+"""Tests for the Beehiiv RSS feed reader."""
+import httpx
+import pytest
+
+from arxiv_paper_pulse.beehiiv_reader import BeehiivReader
+
+FEED_URL = "https://example.beehiiv.com/feed"
+
+SAMPLE_RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Example Newsletter</title>
+    <link>https://example.beehiiv.com</link>
+    <description>An example feed</description>
+    <item>
+      <title>First Post</title>
+      <link>https://example.beehiiv.com/p/first-post</link>
+      <guid>https://example.beehiiv.com/p/first-post</guid>
+      <pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate>
+      <description>Hello world</description>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+@pytest.fixture
+def beehiiv_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("arxiv_paper_pulse.config.BEEHIIV_DATA_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_client(handler):
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def test_get_feed_info_uses_injected_client(beehiiv_dir):
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(200, content=SAMPLE_RSS)
+
+    reader = BeehiivReader(FEED_URL, http_client=make_client(handler))
+    info = reader.get_feed_info()
+
+    assert requested == [FEED_URL]
+    assert info["title"] == "Example Newsletter"
+    assert info["article_count"] == 1
+
+
+def test_fetch_feed_http_error_raises_value_error(beehiiv_dir):
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(404)))
+
+    with pytest.raises(ValueError, match="Failed to fetch RSS feed"):
+        reader.fetch_feed()
+
+
+def test_fetched_feed_round_trips_through_stored_articles(beehiiv_dir):
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=SAMPLE_RSS)))
+    feed_data = reader.fetch_feed()
+
+    assert len(list(beehiiv_dir.glob("beehiiv_feed_*.json"))) == 1
+    assert get_stored_articles() == feed_data["articles"]
+
+
+def test_fetch_feed_reuses_parsed_feed_until_invalidated(beehiiv_dir):
+    requested = []
+
+    def handler(request):
+        requested.append(request)
+        return httpx.Response(200, content=SAMPLE_RSS)
+
+    client = make_client(handler)
+    reader = BeehiivReader(FEED_URL, http_client=client)
+
+    first = reader.fetch_feed()
+    assert BeehiivReader(FEED_URL, http_client=client).get_article_by_id(first["articles"][0]["id"])["title"] == "First Post"
+    assert len(requested) == 1
+
+    reader.fetch_feed(force_refresh=True)
+    reader.invalidate()
+    reader.get_latest_articles()
+    assert len(requested) == 3
+
+
+def test_get_article_by_id_matches_id_or_link(beehiiv_dir):
+    rss = SAMPLE_RSS.replace(
+        b"</channel>",
+        b"""<item>
+      <title>Second Post</title>
+      <link>https://example.beehiiv.com/p/second-post</link>
+      <guid isPermaLink="false">post-2</guid>
+    </item>
+  </channel>""",
+    )
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=rss)))
+
+    assert reader.get_article_by_id("post-2")["title"] == "Second Post"
+    assert reader.get_article_by_id("https://example.beehiiv.com/p/second-post")["title"] == "Second Post"
+    assert reader.get_article_by_id("https://example.beehiiv.com/p/first-post")["title"] == "First Post"
+    assert reader.get_article_by_id("missing") is None
+
+
+def test_stored_articles_deduplicated_across_snapshots(beehiiv_dir):
+    import orjson
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    snapshots = {
+        "beehiiv_feed_20240101_000000.json": [{"id": "a", "title": "A old"}, {"id": "z", "title": "Dropped"}],
+        "beehiiv_feed_20240102_000000.json": [{"id": "b", "title": "B"}, {"id": "a", "title": "A new"}],
+    }
+    for name, articles in snapshots.items():
+        (beehiiv_dir / name).write_bytes(orjson.dumps({"articles": articles}))
+
+    assert [a["title"] for a in get_stored_articles()] == ["B", "A new", "Dropped"]
+
+
+def test_stored_articles_only_read_feed_snapshots(beehiiv_dir, monkeypatch):
+    import orjson
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    (beehiiv_dir / "beehiiv_feed_20240101_000000.json").write_bytes(orjson.dumps({"articles": [{"id": "a"}]}))
+    (beehiiv_dir / "other_20240101.json").write_bytes(orjson.dumps({"articles": [{"id": "x"}]}))
+    (beehiiv_dir / "beehiiv_feed_dir.json").mkdir()
+
+    assert get_stored_articles() == [{"id": "a"}]
+
+    monkeypatch.setattr("arxiv_paper_pulse.config.BEEHIIV_DATA_DIR", str(beehiiv_dir / "missing"))
+    assert get_stored_articles() == []
+
+
+def test_feed_metadata_matches_between_fetch_and_info(beehiiv_dir):
+    rss = SAMPLE_RSS.replace(
+        b"<description>An example feed</description>",
+        b"""<description>An example feed</description>
+    <category>AI</category>
+    <image><url>https://example.beehiiv.com/logo.png</url><title>Logo</title><link>https://example.beehiiv.com</link></image>""",
+    )
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=rss)))
+
+    info = reader.get_feed_info()
+    feed_data = reader.fetch_feed()
+
+    assert info["categories"] == ["AI"]
+    assert info["image_url"] == "https://example.beehiiv.com/logo.png"
+    assert {k: v for k, v in feed_data.items() if k != "articles"} == {k: v for k, v in info.items() if k != "article_count"}
+
+
+def test_expired_feed_revalidated_with_conditional_get(beehiiv_dir, monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=SAMPLE_RSS, headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+
+    monkeypatch.setattr(BeehiivReader, "CACHE_TTL_SECONDS", 0)
+    reader = BeehiivReader(FEED_URL, http_client=make_client(handler))
+
+    first = reader.fetch_feed()
+    second = reader.fetch_feed()
+
+    assert second is first
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-modified-since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert len(list(beehiiv_dir.glob("beehiiv_feed_*.json"))) == 1
+
+
+def test_cache_ttl_adapts_to_publishing_cadence(beehiiv_dir):
+    from arxiv_paper_pulse import beehiiv_reader
+
+    items = b"".join(
+        b"<item><title>Post %d</title><guid>post-%d</guid><pubDate>%s</pubDate></item>" % (day, day, date)
+        for day, date in [(1, b"Mon, 01 Jan 2024 00:00:00 GMT"), (8, b"Mon, 08 Jan 2024 00:00:00 GMT"),
+                          (15, b"Mon, 15 Jan 2024 00:00:00 GMT")]
+    )
+    weekly = b'<?xml version="1.0"?><rss version="2.0"><channel><title>Weekly</title>%s</channel></rss>' % items
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=weekly)))
+
+    reader.fetch_feed()
+
+    # A week between posts: reuse for a quarter of that, capped
+    assert beehiiv_reader._feed_cache[FEED_URL].ttl == BeehiivReader.MAX_CACHE_TTL_SECONDS
+    assert beehiiv_reader._publish_interval([]) is None
+
+
+def test_unchanged_feed_not_saved_again(beehiiv_dir):
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=SAMPLE_RSS)))
+    other = BeehiivReader("https://other.beehiiv.com/feed",
+                          http_client=make_client(lambda request: httpx.Response(200, content=SAMPLE_RSS)))
+
+    reader.fetch_feed()
+    reader.invalidate()
+    reader.fetch_feed()
+    assert len(list(beehiiv_dir.glob("beehiiv_feed_*.json"))) == 1
+
+    # A different feed keeps its own digest, so identical content is still saved for it
+    other.fetch_feed()
+    assert len(list(beehiiv_dir.glob(".last_digest_*"))) == 2
+
+
+def test_snapshot_names_sort_by_save_time(beehiiv_dir):
+    import orjson
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=SAMPLE_RSS)))
+    (beehiiv_dir / "beehiiv_feed_20240101_000000.json").write_bytes(
+        orjson.dumps({"articles": [{"id": "https://example.beehiiv.com/p/first-post", "title": "Legacy"}]}))
+
+    reader.fetch_feed()
+
+    names = [p.name for p in beehiiv_dir.glob("beehiiv_feed_*.json")]
+    assert any(name[len("beehiiv_feed_"):-len(".json")].isdigit() for name in names)
+    # The millisecond snapshot is newer than the legacy one, so its copy wins
+    assert get_stored_articles()[0]["title"] == "First Post"
+
+
+def test_article_fields_extracted_from_entries(beehiiv_dir):
+    rss = SAMPLE_RSS.replace(b'<rss version="2.0">', b'<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">').replace(
+        b"<description>Hello world</description>",
+        b"<description>Hello world</description><category>AI</category><content:encoded><![CDATA[<p>Body</p>]]></content:encoded>",
+    )
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=rss)))
+
+    first, = reader.fetch_feed()["articles"]
+    assert first["content"] == "<p>Body</p>"
+    assert first["tags"] == ["AI"]
+
+    reader.invalidate()
+    reader.http_client = make_client(lambda request: httpx.Response(200, content=SAMPLE_RSS))
+    bare, = reader.fetch_feed(force_refresh=True)["articles"]
+    assert (bare["content"], bare["tags"], bare["author"]) == ("", [], "")
+
+
+def test_get_feed_info_reuses_cached_feed(beehiiv_dir):
+    requested = []
+
+    def handler(request):
+        requested.append(request)
+        return httpx.Response(200, content=SAMPLE_RSS)
+
+    reader = BeehiivReader(FEED_URL, http_client=make_client(handler))
+    reader.fetch_feed()
+
+    assert reader.get_feed_info()["article_count"] == 1
+    assert len(requested) == 1
+
+
+def test_unreadable_snapshot_skipped(beehiiv_dir):
+    import orjson
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    (beehiiv_dir / "beehiiv_feed_1704067200000.json").write_bytes(orjson.dumps({"articles": [{"id": "a"}]}))
+    (beehiiv_dir / "beehiiv_feed_1704153600000.json").write_bytes(b"{not json")
+    (beehiiv_dir / "beehiiv_feed_1704240000000.json").write_bytes(orjson.dumps({"articles": [{"id": "c"}]}))
+
+    assert get_stored_articles() == [{"id": "c"}, {"id": "a"}]
+
+
+def test_iter_stored_articles_reads_only_what_is_consumed(beehiiv_dir, monkeypatch):
+    import orjson
+    from arxiv_paper_pulse import beehiiv_reader
+
+    monkeypatch.setattr(beehiiv_reader, "STORED_READ_WORKERS", 1)
+    for n in range(5):
+        (beehiiv_dir / f"beehiiv_feed_170406720000{n}.json").write_bytes(orjson.dumps({"articles": [{"id": str(n)}]}))
+    read = []
+    real_read = beehiiv_reader._read_snapshot
+    monkeypatch.setattr(beehiiv_reader, "_read_snapshot", lambda path: read.append(path) or real_read(path))
+
+    articles = beehiiv_reader.iter_stored_articles()
+    assert next(articles) == {"id": "4"}
+    articles.close()
+
+    assert len(read) == 2
+
+
+def test_stored_snapshots_not_kept_in_file_cache(beehiiv_dir):
+    import orjson
+    from arxiv_paper_pulse import utils
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    (beehiiv_dir / "beehiiv_feed_1704067200000.json").write_bytes(orjson.dumps({"articles": [{"id": "a"}]}))
+    utils._load_json.cache_clear()
+
+    assert get_stored_articles() == [{"id": "a"}]
+    assert utils._load_json.cache_info().currsize == 0
+
+
+def test_import_leaves_default_tls_verification_alone():
+    import ssl
+
+    assert ssl._create_default_https_context is ssl.create_default_context
+
+
+def test_snapshot_written_via_temp_file(beehiiv_dir, monkeypatch):
+    import os
+    from arxiv_paper_pulse.beehiiv_reader import get_stored_articles
+
+    replaced = []
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda src, dst: replaced.append((str(src), str(dst))) or real_replace(src, dst))
+    (beehiiv_dir / "beehiiv_feed_1704067200000.json.tmp").write_bytes(b'{"articles": [')
+
+    reader = BeehiivReader(FEED_URL, http_client=make_client(lambda request: httpx.Response(200, content=SAMPLE_RSS)))
+    reader.fetch_feed()
+
+    (src, dst), = replaced
+    assert src == dst + ".tmp"
+    assert [a["title"] for a in get_stored_articles()] == ["First Post"]
@@ -84,6 +84,69 @@ def test_database_tables_created(bot_factory):
     assert expected_tables.issubset(tables)
 
 
+def test_database_connections_use_wal(bot_factory, tmp_path):
+    """Test bot and external databases are opened in WAL mode."""
+    bot = bot_factory()
+    bot.couple_external_memory(tmp_path / "external.db", request_permission=False)
+
+    assert bot._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert bot._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert bot._external_conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_history_queries_use_indexes(bot_factory):
+    """Test newest-first action and response listings walk an index instead of sorting."""
+    bot = bot_factory()
+
+    def plan(query):
+        return " ".join(row[-1] for row in bot._conn.execute("EXPLAIN QUERY PLAN " + query))
+
+    assert "idx_actions_timestamp" in plan("SELECT id FROM actions ORDER BY timestamp DESC LIMIT 5")
+    assert "idx_actions_reflected" in plan(
+        "SELECT id FROM actions WHERE reflection IS NOT NULL ORDER BY timestamp DESC")
+    responses_plan = plan("SELECT id FROM responses WHERE request_id = 1 ORDER BY attempt_number DESC")
+    assert "idx_responses_request" in responses_plan and "TEMP B-TREE" not in responses_plan
+
+
+def test_database_connection_reused(bot_factory, tmp_path, monkeypatch):
+    """Test bot operations reuse its open connections instead of reconnecting."""
+    bot = bot_factory()
+    bot.couple_external_memory(tmp_path / "external.db", request_permission=False)
+
+    def fail_connect(*args, **kwargs):
+        raise AssertionError("unexpected sqlite3.connect")
+
+    monkeypatch.setattr("arxiv_paper_pulse.bot.sqlite3.connect", fail_connect)
+    bot.store_internal("key", "value")
+    bot.store_external("ext_key", "ext_value")
+    bot.record_thought("reasoning", "Reuse the connection")
+
+    assert bot.retrieve_internal("key") == "value"
+    assert bot.retrieve_external("ext_key") == "ext_value"
+
+    bot.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        bot.retrieve_internal("key")
+
+
+def test_external_connection_shared_between_bots(bot_factory, tmp_path):
+    """Test bots coupled to the same external database share one connection until the last uncouples."""
+    external_db = tmp_path / "shared.db"
+    first, second = bot_factory("First"), bot_factory("Second")
+    first.couple_external_memory(external_db, request_permission=False)
+    second.couple_external_memory(external_db, request_permission=False)
+
+    assert first._external_conn is second._external_conn
+    first.store_external("key", "shared")
+    first.uncouple_external_memory()
+    assert second.retrieve_external("key") == "shared"
+
+    conn = second._external_conn
+    second.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
 # ============================================================================
 # MEMORY TESTS (INTERNAL/EXTERNAL)
 # ============================================================================
@@ -109,6 +172,18 @@ def test_internal_memory_overwrites(bot_factory):
     assert result == "value2"
 
 
+def test_memory_values_stored_as_compact_json(bot_factory):
+    """Test structured values are stored compactly with non-ASCII text unescaped."""
+    bot = bot_factory()
+
+    bot.store_internal("greeting", {"text": "héllo", 1: [1, 2]})
+
+    with sqlite3.connect(bot.db_path) as conn:
+        stored = conn.execute("SELECT value FROM memory WHERE key = 'greeting'").fetchone()[0]
+    assert stored == '{"text":"héllo","1":[1,2]}'
+    assert bot.retrieve_internal("greeting") == {"text": "héllo", "1": [1, 2]}
+
+
 def test_external_memory_requires_coupling(bot_factory):
     """Test external memory fails without coupling."""
     bot = bot_factory()
@@ -176,6 +251,18 @@ def test_query_thoughts_by_type(bot_factory):
     assert reasoning[0]['thought_type'] == 'reasoning'
 
 
+def test_query_thoughts_by_tag_matches_whole_tags(bot_factory):
+    """Test tag filters match whole tags, not substrings of other tags."""
+    bot = bot_factory()
+
+    bot.record_thought('planning', 'Long-term', tags=['planning'])
+    bot.record_thought('planning', 'Short-term', tags=['plan', 'urgent'])
+
+    assert [t['content'] for t in bot.query_thoughts(tags=['plan'])] == ['Short-term']
+    assert [t['content'] for t in bot.query_thoughts(tags=['plan', 'urgent'])] == ['Short-term']
+    assert bot.query_thoughts(tags=['lan']) == []
+
+
 def test_thought_chains(bot_factory):
     """Test thought parent-child relationships."""
     bot = bot_factory()
@@ -190,6 +277,22 @@ def test_thought_chains(bot_factory):
     assert len(chain) >= 1
 
 
+def test_thought_chain_returns_ancestors_oldest_first(bot_factory):
+    """Test a thought chain walks every ancestor and returns them in order."""
+    bot = bot_factory()
+
+    parent_id = None
+    for content in ('Root', 'Middle', 'Leaf'):
+        bot.record_thought('reasoning', content, parent_id=parent_id)
+        parent_id = bot.query_thoughts()[0]['id']
+
+    chain = bot.get_thought_chain(parent_id)
+
+    assert [t['content'] for t in chain] == ['Root', 'Middle', 'Leaf']
+    assert chain[0]['parent_id'] is None
+    assert bot.get_thought_chain(9999) == []
+
+
 def test_auto_tag_extraction(bot_factory):
     """Test automatic tag extraction from content."""
     bot = bot_factory()
@@ -200,6 +303,57 @@ def test_auto_tag_extraction(bot_factory):
     assert 'problem' in thoughts[0]['tags'] or 'analysis' in thoughts[0]['tags']
 
 
+def test_record_thoughts_batch(bot_factory):
+    """Test recording several thoughts in one transaction."""
+    bot = bot_factory()
+
+    bot.record_thoughts_batch([
+        {'thought_type': 'planning', 'content': 'Make a plan'},
+        {'thought_type': 'decision', 'content': 'Pick one', 'tags': ['choice']},
+    ])
+
+    thoughts = {t['thought_type']: t for t in bot.query_thoughts()}
+    assert thoughts['planning']['tags'] == ['plan']
+    assert thoughts['decision']['tags'] == ['choice']
+    assert len(bot.get_action_history()) == 2
+
+
+def test_batch_rolls_back_on_error(bot_factory):
+    """Test writes inside a failed batch are discarded."""
+    bot = bot_factory()
+
+    with pytest.raises(RuntimeError):
+        with bot.batch():
+            bot.record_thought('reasoning', 'Never committed')
+            raise RuntimeError("boom")
+
+    with bot.batch():
+        with bot.batch():
+            bot.record_thought('reasoning', 'Committed')
+
+    assert [t['content'] for t in bot.query_thoughts()] == ['Committed']
+
+
+def test_actions_logged_in_batch_are_buffered(bot_factory):
+    """Test actions inside a batch are inserted together at commit and dropped on rollback."""
+    bot = bot_factory()
+
+    with bot.batch():
+        for i in range(3):
+            bot.log_action('decision', {'step': i})
+        assert len(bot._action_buffer) == 3
+        assert len(bot.get_action_history()) == 3  # reads see pending actions
+        bot.log_action('decision', {'step': 3})
+
+    with pytest.raises(RuntimeError):
+        with bot.batch():
+            bot.log_action('decision', {'step': 'discarded'})
+            raise RuntimeError("boom")
+
+    assert bot._action_buffer == []
+    assert sorted(a['details']['step'] for a in bot.get_action_history()) == [0, 1, 2, 3]
+
+
 # ============================================================================
 # REQUEST/RESPONSE MATCHING TESTS
 # ============================================================================
@@ -222,6 +376,61 @@ def test_exact_request_matching(bot_factory):
     assert match is not None
     assert match[0] == request_id
 
+    # Recording it again returns the existing row
+    assert bot.record_new_request(request_text) == request_id
+    assert bot.record_new_request("Something else") != request_id
+
+
+def test_request_hash_computed_once_per_text(bot_factory):
+    """Test a lookup followed by a record of the same text hashes it only once."""
+    from arxiv_paper_pulse import bot as bot_module
+
+    bot = bot_factory()
+    bot_module._request_hash.cache_clear()
+
+    assert bot.find_exact_match("  Cache Me\n") is None
+    request_id = bot.record_new_request("  Cache Me\n")
+
+    assert bot_module._request_hash.cache_info().misses == 1
+    assert bot.find_exact_match("cache me")[0] == request_id
+
+
+def test_requests_from_sha256_databases_still_match(bot_factory):
+    """Test request hashes stored by older versions are migrated on open."""
+    import hashlib
+
+    bot = bot_factory()
+    with sqlite3.connect(bot.db_path) as conn:
+        conn.execute(
+            "INSERT INTO requests (request_hash, request_text, timestamp) VALUES (?, ?, ?)",
+            (hashlib.sha256(b"old question").hexdigest(), "Old question", datetime.now().isoformat())
+        )
+        conn.execute("PRAGMA user_version = 0")
+    bot.close()
+
+    reopened = bot_factory()
+    match = reopened.find_exact_match("old question")
+
+    assert match is not None
+    assert match[1] == "Old question"
+
+
+def test_hex_request_hashes_migrated_to_bytes(bot_factory):
+    """Test hex request hashes from schema version 3 are stored back as raw digest bytes."""
+    bot = bot_factory()
+    request_id = bot.record_new_request("Hex question")
+    with sqlite3.connect(bot.db_path) as conn:
+        conn.execute("UPDATE requests SET request_hash = ? WHERE id = ?",
+                     (bot._hash_request("hex question").hex(), request_id))
+        conn.execute("PRAGMA user_version = 3")
+    bot.close()
+
+    reopened = bot_factory()
+    stored = reopened._conn.execute("SELECT typeof(request_hash), length(request_hash) FROM requests").fetchone()
+
+    assert stored == ("blob", 32)
+    assert reopened.find_exact_match("Hex question")[0] == request_id
+
 
 def test_request_normalization(bot_factory):
     """Test request normalization (case, leading/trailing whitespace, newlines)."""
@@ -253,6 +462,8 @@ def test_past_response_lookup(bot_factory):
 
     assert len(responses) == 2
     assert responses[0]['attempt_number'] == 2  # Most recent first
+    assert responses[1]['attempt_number'] == 1
+    assert [r['response_text'] for r in responses] == ["response 2", "response 1"]
 
 
 def test_should_make_new_attempt_heuristic(bot_factory):
@@ -272,6 +483,116 @@ def test_should_make_new_attempt_heuristic(bot_factory):
     assert not bot.should_make_new_attempt(request_id, [recent_response])
 
 
+def test_should_make_new_attempt_reads_latest_timestamp(bot_factory):
+    """Test the decision can be made from the database without loading responses."""
+    bot = bot_factory()
+    request_id = bot.record_new_request("test")
+
+    assert bot.should_make_new_attempt(request_id)
+
+    bot.record_new_attempt(request_id, "stale")
+    bot._conn.execute("UPDATE responses SET timestamp = '2000-01-01T00:00:00.000000'")
+    assert bot.should_make_new_attempt(request_id)
+
+    bot.record_new_attempt(request_id, "fresh")
+    assert not bot.should_make_new_attempt(request_id)
+
+
+def test_find_similar_requests(bot_factory, monkeypatch):
+    """Test similarity search ranks stored embeddings and tracks new ones."""
+    import numpy as np
+
+    bot = bot_factory()
+    vectors = {"cats": [1.0, 0.0, 0.0], "kittens": [0.9, 0.1, 0.0], "tax law": [0.0, 0.0, 1.0], "dogs": [0.0, 2.0, 0.0]}
+    monkeypatch.setattr(bot, "_generate_embedding", lambda text: np.array(vectors[text], dtype=np.float32))
+
+    ids = {}
+    for text in ("tax law", "kittens", "cats"):
+        ids[text] = bot.record_new_request(text)
+        bot.store_embedding_for_request(ids[text], bot._generate_embedding(text))
+
+    similar = bot.find_similar_requests("cats", threshold=0.5)
+    assert [s['text'] for s in similar] == ["cats", "kittens"]
+    assert similar[0]['similarity'] == pytest.approx(1.0)
+
+    # Embeddings stored after the index is loaded are searchable immediately
+    ids["dogs"] = bot.record_new_request("dogs")
+    bot.store_embedding_for_request(ids["dogs"], bot._generate_embedding("dogs"))
+    bot.store_embedding_for_request(ids["cats"], np.array([0.0, 1.0, 0.2], dtype=np.float32))
+    assert [s['text'] for s in bot.find_similar_requests("dogs", threshold=0.5)] == ["dogs", "cats"]
+
+
+def test_writes_without_sqlite_returning(bot_factory, monkeypatch):
+    """Test request, embedding and snapshot writes on SQLite older than 3.35."""
+    import numpy as np
+    from arxiv_paper_pulse import bot as bot_module
+
+    monkeypatch.setattr(bot_module, "_SQLITE_HAS_RETURNING", False)
+    bot = bot_factory()
+
+    request_id = bot.record_new_request("Old SQLite")
+    assert bot.record_new_request("Old SQLite") == request_id
+    assert bot.record_new_request("Another") != request_id
+
+    monkeypatch.setattr(bot, "_generate_embedding", lambda text: np.array([1.0, 0.0], dtype=np.float32))
+    bot.store_embedding_for_request(request_id, bot._generate_embedding("Old SQLite"))
+    assert [s['id'] for s in bot.find_similar_requests("Old SQLite", threshold=0.5)] == [request_id]
+
+    bot.context_history_retention = 1
+    for i in range(3):
+        bot._save_context_snapshot(f"Snapshot {i}", reason="test")
+    remaining = list(bot.context_history_dir.glob("context_*.md"))
+    assert len(remaining) == 1
+    assert "Snapshot 2" in remaining[0].read_text()
+
+
+def test_embeddings_memoized_by_text(bot_factory):
+    """Test the embedding client is called once per distinct text, and failures are not cached."""
+    calls = []
+
+    class FakeEmbeddings:
+        def generate_embedding(self, text):
+            calls.append(text)
+            return [] if text == "broken" else [float(len(text)), 1.0]
+
+    bot = bot_factory()
+    bot._embedding_client = FakeEmbeddings()
+
+    first = bot._generate_embedding("cats")
+    first[0] = -1.0  # callers get their own copy
+    assert bot._generate_embedding("cats").tolist() == [4.0, 1.0]
+    bot._generate_embedding("broken")
+    bot._generate_embedding("broken")
+
+    assert calls == ["cats", "broken", "broken"]
+
+
+def test_embeddings_stored_quantized(bot_factory):
+    """Test embeddings are stored as scaled int8 while float16 and legacy float32 rows still load."""
+    import numpy as np
+
+    bot = bot_factory()
+    new_id = bot.record_new_request("new")
+    half_id = bot.record_new_request("half")
+    old_id = bot.record_new_request("old")
+    bot.store_embedding_for_request(new_id, np.array([0.5, -2.0, 0.0, 0.0, 0.0, 0.0], dtype=np.float32))
+    with sqlite3.connect(bot.db_path) as conn:
+        conn.execute("UPDATE requests SET embedding = ?, embedding_dtype = 'float16' WHERE id = ?",
+                     (np.array([0.0, 0.0, 1.0, 0.0, 0.0, 0.0], dtype=np.float16).tobytes(), half_id))
+        conn.execute("UPDATE requests SET embedding = ? WHERE id = ?",
+                     (np.array([0.0, 0.0, 0.0, 1.0, 0.0, 0.0], dtype=np.float32).tobytes(), old_id))
+        blob, dtype = conn.execute("SELECT embedding, embedding_dtype FROM requests WHERE id = ?", (new_id,)).fetchone()
+
+    assert (len(blob), dtype) == (4 + 6, "int8")
+    for text, vector, expected in (("new", [1.0, -4.0, 0, 0, 0, 0], new_id),
+                                   ("half", [0, 0, 1.0, 0, 0, 0], half_id),
+                                   ("old", [0, 0, 0, 1.0, 0, 0], old_id)):
+        bot._generate_embedding = lambda text, vector=vector: np.array(vector, dtype=np.float32)
+        similar = bot.find_similar_requests(text, threshold=0.5)
+        assert [s['id'] for s in similar] == [expected]
+        assert similar[0]['similarity'] == pytest.approx(1.0, abs=1e-3)
+
+
 # ============================================================================
 # ACTION LOGGING TESTS
 # ============================================================================
@@ -299,6 +620,24 @@ def test_action_history_limit(bot_factory):
     assert len(actions) == 5
 
 
+def test_batch_reflect_uses_unreflected_actions(bot_factory, mock_genai):
+    """Test batch reflection prompts with raw details of only the unreflected actions."""
+    bot = bot_factory()
+    for i in range(3):
+        bot.log_action('action', {'index': i})
+    reflected_id = bot.get_action_history(limit=1)[0]['id']
+    bot._conn.execute("UPDATE actions SET reflection = 'done' WHERE id = ?", (reflected_id,))
+
+    pending = bot.get_unreflected_actions()
+    assert [details for _, _, details in pending] == ['{"index":1}', '{"index":0}']
+    assert bot.get_action_history(limit=1, parse_details=False)[0]['details'] == '{"index":2}'
+
+    reflections = bot.batch_reflect(limit=5)
+
+    assert sorted(reflections) == sorted(action_id for action_id, _, _ in pending)
+    assert '[action] {"index":0}' in mock_genai.calls[-1]['contents'][0]
+
+
 # ============================================================================
 # SAFETY PROTOCOL TESTS
 # ============================================================================
@@ -328,6 +667,31 @@ def test_path_within_workspace(bot_factory, tmp_path):
     assert isinstance(result, bool)  # Should return bool, not error
 
 
+def test_workspace_root_and_permissions_cached(bot_factory, tmp_path, monkeypatch):
+    """Test the workspace root is found once per cwd and permissions reload only when the file changes."""
+    import os
+    from unittest.mock import patch
+
+    bot = bot_factory()
+    workspace = tmp_path / "workspace"
+    (workspace / "nested").mkdir(parents=True)
+    (workspace / ".git").mkdir()
+    monkeypatch.chdir(workspace / "nested")
+    assert bot._get_workspace_root() == workspace
+
+    with patch.object(Path, "exists", side_effect=AssertionError("workspace root walked again")):
+        assert bot._get_workspace_root() == workspace
+
+    target = tmp_path / "outside"
+    permissions = workspace / ".bot_permissions.json"
+    permissions.write_text(json.dumps({"allowed_paths": [str(target)]}))
+    assert bot._check_permission(str(target), 'read')
+
+    permissions.write_text(json.dumps({"allowed_paths": [str(target)], "denied_paths": [str(target)]}))
+    os.utime(permissions, ns=(1, 1))
+    assert not bot._check_permission(str(target), 'read')
+
+
 # ============================================================================
 # PROCESS (API INTEGRATION) TESTS
 # ============================================================================
@@ -396,6 +760,76 @@ def test_process_logs_io(bot_factory):
     assert 'out' in directions
 
 
+def test_process_shares_timestamps_between_related_rows(bot_factory):
+    """Test input log and its api_call action carry one fixed-width timestamp."""
+    bot = bot_factory()
+
+    bot.process("Test prompt")
+
+    with sqlite3.connect(bot.db_path) as conn:
+        logged_in = conn.execute("SELECT timestamp FROM api_logs WHERE direction = 'in'").fetchone()[0]
+        api_call = conn.execute("SELECT timestamp FROM actions WHERE action_type = 'api_call'").fetchone()[0]
+
+    assert logged_in == api_call
+    assert len(logged_in) == len("2024-01-01T00:00:00.000000")
+
+
+def test_process_inside_batch_does_not_deadlock(bot_factory):
+    """Test process() within the caller's batch logs its input without the writer thread."""
+    import threading
+
+    bot = bot_factory()
+    result = {}
+
+    def run():
+        with bot.batch():
+            result['response'] = bot.process("Batched prompt")
+
+    worker = threading.Thread(target=run, daemon=True)
+    worker.start()
+    worker.join(timeout=5)
+
+    assert not worker.is_alive(), "process() deadlocked inside batch()"
+    assert result['response'].startswith("Response to:")
+    with sqlite3.connect(bot.db_path) as conn:
+        directions = {row[0] for row in conn.execute("SELECT direction FROM api_logs")}
+    assert directions == {'in', 'out'}
+
+
+def test_process_stream_yields_chunks_and_logs_full_response(bot_factory, mock_genai):
+    """Test streaming yields chunks as they arrive and logs the joined response."""
+    class Chunk:
+        def __init__(self, text):
+            self.text = text
+
+    mock_genai.generate_content_stream = lambda model, contents: iter([Chunk("Hel"), Chunk(None), Chunk("lo")])
+    bot = bot_factory()
+
+    assert list(bot.process_stream("Stream me", include_context=False)) == ["Hel", "lo"]
+
+    with sqlite3.connect(bot.db_path) as conn:
+        rows = conn.execute("SELECT direction, content FROM api_logs ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == ['in', 'out']
+    assert json.loads(rows[1][1])['response'] == "Hello"
+
+
+def test_large_api_log_payloads_are_compressed(bot_factory, mock_genai):
+    """Test long prompts are stored as compressed BLOBs and decode back to the logged JSON."""
+    from arxiv_paper_pulse.bot import _unpack_log_content
+
+    bot = bot_factory()
+    prompt = "Summarize this abstract. " * 200
+
+    bot.process(prompt, include_context=False)
+
+    with sqlite3.connect(bot.db_path) as conn:
+        rows = dict(conn.execute("SELECT direction, content FROM api_logs").fetchall())
+    assert isinstance(rows['in'], bytes) and len(rows['in']) < len(prompt) // 4
+    assert _unpack_log_content(rows['in'])['prompt'] == prompt
+    assert isinstance(rows['out'], str)
+    assert _unpack_log_content(rows['out'])['response'].startswith("Response to:")
+
+
 # ============================================================================
 # DISPLAY BUFFER TESTS
 # ============================================================================
@@ -250,6 +250,22 @@ def test_utf8_trimming_preserves_characters(bot_factory):
     assert "�" not in result
 
 
+def test_trim_keeps_longest_fitting_tail(bot_factory):
+    """Test trimming keeps as many whole trailing characters as fit."""
+    bot = bot_factory(context_max_bytes=100)
+    content = "# Header\n---\n" + "é日x" * 40
+
+    trimmed, was_trimmed = bot._trim_context(content)
+
+    assert was_trimmed
+    assert len(trimmed.encode('utf-8')) <= 100
+    body_tail = trimmed.split("…)\n", 1)[1]
+    assert content.endswith(body_tail)
+    # One more character would not have fit
+    extra = content[-len(body_tail) - 1:]
+    assert len(trimmed.encode('utf-8')) - len(body_tail.encode('utf-8')) + len(extra.encode('utf-8')) > 100
+
+
 # ============================================================================
 # SNAPSHOT HISTORY TESTS
 # ============================================================================
@@ -340,6 +356,28 @@ def test_snapshot_retention_pruning(bot_factory):
     assert len(history) <= 3
 
 
+def test_context_history_indexed_in_database(bot_factory, monkeypatch):
+    """Test listing and pruning snapshots use the index rather than scanning the directory."""
+    bot = bot_factory(context_max_bytes=100, history_retention=2)
+    legacy = bot.context_history_dir / "context_20200101_000000.md"
+    legacy.write_text("legacy", encoding='utf-8')
+    os.utime(legacy, (1577836800, 1577836800))
+    bot._conn.execute("PRAGMA user_version = 2")
+    bot.close()
+
+    bot = bot_factory(context_max_bytes=100, history_retention=2)
+    monkeypatch.setattr(Path, "glob", lambda *args, **kwargs: pytest.fail("directory scanned"))
+    assert [h['name'] for h in bot.list_context_history()] == ["context_20200101_000000.md"]
+
+    bot._save_context_snapshot("first", reason="test")
+    bot._save_context_snapshot("second", reason="test")
+
+    history = bot.list_context_history()
+    assert len(history) == 2
+    assert bot.load_context_snapshot(0).endswith("second\n")
+    assert not legacy.exists()
+
+
 # ============================================================================
 # PROMPT INTEGRATION TESTS
 # ============================================================================
@@ -411,6 +449,23 @@ def test_context_respects_size_limit_in_prompt(bot_factory, dummy_genai):
         assert len(context_section.encode('utf-8')) <= bot.context_max_bytes
 
 
+def test_context_for_prompt_reread_only_after_change(bot_factory):
+    """Test prompt context is read from disk again only when the file changes."""
+    bot = bot_factory(context_max_bytes=5000)
+    reads = []
+    real_get_context = bot.get_context
+    bot.get_context = lambda: reads.append(1) or real_get_context()
+
+    first = bot._get_context_for_prompt()
+    assert bot._get_context_for_prompt() == first
+    assert len(reads) == 1
+
+    bot.append_to_context("New note")
+    reads.clear()
+    assert "New note" in bot._get_context_for_prompt()
+    assert len(reads) == 1
+
+
 # ============================================================================
 # EDGE CASES AND ERROR HANDLING
 # ============================================================================
@@ -83,6 +83,19 @@ def test_initialize_briefing_file(setup_test_dirs):
     assert "**Search Query:** `test:query`" in content
     assert "## Articles" in content
 
+def test_briefing_file_created_on_first_write(setup_test_dirs, mock_ollama_summarize, mock_paper_data):
+    """Test that constructing a summarizer writes no briefing until a paper is added."""
+    summarizer = ArxivSummarizer(query="test:query")
+    assert summarizer.briefing_file is None
+    assert list(setup_test_dirs["briefing"].iterdir()) == []
+
+    paper = mock_paper_data[0]
+    paper["summary"] = summarizer.ollama_summarize(paper["abstract"])
+    summarizer.update_briefing_report(paper)
+
+    assert list(setup_test_dirs["briefing"].iterdir()) == [summarizer.briefing_file]
+    assert summarizer.briefing_file.read_text().startswith("# ArXiv Research Briefing:")
+
 def test_update_briefing_report(setup_test_dirs, mock_ollama_summarize, mock_paper_data):
     """Test that a paper summary is correctly added to the briefing file."""
     summarizer = ArxivSummarizer(query="test:query")
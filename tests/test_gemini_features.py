@@ -70,7 +70,7 @@ class TestPDFProcessing:
 
     def test_download_and_process_pdf(self, summarizer, sample_paper, mock_gemini_client):
         """Test PDF download and upload"""
-        with patch('arxiv_paper_pulse.core.httpx.get') as mock_get:
+        with patch.object(summarizer.http_client, 'get') as mock_get:
             mock_response = Mock()
             mock_response.content = b"fake pdf content"
             mock_response.raise_for_status = Mock()
@@ -186,6 +186,47 @@ class TestMultiPaperAnalysis:
             result = summarizer.analyze_multiple_papers(papers)
             assert result is not None
 
+    def test_analyze_multiple_uploads_keep_order_and_skip_failures(self, summarizer, mock_gemini_client):
+        """Parallel PDF uploads keep paper order and drop papers that fail"""
+        papers = [{"entry_id": f"2301.1234{i}", "title": f"Paper {i}"} for i in range(4)]
+
+        def upload(paper):
+            if paper["title"] == "Paper 2":
+                raise ValueError("download failed")
+            return paper["title"]
+
+        with patch.object(summarizer, 'download_and_process_pdf', side_effect=upload):
+            summarizer.analyze_multiple_papers(papers)
+
+        contents = summarizer.client.models.generate_content.call_args.kwargs["contents"]
+        assert contents[:3] == ["Paper 0", "Paper 1", "Paper 3"]
+
+    def test_analyze_multiple_upload_pool_is_small(self, summarizer, mock_gemini_client, monkeypatch):
+        """Uploads stay within MULTI_PAPER_UPLOAD_WORKERS, however high GEMINI_MAX_CONCURRENCY is"""
+        import threading
+        import time
+        from arxiv_paper_pulse import config, core
+
+        monkeypatch.setattr(config, "GEMINI_MAX_CONCURRENCY", 16)
+        papers = [{"entry_id": f"2301.1234{i}", "title": f"Paper {i}"} for i in range(8)]
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def upload(paper):
+            with lock:
+                active.append(paper)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(paper)
+            return paper["title"]
+
+        with patch.object(summarizer, 'download_and_process_pdf', side_effect=upload):
+            summarizer.analyze_multiple_papers(papers)
+
+        assert max(peak) <= core.MULTI_PAPER_UPLOAD_WORKERS
+
     def test_analyze_multiple_empty_list(self, summarizer):
         """Test empty paper list"""
         result = summarizer.analyze_multiple_papers([])
@@ -217,11 +258,12 @@ class TestEmbeddings:
             embeddings_gen = PaperEmbeddings()
 
             mock_result = Mock()
-            mock_result.embedding = [0.1, 0.2, 0.3]
+            mock_result.embeddings = [Mock(values=[0.1, 0.2, 0.3])]
             mock_gemini_client.models.embed_content.return_value = mock_result
 
             result = embeddings_gen.generate_embedding("test text")
-            assert len(result) > 0
+            assert result == [0.1, 0.2, 0.3]
+            assert mock_gemini_client.models.embed_content.call_args.kwargs["contents"] == ["test text"]
 
     def test_cosine_similarity(self):
         """Test cosine similarity calculation"""
@@ -234,6 +276,59 @@ class TestEmbeddings:
             similarity = embeddings_gen.cosine_similarity(vec1, vec2)
             assert abs(similarity - 1.0) < 0.01  # Should be 1.0 for identical vectors
 
+    def test_batch_embeddings_are_float32_arrays(self, mock_gemini_client):
+        """Batch embeddings come back as float32 arrays that orjson can serialize directly"""
+        import numpy as np
+        from arxiv_paper_pulse.api import ORJSONResponse
+
+        with patch.dict('os.environ', {'GEMINI_API_KEY': 'test_key'}):
+            embeddings_gen = PaperEmbeddings()
+
+            mock_result = Mock()
+            mock_result.embeddings = [Mock(values=[0.5, 0.25])]
+            mock_gemini_client.models.embed_content.return_value = mock_result
+
+            result = embeddings_gen.generate_batch_embeddings([{"id": "p1", "title": "T"}])
+            assert result["p1"].dtype == np.float32
+            assert ORJSONResponse(result).body == b'{"p1":[0.5,0.25]}'
+            assert abs(embeddings_gen.cosine_similarity(result["p1"], result["p1"]) - 1.0) < 0.01
+
+    def test_find_similar_papers_ranks_top_k_above_threshold(self, mock_gemini_client):
+        """Similar papers are filtered by threshold and returned best first"""
+        vectors = {"target": [1.0, 0.0], "a": [0.6, 0.8], "b": [1.0, 0.1], "c": [0.0, 1.0], "d": [0.9, 0.2], "e": [0.0, 0.0]}
+
+        def embed_content(model, contents):
+            return Mock(embeddings=[Mock(values=vectors[text.split(": ")[1]]) for text in contents])
+
+        mock_gemini_client.models.embed_content.side_effect = embed_content
+        with patch.dict('os.environ', {'GEMINI_API_KEY': 'test_key'}):
+            embeddings_gen = PaperEmbeddings()
+            with patch.object(embeddings_gen, 'generate_paper_embedding', return_value=vectors["target"]):
+                papers = [{"id": pid, "title": pid} for pid in "abcde"]
+                similar = embeddings_gen.find_similar_papers({"id": "target"}, papers, top_k=2, threshold=0.5)
+
+        assert [s["paper"]["id"] for s in similar] == ["b", "d"]
+        assert similar[0]["similarity"] > similar[1]["similarity"] > 0.5
+        assert all(isinstance(s["similarity"], float) for s in similar)
+
+
+    def test_batch_embeddings_chunk_requests(self, mock_gemini_client, monkeypatch):
+        """Papers are embedded a chunk per request, skipping papers with no text"""
+        from arxiv_paper_pulse import embeddings
+
+        monkeypatch.setattr(embeddings, "EMBED_BATCH_SIZE", 2)
+        mock_gemini_client.models.embed_content.side_effect = lambda model, contents: Mock(
+            embeddings=[Mock(values=[float(len(text)), 1.0]) for text in contents]
+        )
+        with patch.dict('os.environ', {'GEMINI_API_KEY': 'test_key'}):
+            embeddings_gen = PaperEmbeddings()
+            papers = [{"id": f"p{i}", "title": "x" * i} for i in range(1, 6)] + [{"id": "empty"}]
+            result = embeddings_gen.generate_batch_embeddings(papers)
+
+        assert mock_gemini_client.models.embed_content.call_count == 3
+        assert list(result) == ["p1", "p2", "p3", "p4", "p5"]
+        assert result["p3"].tolist() == [len("Title: xxx"), 1.0]
+
 
 class TestBatchProcessing:
     """Tests for batch processing"""
@@ -252,6 +347,40 @@ class TestBatchProcessing:
             request = processor._create_batch_request(paper)
             assert "model" in request or request is not None
 
+    def test_submit_batch_shares_one_config_and_keeps_order(self, mock_gemini_client):
+        """Every request in a batch reuses one generation config, in paper order"""
+        processor = BatchPaperProcessor()
+        mock_gemini_client.batches.create.return_value = Mock(id="batches/1")
+
+        batch_id = processor.submit_batch([{"abstract": "First"}, {"abstract": "Second"}])
+
+        requests = mock_gemini_client.batches.create.call_args.kwargs["requests"]
+        assert batch_id == "batches/1"
+        assert ["First" in r["contents"][0]["parts"][0]["text"] for r in requests] == [True, False]
+        assert requests[0]["config"] is requests[1]["config"]
+
+    def test_wait_for_completion_backs_off(self, mock_gemini_client):
+        """Status polls start fast and back off exponentially up to the cap"""
+        processor = BatchPaperProcessor()
+        states = ["JOB_STATE_PENDING", "JOB_STATE_RUNNING", "JOB_STATE_RUNNING", "JOB_STATE_RUNNING", "JOB_STATE_SUCCEEDED"]
+        with patch.object(processor, 'check_batch_status', side_effect=[{"id": "b", "state": s} for s in states]), \
+                patch('arxiv_paper_pulse.batch_processor.time.sleep') as mock_sleep:
+            status = processor.wait_for_completion("b", max_interval=2)
+
+        assert status["state"] == "JOB_STATE_SUCCEEDED"
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 1.5, 2, 2]
+
+    def test_wait_for_completion_accepts_check_interval(self, mock_gemini_client):
+        """The old check_interval keyword still caps the delay, with a deprecation warning"""
+        processor = BatchPaperProcessor()
+        states = ["JOB_STATE_RUNNING", "JOB_STATE_RUNNING", "JOB_STATE_SUCCEEDED"]
+        with patch.object(processor, 'check_batch_status', side_effect=[{"id": "b", "state": s} for s in states]), \
+                patch('arxiv_paper_pulse.batch_processor.time.sleep') as mock_sleep, \
+                pytest.warns(DeprecationWarning, match="max_interval"):
+            processor.wait_for_completion("b", check_interval=1.2)
+
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1.0, 1.2]
+
 
 class TestChatSessions:
     """Tests for chat sessions"""
@@ -284,6 +413,22 @@ class TestChatSessions:
             response = chat.ask("Test question")
             assert response is not None
 
+    def test_reset_reuses_paper_context(self, mock_gemini_client):
+        """Resetting with unchanged papers reuses the context text; changed papers rebuild it"""
+        with patch.dict('os.environ', {'GEMINI_API_KEY': 'test_key'}):
+            papers = [{"title": "Test", "url": "http://test.com", "abstract": "A" * 600}]
+            chat = PaperChatSession(papers)
+            first = mock_gemini_client.chats.create.call_args.kwargs["history"][0]["parts"][0]["text"]
+
+            chat.reset()
+            again = mock_gemini_client.chats.create.call_args.kwargs["history"][0]["parts"][0]["text"]
+            chat.reset([{"title": "Other"}])
+            other = mock_gemini_client.chats.create.call_args.kwargs["history"][0]["parts"][0]["text"]
+
+        assert again is first
+        assert f"1. Test\n   URL: http://test.com\n   Abstract: {'A' * 500}...\n" in first
+        assert "1. Other\n   URL: N/A\n\n" in other
+
 
 class TestModelSelection:
     """Tests for model selection"""
@@ -319,6 +464,64 @@ class TestRateLimiting:
         assert len(limiter.calls) <= 2
 
 
+class TestAsyncBatcher:
+    """Tests for coalescing concurrent requests"""
+
+    def test_concurrent_items_share_one_batch(self):
+        """Items queued together are processed in a single call, results in order"""
+        import asyncio
+        from arxiv_paper_pulse.utils import AsyncBatcher
+
+        calls = []
+
+        def process_batch(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = AsyncBatcher(process_batch, max_batch_size=8, max_queue_time=0.05)
+
+        async def run():
+            return await asyncio.gather(*(batcher.process(i) for i in range(3)))
+
+        assert asyncio.run(run()) == [0, 2, 4]
+        assert calls == [[0, 1, 2]]
+
+    def test_batch_error_propagates_to_every_caller(self):
+        """A failing batch call raises for every queued item"""
+        import asyncio
+        from arxiv_paper_pulse.utils import AsyncBatcher
+
+        def process_batch(items):
+            raise RuntimeError("quota exceeded")
+
+        batcher = AsyncBatcher(process_batch, max_batch_size=2)
+
+        async def run():
+            return await asyncio.gather(batcher.process(1), batcher.process(2), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_batches_run_through_the_given_runner(self):
+        """A runner passed to the batcher executes every batch call"""
+        import asyncio
+        from arxiv_paper_pulse.utils import AsyncBatcher
+
+        runs = []
+
+        async def runner(func, *args):
+            runs.append(args)
+            return func(*args)
+
+        batcher = AsyncBatcher(lambda items: [item + 1 for item in items], max_batch_size=2, run=runner)
+
+        async def run():
+            return await asyncio.gather(batcher.process(1), batcher.process(2))
+
+        assert asyncio.run(run()) == [2, 3]
+        assert runs == [([1, 2],)]
+
+
 class TestTools:
     """Tests for function calling tools"""
 
@@ -250,6 +250,20 @@ class TestGenerateAndSave:
         assert nested_path.exists()
         assert saved_path == str(nested_path)
 
+    def test_generate_and_save_writes_api_bytes_without_reencoding(self, image_generator, mock_gemini_client, temp_image_dir):
+        """PNG bytes from the API are written as-is; other extensions are re-encoded"""
+        api_bytes = mock_gemini_client.models.generate_content.return_value.candidates[0].content.parts[0].inline_data.data
+        png_path = temp_image_dir / "passthrough.png"
+        jpg_path = temp_image_dir / "converted.jpg"
+
+        with patch.object(PILImage.Image, 'save') as mock_save:
+            image_generator.generate_and_save("A red square", str(png_path), log_call=False)
+            mock_save.assert_not_called()
+        image_generator.generate_and_save("A red square", str(jpg_path), log_call=False)
+
+        assert png_path.read_bytes() == api_bytes
+        assert PILImage.open(jpg_path).format == "JPEG"
+
 
 class TestImageOutputLocation:
     """Tests for image output directory structure"""
@@ -323,10 +337,10 @@ class TestImageSaving:
     """Tests that save actual image files to visible locations"""
 
     @pytest.fixture
-    def test_images_dir(self):
-        """Directory for test images that will be kept"""
-        test_dir = Path(__file__).parent / "test_images"
-        test_dir.mkdir(exist_ok=True)
+    def test_images_dir(self, tmp_path):
+        """Per-test directory for saved test images"""
+        test_dir = tmp_path / "test_images"
+        test_dir.mkdir()
         return test_dir
 
     @pytest.mark.saves_images
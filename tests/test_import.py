@@ -14,6 +14,48 @@ def test_get_total_available():
     if total is not None:
         assert isinstance(total, int)
 
+def test_get_total_available_uses_shared_client(monkeypatch):
+    # The count is read through the pooled HTTP client and reused within the TTL.
+    import httpx
+    from arxiv_paper_pulse import utils
+
+    requests = []
+    feed = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>42</opensearch:totalResults>
+</feed>"""
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=feed)
+
+    monkeypatch.setattr(utils, "get_http_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+    assert get_total_available("cat:cs.AI") == 42
+    assert get_total_available("cat:cs.AI") == 42
+    assert len(requests) == 1
+
+def test_get_total_available_failure_not_cached(monkeypatch):
+    # A transient error returns None without hiding the count for the rest of the TTL.
+    import httpx
+    from arxiv_paper_pulse import utils
+
+    responses = [
+        httpx.Response(503),
+        httpx.Response(200, content=b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>7</opensearch:totalResults>
+</feed>"""),
+    ]
+
+    monkeypatch.setattr(utils, "get_http_client",
+                        lambda: httpx.Client(transport=httpx.MockTransport(lambda request: responses.pop(0))))
+    assert get_total_available("cat:cs.LG") is None
+    assert get_total_available("cat:cs.LG") == 7
+
+def test_get_arxiv_client_is_shared():
+    from arxiv_paper_pulse.utils import get_arxiv_client
+    assert get_arxiv_client() is get_arxiv_client()
+
 def test_get_unique_id():
     paper = {"entry_id": "123", "url": "http://example.com"}
     uid = get_unique_id(paper)
@@ -100,4 +100,10 @@ def test_implications_section_emphasis():
     # Check for specific questions about implications
     assert "mean for the field or industry" in implications_text
     assert "practical applications" in implications_text
-    assert "change our understanding" in implications_text
\ No newline at end of file
+    assert "change our understanding" in implications_text
+
+
+def test_summary_prompt_template_matches_format():
+    """The %-template renders exactly like SUMMARY_PROMPT.format, even with % and braces in the text."""
+    abstract = "We improve accuracy by 5% on {benchmark} tasks."
+    assert config.SUMMARY_PROMPT_TEMPLATE % (abstract,) == config.SUMMARY_PROMPT.format(abstract)
@@ -0,0 +1,66 @@
+"""Tests for the exact/near-match LLM result cache."""
+from arxiv_paper_pulse.semantic_cache import SemanticCache
+
+VECTORS = {
+    "graph neural networks": [1.0, 0.0, 0.0],
+    "graph neural networks!": [0.98, 0.1, 0.0],
+    "protein folding": [0.0, 1.0, 0.0],
+}
+
+
+def test_exact_hit_skips_embedding():
+    calls = []
+    cache = SemanticCache(embed_fn=lambda text: calls.append(text) or VECTORS[text])
+    cache.store("protein folding", "summary")
+
+    assert cache.lookup("protein folding") == ("summary", None)
+    assert calls == []
+
+
+def test_near_match_within_namespace_only():
+    cache = SemanticCache(embed_fn=VECTORS.get, threshold=0.9)
+    _, embedding = cache.lookup("graph neural networks", namespace="model-a")
+    cache.store("graph neural networks", "gnn summary", namespace="model-a", embedding=embedding)
+
+    assert cache.lookup("graph neural networks!", namespace="model-a")[0] == "gnn summary"
+    assert cache.lookup("graph neural networks!", namespace="model-b")[0] is None
+    assert cache.lookup("protein folding", namespace="model-a")[0] is None
+
+
+def test_lru_eviction_and_persistence(tmp_path):
+    cache = SemanticCache(embed_fn=VECTORS.get, maxsize=2)
+    for text in VECTORS:
+        _, embedding = cache.lookup(text)
+        cache.store(text, text.upper(), embedding=embedding)
+    assert len(cache) == 2
+    assert cache.lookup("graph neural networks", semantic=False)[0] is None
+
+    path = tmp_path / "cache.json"
+    cache.save(path)
+    restored = SemanticCache(embed_fn=VECTORS.get)
+    restored.load(path)
+
+    assert restored.lookup("protein folding")[0] == "PROTEIN FOLDING"
+    assert restored.lookup("graph neural networks")[0] == "GRAPH NEURAL NETWORKS!"
+
+
+
+def test_index_follows_replacement_and_eviction():
+    import math
+
+    def embed(text):
+        # "text i" and its near-duplicate "near i" point in almost the same direction
+        angle = int(text.split()[1]) * 0.1 + (0.01 if text.startswith("near") else 0.0)
+        return [math.cos(angle), math.sin(angle)]
+
+    cache = SemanticCache(embed_fn=embed, threshold=0.999, maxsize=20)
+    for i in range(30):
+        _, embedding = cache.lookup(f"text {i}")
+        cache.store(f"text {i}", f"value {i}", embedding=embedding)
+
+    assert [cache.lookup(f"near {i}")[0] for i in (5, 15, 25)] == [None, "value 15", "value 25"]
+
+    # Replacing an entry without an embedding drops its row from the index
+    cache.store("text 25", "exact only")
+    assert cache.lookup("near 25")[0] is None
+    assert cache.lookup("text 25")[0] == "exact only"